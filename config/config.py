@@ -4,5 +4,131 @@ class Config:
     EMAIL = "test@qabrains.com"
     PASSWORD = "Password123"
 
+    # "chrome" or "firefox" (pytest --browser)
     BROWSER = "chrome"
-    IMPLICIT_WAIT = 10
+
+    # How long an action may take to produce its postcondition, and how often to check
+    POSTCONDITION_TIMEOUT = 10
+    POLL_FREQUENCY = 0.1
+
+    # Wall-time budgets; waits and fallbacks inside a test/step only get what is left of them
+    TEST_BUDGET = 180
+    STEP_BUDGET = 60
+
+    # The app counts as settled once no fetch/XHR is in flight and the DOM has been quiet this long
+    SETTLE_QUIET_MS = 50
+    SETTLE_TIMEOUT = 15
+
+    # Reuse one browser per session/worker, resetting it between tests instead of relaunching
+    REUSE_DRIVER = False
+
+    # Log in through the UI once per credential set and replay cookies/storage afterwards
+    CACHE_LOGIN_SESSION = True
+
+    # Where the app keeps cart/favorites state and serves its JSON API (used to seed test state)
+    API_PATH = "/ecommerce/api"
+    CART_STORAGE_KEY = "cart"
+    FAVORITES_STORAGE_KEY = "favorites"
+
+    HEADLESS = False
+    WINDOW_SIZE = (1920, 1080)
+
+    # "performance": always headless at WINDOW_SIZE, with the resources below blocked via CDP
+    BROWSER_PROFILE = "default"
+    BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+    BLOCKED_URL_PATTERNS = (
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*facebook.net*", "*hotjar.com*", "*clarity.ms*", "*segment.io*",
+    )
+    ALLOWED_URL_PATTERNS = ()
+    # Fetch blocked images, fonts and media once at session end to estimate the bytes saved
+    ESTIMATE_BLOCKED_BYTES = False
+
+    # Recorded test durations drive how the parallel runner splits the suite
+    DURATIONS_FILE = ".test_durations.json"
+    DEFAULT_TEST_DURATION = 30
+    PARALLEL_REPORT_FILE = "report.xml"
+
+    # Which fallback locators matched, so the usual winner is tried first next time
+    LOCATOR_STATS_FILE = ".locator_stats.json"
+    LOCATOR_STALE_DAYS = 30
+
+    # Where a failed test's last checkpoint is kept for the next run to resume from, and for how long
+    CHECKPOINT_FILE = ".checkpoints.json"
+    CHECKPOINT_MAX_AGE = 3600
+    RESUME_FROM_CHECKPOINT = True
+
+    # Which page-object/utility functions each test ran, for selecting tests by git diff
+    IMPACT_INDEX_FILE = ".test_impact.json"
+
+    # Per page-object method WebDriver command counts/timings (also --profile-commands)
+    PROFILE_COMMANDS = False
+    COMMAND_PROFILE_FILE = "command_profile.json"
+
+    # Ring buffer of recent events per test; screenshot/DOM/console written only on failure. The HAR needs
+    # Chrome's performance log on for every session, so it is opt-in (pytest --flight-recorder-network)
+    FLIGHT_RECORDER = True
+    FLIGHT_RECORDER_EVENTS = 500
+    FLIGHT_RECORDER_NETWORK = False
+    ARTIFACTS_DIR = "artifacts"
+
+    # Print step banners and progress messages; the timeline is recorded either way
+    TIMELINE_CONSOLE = True
+    TRACE_FILE = None
+
+    # Load mode (python -m utilities.load_runner): virtual users, seconds to start them all,
+    # target iterations per second across users (0 = back to back) and total seconds
+    LOAD_USERS = 4
+    LOAD_RAMP_UP = 10
+    LOAD_RATE = 0
+    LOAD_DURATION = 60
+
+    # HTTP scenario recording (pytest --record-http=DIR) and browserless replay (python -m utilities.http_replay)
+    RECORD_HTTP_DIR = None
+    RECORD_RESOURCE_TYPES = ("Document", "XHR", "Fetch")
+    REPLAY_SESSIONS = 1000
+    REPLAY_CONCURRENCY = 200
+    REPLAY_TIMEOUT = 30
+
+    # Browser metrics per step (pytest --step-metrics): a step regresses when a metric is more than
+    # METRIC_TOLERANCE over the saved baseline and by more than its floor; "warn" or "fail" the test
+    STEP_METRICS = False
+    METRICS_DIR = "metrics"
+    METRICS_BASELINE_FILE = "metrics/baseline.json"
+    METRIC_TOLERANCE = 0.25
+    METRIC_FLOORS = {"duration_ms": 250, "lcp_ms": 200, "cls": 0.05, "long_task_ms": 100,
+                     "transfer_bytes": 50000, "js_heap_bytes": 5000000}
+    METRIC_REGRESSION = "warn"
+
+    # SQLite history of test/step timings; a slowdown is flagged when the latest commit's median is
+    # REGRESSION_THRESHOLD slower than the previous REGRESSION_WINDOW runs and significant at REGRESSION_ALPHA
+    RESULTS_DB = ".results.sqlite"
+    REGRESSION_THRESHOLD = 0.1
+    REGRESSION_ALPHA = 0.05
+    REGRESSION_MIN_SAMPLES = 4
+    REGRESSION_WINDOW = 20
+
+    # Attach to ready sessions of a running browser daemon (python -m utilities.browser_daemon; opt in with
+    # pytest --browser-daemon); a daemon that does not answer within BROWSER_DAEMON_PROBE_TIMEOUT is skipped
+    BROWSER_DAEMON = False
+    BROWSER_DAEMON_PROBE_TIMEOUT = 1.5
+    BROWSER_DAEMON_PORT = 4455
+    BROWSER_DAEMON_POOL = 3
+    BROWSER_DAEMON_PROFILE_DIR = "/dev/shm"
+
+    # Checkout data matrix (pytest --checkout-data=FILE [--data-shard=I/N]): per-row results table, how many
+    # rows may fail to run back to back before the browser is given up on, and the test's overall budget
+    CHECKOUT_DATA_FILE = None
+    DATA_SHARD = "0/1"
+    MATRIX_RESULTS_FILE = "artifacts/checkout_matrix.csv"
+    MATRIX_MAX_CONSECUTIVE_ERRORS = 3
+    MATRIX_BUDGET = 4 * 3600
+
+    # Run browsers on a Selenium Grid started on this machine (pytest --grid-url, python -m utilities.grid_runner):
+    # browsers every test runs in, and how often the runner re-reads the Grid's free slots
+    GRID_URL = None
+    GRID_BROWSERS = ("chrome", "firefox")
+    GRID_POLL_INTERVAL = 2
+
+    # Artificial per-response delay of the local stand-in shop (pytest --standin)
+    STANDIN_LATENCY_MS = 0
@@ -1,16 +1,340 @@
+import os
+import warnings
 import pytest
-from selenium import webdriver
 from config.config import Config
+from utilities.driver_factory import SUPPORTED_BROWSERS, DriverFactory
+from utilities.checkpoints import CheckpointStore, ResumableFlow
+from utilities.command_profiler import CommandProfiler
+from utilities.data_matrix import parse_shard, read_rows, results_path
+from utilities.duration_store import DurationStore
+from utilities.flight_recorder import FlightRecorder, read_log
+from utilities.http_recorder import HttpRecorder
+from utilities.step_metrics import PerformanceRegressionWarning, StepMetrics
+from utilities.locator_registry import LocatorRegistry
+from utilities.driver_pool import DriverPool
+from utilities.resource_blocker import ResourceReport
+from utilities.results_store import ResultsRecorder, ResultsStore
+from utilities.session_cache import SessionCache
+from utilities.standin_shop import StandinShop
+from utilities.state_seeder import StateSeeder
+from utilities.test_impact import ImpactRecorder
+from utilities.timeline import timeline
+
+_test_durations = {}
+_test_failed = set()
+_command_profiler = CommandProfiler()
+_standin_shop = None
+_resource_report = ResourceReport()
+_flight_recorder = FlightRecorder()
+_impact_recorder = ImpactRecorder()
+_resumed_tests = {}
+_http_recorder = None
+_step_metrics = None
+_results_recorder = ResultsRecorder()
+
+
+def pytest_addoption(parser):
+    parser.addoption("--headless", action="store_true", help="run browsers headless")
+    parser.addoption("--browser", choices=SUPPORTED_BROWSERS, default=Config.BROWSER, help="browser to run the tests in")
+    parser.addoption("--grid-url", help="start browsers on this Selenium Grid instead of locally")
+    parser.addoption("--browser-profile", choices=("default", "performance"), default=Config.BROWSER_PROFILE,
+                     help="'performance' runs headless and blocks images, media, fonts and analytics")
+    parser.addoption("--estimate-blocked-bytes", action="store_true",
+                     help="with the performance profile, fetch each blocked image/font/media URL once "
+                          "at the end to estimate the bytes saved")
+    parser.addoption("--durations-file", default=Config.DURATIONS_FILE,
+                     help="where to record per-test wall times for the parallel runner")
+    parser.addoption("--profile-commands", action="store_true",
+                     help="count and time WebDriver commands and sleeps per page-object method")
+    parser.addoption("--trace-file", default=Config.TRACE_FILE,
+                     help="write the step/action timeline as a Chrome trace-event JSON file")
+    parser.addoption("--full-replay", action="store_true",
+                     help="run every step even when a failed test left a checkpoint to resume from")
+    parser.addoption("--no-flight-recorder", action="store_true",
+                     help="do not keep recent events or write failure artifacts")
+    parser.addoption("--flight-recorder-network", action="store_true",
+                     help="log every session's network traffic so failures also leave a HAR")
+    parser.addoption("--no-step-console", action="store_true",
+                     help="record steps and progress messages without printing them")
+    parser.addoption("--record-http", metavar="DIR",
+                     help="save the HTTP requests behind each passing test as a replay scenario in DIR")
+    parser.addoption("--step-metrics", action="store_true",
+                     help="collect browser performance metrics per step and compare them with the baseline")
+    parser.addoption("--save-metrics-baseline", action="store_true",
+                     help="with --step-metrics, make this run's metrics the baseline")
+    parser.addoption("--metric-regression", choices=("warn", "fail"), default=Config.METRIC_REGRESSION,
+                     help="what a step metric regression does to its test")
+    parser.addoption("--results-db", default=Config.RESULTS_DB,
+                     help="SQLite file that keeps test/step timings across runs (empty to disable)")
+    parser.addoption("--state-dir", metavar="DIR",
+                     help="keep durations, results history, impact index, locator stats and checkpoints in DIR "
+                          "instead of the repo's files (overrides --durations-file and --results-db)")
+    parser.addoption("--browser-daemon", action="store_true",
+                     help="attach to ready sessions of a running browser daemon instead of launching browsers")
+    parser.addoption("--checkout-data", metavar="FILE",
+                     help="CSV/JSONL rows for test_checkout_data_matrix to drive through the checkout form")
+    parser.addoption("--data-shard", default=Config.DATA_SHARD, metavar="I/N",
+                     help="only run the data rows whose position is I modulo N")
+    parser.addoption("--matrix-results", default=Config.MATRIX_RESULTS_FILE,
+                     help="per-row results table of the data matrix (sharded runs add .shard-I-of-N)")
+    parser.addoption("--app-url", help="login page URL to test instead of Config.BASE_URL")
+    parser.addoption("--standin", action="store_true",
+                     help="start the local stand-in shop and run the tests against it")
+    parser.addoption("--standin-latency-ms", type=float, default=Config.STANDIN_LATENCY_MS,
+                     help="artificial delay the stand-in shop adds to every response")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "allow_resources(*types): let the performance profile load these "
+                                       "resource types (image, media, font) for this test")
+    config.addinivalue_line("markers", "budget(seconds): give this test a different overall time budget "
+                                       "than Config.TEST_BUDGET")
+    if config.getoption("headless"):
+        Config.HEADLESS = True
+    Config.BROWSER = config.getoption("browser")
+    Config.BROWSER_PROFILE = config.getoption("browser_profile")
+    if config.getoption("estimate_blocked_bytes"):
+        Config.ESTIMATE_BLOCKED_BYTES = True
+    if config.getoption("grid_url"):
+        Config.GRID_URL = config.getoption("grid_url")
+    if config.getoption("profile_commands"):
+        Config.PROFILE_COMMANDS = True
+    Config.TRACE_FILE = config.getoption("trace_file")
+    Config.RESULTS_DB = config.getoption("results_db")
+    Config.DURATIONS_FILE = config.getoption("durations_file")
+    state_dir = config.getoption("state_dir")
+    if state_dir:
+        # Scratch runs such as benchmarks keep what they learn out of the state the real runs use
+        os.makedirs(state_dir, exist_ok=True)
+        for name in ("DURATIONS_FILE", "RESULTS_DB", "IMPACT_INDEX_FILE", "LOCATOR_STATS_FILE", "CHECKPOINT_FILE"):
+            if getattr(Config, name):
+                setattr(Config, name, os.path.join(state_dir, os.path.basename(getattr(Config, name))))
+    if config.getoption("browser_daemon"):
+        Config.BROWSER_DAEMON = True
+    if config.getoption("checkout_data"):
+        Config.CHECKOUT_DATA_FILE = config.getoption("checkout_data")
+    try:
+        shard = parse_shard(config.getoption("data_shard"))
+    except ValueError as e:
+        raise pytest.UsageError(f"--data-shard: {e}")
+    Config.DATA_SHARD = config.getoption("data_shard")
+    Config.MATRIX_RESULTS_FILE = results_path(*shard, config.getoption("matrix_results"))
+    if config.getoption("full_replay"):
+        Config.RESUME_FROM_CHECKPOINT = False
+    if config.getoption("no_flight_recorder"):
+        Config.FLIGHT_RECORDER = False
+    if config.getoption("flight_recorder_network"):
+        Config.FLIGHT_RECORDER_NETWORK = True
+    if config.getoption("no_step_console"):
+        Config.TIMELINE_CONSOLE = False
+    timeline.console = Config.TIMELINE_CONSOLE
+
+    global _http_recorder, _step_metrics
+    if config.getoption("step_metrics"):
+        Config.STEP_METRICS = True
+        Config.METRIC_REGRESSION = config.getoption("metric_regression")
+        _step_metrics = StepMetrics()
+    if config.getoption("record_http"):
+        Config.RECORD_HTTP_DIR = config.getoption("record_http")
+        # Log in through the UI so the login request is part of the scenario
+        Config.CACHE_LOGIN_SESSION = False
+        _http_recorder = HttpRecorder()
+
+    global _standin_shop
+    if config.getoption("standin"):
+        _standin_shop = StandinShop(latency=config.getoption("standin_latency_ms") / 1000.0).start()
+        Config.BASE_URL = _standin_shop.login_url
+    elif config.getoption("app_url"):
+        Config.BASE_URL = config.getoption("app_url")
+
+
+def pytest_unconfigure(config):
+    if _standin_shop is not None:
+        _standin_shop.stop()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item):
+    # Top-level span per test, so steps and actions nest under it in the trace
+    marker = item.get_closest_marker("budget")
+    with timeline.span(item.nodeid, "test", **({"budget": marker.args[0]} if marker else {})) as args:
+        yield
+        args["outcome"] = "failed" if item.nodeid in _test_failed else "passed"
+        if item.nodeid in _resumed_tests:
+            args["resumed_from"] = _resumed_tests[item.nodeid]
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    result = yield
+    problems = _step_metrics.regressions.get(item.nodeid) if _step_metrics is not None else None
+    if problems:
+        message = "Step metrics regressed against baseline:\n  " + "\n  ".join(problems)
+        if Config.METRIC_REGRESSION == "fail":
+            raise AssertionError(message)
+        warnings.warn(PerformanceRegressionWarning(message))
+    return result
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _command_profiler.tests:
+        terminalreporter.section("webdriver commands per page-object method")
+        for line in _command_profiler.summary_lines():
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"Per-test breakdown: {Config.COMMAND_PROFILE_FILE}")
+
+    if _resource_report.requests:
+        terminalreporter.section("resource blocking")
+        for line in _resource_report.summary_lines():
+            terminalreporter.write_line(line)
+
+    if _flight_recorder.tests:
+        terminalreporter.section("flight recorder")
+        for line in _flight_recorder.summary_lines(sum(_test_durations.values())):
+            terminalreporter.write_line(line)
+
+    if _resumed_tests:
+        terminalreporter.section("resumed from checkpoints")
+        for nodeid, checkpoint in _resumed_tests.items():
+            outcome = "failed" if nodeid in _test_failed else "passed"
+            terminalreporter.write_line(f"{nodeid}: resumed after '{checkpoint}', {outcome}")
+        terminalreporter.write_line("Run with --full-replay to execute every step")
+
+    if _http_recorder is not None and _http_recorder.saved:
+        terminalreporter.section("recorded HTTP scenarios")
+        for line in _http_recorder.summary_lines():
+            terminalreporter.write_line(line)
+
+    if _step_metrics is not None and _step_metrics.results:
+        terminalreporter.section("step metrics")
+        for line in _step_metrics.summary_lines():
+            terminalreporter.write_line(line)
+
+    stale = LocatorRegistry.shared().stale()
+    if stale:
+        terminalreporter.section("stale locator candidates")
+        for group, key, last_hit in stale:
+            terminalreporter.write_line(f"{group}: {key} (no match in {Config.LOCATOR_STALE_DAYS}+ days)")
+
+
+def pytest_runtest_logreport(report):
+    # setup + call + teardown, since browser start-up is part of what a worker pays
+    _test_durations[report.nodeid] = _test_durations.get(report.nodeid, 0.0) + report.duration
+    if report.failed:
+        _test_failed.add(report.nodeid)
+
+
+def pytest_sessionfinish(session):
+    LocatorRegistry.shared().save()
+    _flight_recorder.flush()
+    _impact_recorder.save(Config.IMPACT_INDEX_FILE, {
+        nodeid: "failed" if nodeid in _test_failed else "passed" for nodeid in _impact_recorder.tests})
+    _command_profiler.uninstall_sleep()
+    if _step_metrics is not None and _step_metrics.results:
+        _step_metrics.save_run()
+        if session.config.getoption("save_metrics_baseline"):
+            _step_metrics.save_baseline()
+    if Config.TRACE_FILE and timeline.events:
+        timeline.write_chrome_trace(Config.TRACE_FILE)
+    if _command_profiler.tests:
+        _command_profiler.write(Config.COMMAND_PROFILE_FILE)
+    if not _test_durations:
+        return
+    if Config.RESULTS_DB:
+        results = ResultsStore(Config.RESULTS_DB)
+        results.save_run(_results_recorder, _test_durations, _test_failed, _resumed_tests)
+        results.close()
+    store = DurationStore(Config.DURATIONS_FILE)
+    for nodeid, seconds in _test_durations.items():
+        store.record(DurationStore.key(nodeid, Config.BROWSER), seconds)
+    store.save()
+
+
+@pytest.fixture(scope="session")
+def driver_pool():
+    """One pool per session, i.e. per worker process when running distributed"""
+    pool = DriverPool(DriverFactory.create)
+    yield pool
+    pool.quit_all()
+
 
 @pytest.fixture
-def setup():
-    if Config.BROWSER == "chrome":
-        driver = webdriver.Chrome()
+def setup(request):
+    if Config.REUSE_DRIVER:
+        pool = request.getfixturevalue("driver_pool")
+        driver = pool.acquire()
+    else:
+        driver = DriverFactory.create()
 
-    driver.get(Config.BASE_URL)
-    driver.maximize_window()
-    driver.implicitly_wait(Config.IMPLICIT_WAIT)
+    blocker = getattr(driver, "resource_blocker", None)
+    if blocker is not None:
+        marker = request.node.get_closest_marker("allow_resources")
+        blocker.apply(allow_types=marker.args if marker else ())
+
+    if Config.PROFILE_COMMANDS:
+        _command_profiler.install(driver)
+        _command_profiler.start_test(request.node.nodeid)
+    if Config.FLIGHT_RECORDER:
+        _flight_recorder.start_test(request.node.nodeid, driver)
+    _impact_recorder.install(driver)
+    _results_recorder.install(driver)
+    _impact_recorder.start_test(request.node.nodeid)
+    if _http_recorder is not None:
+        _http_recorder.start_test(request.node.nodeid)
+    if _step_metrics is not None:
+        _step_metrics.start_test(request.node.nodeid, driver)
 
     yield driver
 
-    driver.quit()
+    _command_profiler.finish_test()
+    _impact_recorder.finish_test()
+    if _step_metrics is not None:
+        _step_metrics.finish_test()
+    performance_log = _resource_report.collect(driver) if blocker is not None else None
+    if _http_recorder is not None:
+        if performance_log is None:
+            performance_log = read_log(driver, "performance")
+        _http_recorder.finish_test(driver, performance_log, request.node.nodeid in _test_failed)
+    if Config.FLIGHT_RECORDER:
+        _flight_recorder.finish_test(driver, request.node.nodeid in _test_failed, performance_log)
+    if Config.REUSE_DRIVER:
+        pool.release(driver)
+    else:
+        driver.quit()
+
+
+@pytest.fixture(scope="session")
+def session_cache():
+    return SessionCache(enabled=Config.CACHE_LOGIN_SESSION)
+
+
+@pytest.fixture
+def logged_in(setup, session_cache):
+    """A setup driver already logged in as Config.EMAIL, on the products page"""
+    return session_cache.authenticate(setup, Config.EMAIL, Config.PASSWORD)
+
+
+@pytest.fixture
+def checkpoints(request, setup):
+    """Declares resumable steps; a failed test resumes from its last checkpoint on the next run"""
+    flow = ResumableFlow(setup, request.node.nodeid, CheckpointStore(Config.CHECKPOINT_FILE),
+                         resume=Config.RESUME_FROM_CHECKPOINT)
+    yield flow
+    if flow.resumed_from:
+        _resumed_tests[request.node.nodeid] = flow.resumed_from
+        request.node.user_properties.append(("resumed_from_checkpoint", flow.resumed_from))
+    flow.finish(request.node.nodeid in _test_failed)
+
+
+@pytest.fixture
+def checkout_rows():
+    """This shard's rows of --checkout-data, read lazily; skips the test when no file was given"""
+    if not Config.CHECKOUT_DATA_FILE:
+        pytest.skip("no --checkout-data file given")
+    return read_rows(Config.CHECKOUT_DATA_FILE, *parse_shard(Config.DATA_SHARD))
+
+
+@pytest.fixture
+def seed(logged_in):
+    """Seeds cart/favorites of the logged-in session directly instead of through the UI"""
+    return StateSeeder(logged_in)
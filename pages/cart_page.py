@@ -1,9 +1,14 @@
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
-import time
+from config.config import Config
+from utilities.wait_utils import WaitUtils
+from utilities.action_engine import ActionEngine
+from utilities.locator_registry import LocatorRegistry
+from utilities.batch_actions import BatchActions, BatchActionError
+from utilities.snapshot import snapshot
+from utilities.timeline import log, trace_actions
+from utilities import postconditions as post
 
+@trace_actions
 class CartPage:
 
     # Cart icon and navigation
@@ -19,6 +24,9 @@ class CartPage:
     # Continue and Finish buttons
     CONTINUE_BTN = (By.XPATH, "//button[normalize-space()='Continue']")
     FINISH_BTN = (By.XPATH, "//button[normalize-space()='Finish']")
+
+    # Validation message the checkout form shows when it rejects the input
+    CHECKOUT_ERROR = (By.XPATH, "//*[@role='alert' or contains(@class, 'error')]")
     
     # Continue Shopping button
     CONTINUE_SHOPPING_BTN = (By.XPATH, "//button[normalize-space()='Continue Shopping']")
@@ -26,366 +34,334 @@ class CartPage:
     # Home page verification
     PRODUCTS_HEADING = (By.XPATH, "//h2[normalize-space()='Products']")
     
+    # Any grid layout, used as a last check for the products page
+    ANY_GRID = (By.XPATH, "//div[contains(@class, 'grid')]")
+
     # Login page verification
     LOGIN_PAGE_HEADING = (By.XPATH, "//h2[normalize-space()='Login']")
     EMAIL_INPUT_LOGIN = (By.XPATH, "//input[@type='email' or @placeholder='Email']")
+
+    # Any element whose own text mentions logout, case-insensitively
+    ANY_LOGOUT_TEXT = (By.XPATH, "//*[contains(translate(text(), 'LOGOUT', 'logout'), 'logout')]")
+
+    # Logout fallbacks, tried in the order the locator registry has seen them win
+    LOGOUT_LOCATORS = [
+        (By.XPATH, "//button[normalize-space()='Logout']"),
+        # (By.XPATH, "//a[normalize-space()='Logout']"),
+        # (By.XPATH, "//*[normalize-space()='Logout']"),
+    ]
+    USER_MENU_LOCATORS = [
+        (By.XPATH, "//header//button[last()]"),
+        (By.XPATH, "//button[contains(@class, 'user')]"),
+        (By.XPATH, "//button[contains(@class, 'menu')]"),
+    ]
     
     def __init__(self, driver):
         self.driver = driver
-        self.wait = WebDriverWait(driver, 30)
+        self.wait = WaitUtils(driver, 30)
+        self.postconditions = WaitUtils(driver, Config.POSTCONDITION_TIMEOUT)
+        self.locators = LocatorRegistry.shared()
+        self.batch = BatchActions(driver)
+        self.actions = ActionEngine(driver)
 
-    def scroll_to_element(self, element):
-        """Scroll element into view"""
-        self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-        time.sleep(0.5)
+    def home_page_reached(self):
+        """Postcondition: back on the products page, outside cart and checkout"""
+        return post.any_of(
+            post.url_excludes('/cart', '/checkout'),
+            post.element_present(self.PRODUCTS_HEADING, "Products heading"),
+        )
 
-    def click_element(self, locator, element_name="element"):
-        """Smart click with fallback to JavaScript"""
-        try:
-            element = self.wait.until(EC.presence_of_element_located(locator))
-            self.scroll_to_element(element)
-            
-            # Wait for element to be clickable
-            element = self.wait.until(EC.element_to_be_clickable(locator))
-            element.click()
-            print(f" Clicked {element_name} (normal click)")
-        except (TimeoutException, ElementClickInterceptedException) as e:
-            print(f" Normal click failed, using JavaScript click...")
-            element = self.driver.find_element(*locator)
-            self.driver.execute_script("arguments[0].click();", element)
-            print(f"  Clicked {element_name} (JavaScript click)")
+    def logged_out(self):
+        """Postcondition: on the login page"""
+        return post.any_of(
+            post.url_contains('/login'),
+            post.element_present(self.LOGIN_PAGE_HEADING, "Login heading"),
+            post.element_present(self.EMAIL_INPUT_LOGIN, "Login email input"),
+        )
+
+    def click_element(self, locator, element_name="element", postcondition=None):
+        """Click as soon as the element is actionable, then wait for the postcondition"""
+        how = self.actions.click(locator, element_name)
+        log(f"  Clicked {element_name} ({how} click)")
+
+        if postcondition is not None:
+            self.postconditions.wait_for_postcondition(postcondition)
 
     def find_cart_icon(self):
         """Try to find the cart icon with multiple strategies"""
-        try:
-            elem = self.driver.find_element(*self.CART_ICON)
-            if elem.is_displayed():
-                return elem
-        except:
-            pass
-        
-        try:
-            elem = self.driver.find_element(*self.CART_ICON_ALT)
-            if elem.is_displayed():
-                return elem
-        except:
-            pass
-        
-        return None
+        return self.locators.find(self.driver, "CartPage.cart_icon", [self.CART_ICON, self.CART_ICON_ALT],
+                                  timeout=Config.POSTCONDITION_TIMEOUT)
 
     def click_cart_icon(self):
         """Click cart icon to navigate to cart page"""
-        print("\n Clicking cart icon...")
+        log("\n Clicking cart icon...")
         
         # Try to find cart icon
         cart_icon = self.find_cart_icon()
         
         if cart_icon:
-            try:
-                self.scroll_to_element(cart_icon)
-                cart_icon.click()
-                print("  Clicked cart icon (normal click)")
-            except:
-                self.driver.execute_script("arguments[0].click();", cart_icon)
-                print("  Clicked cart icon (JavaScript click)")
+            how = self.actions.click(cart_icon, "cart icon")
+            log(f"  Clicked cart icon ({how} click)")
         else:
             # Fallback: navigate directly via URL
-            print("  Cart icon not found, using URL navigation...")
+            log("  Cart icon not found, using URL navigation...")
             current_url = self.driver.current_url
             base_url = current_url.split('/ecommerce')[0] + '/ecommerce'
             cart_url = base_url + '/cart'
             self.driver.get(cart_url)
-            print("  Navigated to cart via URL")
+            log("  Navigated to cart via URL")
         
-        time.sleep(2)
-        print("  Cart page loaded")
+        self.postconditions.wait_for_postcondition(
+            post.element_present(self.CHECKOUT_BTN, "Checkout button"))
+        log("  Cart page loaded")
 
     def click_checkout(self):
         """Click Checkout button"""
-        print("\n Clicking Checkout button...")
-        self.click_element(self.CHECKOUT_BTN, "Checkout button")
-        time.sleep(3)
-        print("  Checkout page opened")
+        log("\n Clicking Checkout button...")
+        self.click_element(
+            self.CHECKOUT_BTN, "Checkout button",
+            post.visible_count_at_least(self.ALL_FORM_INPUTS, 3, "checkout form inputs"))
+        log("  Checkout page opened")
 
     def fill_input_with_js(self, element, value, field_name):
         """Fill input using JavaScript"""
+        self.fill_inputs_with_js([(element, value, field_name)])
+
+    def fill_inputs_with_js(self, fields):
+        """Fill several (element, value, field_name) inputs in one script call"""
         try:
-            # Scroll to element
-            self.scroll_to_element(element)
-            time.sleep(0.3)
-            
-            # Clear and fill using JavaScript
-            self.driver.execute_script("arguments[0].value = '';", element)
-            self.driver.execute_script("arguments[0].value = arguments[1];", element, value)
-            
-            # Trigger events
-            self.driver.execute_script("""
-                var element = arguments[0];
-                element.dispatchEvent(new Event('input', { bubbles: true }));
-                element.dispatchEvent(new Event('change', { bubbles: true }));
-            """, element)
-            
-            print(f"  Entered '{value}' in {field_name}")
-            time.sleep(0.3)
-        except Exception as e:
-            print(f"   Failed to fill {field_name}: {str(e)[:100]}")
+            results = self.batch.fill_form(fields)
+        except BatchActionError as e:
+            self.print_fill_results(e.results)
             raise
+        self.print_fill_results(results)
+        return results
+
+    def print_fill_results(self, results):
+        for result in results:
+            if result["ok"] and result.get("normalised"):
+                log(f"  Entered '{result['requested']}' in {result['name']}, which kept '{result['value']}'")
+            elif result["ok"]:
+                log(f"  Entered '{result['value']}' in {result['name']}")
+            else:
+                log(f"   Failed to fill {result['name']}: {str(result['error'] or result['value'])[:100]}")
 
     def fill_checkout_form(self, first_name, last_name, postcode):
         """Fill out the checkout form with 3 fields"""
-        print("\n Filling checkout form...")
+        log("\n Filling checkout form...")
         
         try:
             # Wait for form to fully load
-            time.sleep(2)
+            self.postconditions.wait_for_postcondition(
+                post.visible_count_at_least(self.ALL_FORM_INPUTS, 3, "checkout form inputs"))
             
             # Find all input fields
-            inputs = self.wait.until(EC.presence_of_all_elements_located(self.ALL_FORM_INPUTS))
+            inputs = snapshot(self.driver, self.ALL_FORM_INPUTS, elements=True)
             
-            print(f"  Found {len(inputs)} input fields")
+            log(f"  Found {len(inputs)} input fields")
             
             # Filter only visible and enabled inputs
-            visible_inputs = []
-            for inp in inputs:
-                try:
-                    if inp.is_displayed() and inp.is_enabled():
-                        visible_inputs.append(inp)
-                except:
-                    pass
+            visible_inputs = [inp.element for inp in inputs if inp.visible and inp.enabled]
             
-            print(f"  Found {len(visible_inputs)} visible and enabled input fields")
+            log(f"  Found {len(visible_inputs)} visible and enabled input fields")
             
-            # Fill the 3 fields using JavaScript
+            # Fill the 3 fields using JavaScript, in a single round trip
             if len(visible_inputs) >= 3:
-                # Field 1: First Name
-                self.fill_input_with_js(visible_inputs[0], first_name, "First Name (Field 1)")
+                self.fill_inputs_with_js([
+                    (visible_inputs[0], first_name, "First Name (Field 1)"),
+                    (visible_inputs[1], last_name, "Last Name (Field 2)"),
+                    (visible_inputs[2], postcode, "Postcode (Field 3)"),
+                ])
                 
-                # Field 2: Last Name
-                self.fill_input_with_js(visible_inputs[1], last_name, "Last Name (Field 2)")
-                
-                # Field 3: Postcode
-                self.fill_input_with_js(visible_inputs[2], postcode, "Postcode (Field 3)")
-                
-                print("   All form fields filled successfully")
+                log("   All form fields filled successfully")
             else:
                 raise Exception(f"Expected at least 3 input fields, found {len(visible_inputs)}")
                 
         except Exception as e:
-            print(f"  Failed to fill form: {str(e)[:200]}")
+            log(f"  Failed to fill form: {str(e)[:200]}")
             raise
 
     def click_continue(self):
         """Click Continue button"""
-        print("\n Clicking Continue button...")
-        self.click_element(self.CONTINUE_BTN, "Continue button")
-        time.sleep(2)
-        print("  Moved to next step")
+        log("\n Clicking Continue button...")
+        self.click_element(
+            self.CONTINUE_BTN, "Continue button",
+            post.element_present(self.FINISH_BTN, "Finish button"))
+        log("  Moved to next step")
+
+    def reopen_checkout(self, checkout_url):
+        """Load the checkout step again, dropping whatever the last submit left on the form"""
+        self.driver.get(checkout_url)
+        self.postconditions.wait_for_postcondition(
+            post.visible_count_at_least(self.ALL_FORM_INPUTS, 3, "checkout form inputs"))
+
+    def submit_checkout_form(self):
+        """Click Continue; returns ("accepted", "") or ("rejected", validation message)"""
+        before = post.current_text(self.driver, self.CHECKOUT_ERROR)
+        self.click_element(
+            self.CONTINUE_BTN, "Continue button",
+            post.any_of(
+                post.element_present(self.FINISH_BTN, "Finish button"),
+                post.text_shown(self.CHECKOUT_ERROR, before, "checkout error message"),
+            ))
+        if any(r.visible for r in snapshot(self.driver, self.FINISH_BTN)):
+            return "accepted", ""
+        return "rejected", post.current_text(self.driver, self.CHECKOUT_ERROR) or ""
 
     def click_finish(self):
         """Click Finish button"""
-        print("\n Clicking Finish button...")
-        self.click_element(self.FINISH_BTN, "Finish button")
-        time.sleep(2)
-        print("  Order finished")
+        log("\n Clicking Finish button...")
+        self.click_element(
+            self.FINISH_BTN, "Finish button",
+            post.element_present(self.CONTINUE_SHOPPING_BTN, "Continue Shopping button"))
+        log("  Order finished")
 
     def click_continue_shopping(self):
         """Click Continue Shopping button"""
-        print("\n Clicking Continue Shopping button...")
-        self.click_element(self.CONTINUE_SHOPPING_BTN, "Continue Shopping button")
-        time.sleep(2)
-        print("   Returned to shopping")
+        log("\n Clicking Continue Shopping button...")
+        self.click_element(
+            self.CONTINUE_SHOPPING_BTN, "Continue Shopping button",
+            self.home_page_reached())
+        log("   Returned to shopping")
 
     def verify_back_to_home_page(self):
         """Verify that user is back on home/products page"""
-        print("\n Verifying back to home page...")
+        log("\n Verifying back to home page...")
         try:
             # Wait for page to load
-            time.sleep(2)
+            self.postconditions.wait_for_postcondition(self.home_page_reached())
             
             # Check current URL
             current_url = self.driver.current_url
-            print(f"  Current URL: {current_url}")
+            log(f"  Current URL: {current_url}")
             
             # Try multiple verification methods
             verification_success = False
             
             # Method 1: Check URL contains /ecommerce (not /cart or /checkout)
             if '/ecommerce' in current_url and '/cart' not in current_url and '/checkout' not in current_url:
-                print("  URL verification passed - on main ecommerce page")
+                log("  URL verification passed - on main ecommerce page")
                 verification_success = True
             
             # Method 2: Try to find Products heading
             if not verification_success:
-                try:
-                    element = self.driver.find_element(*self.PRODUCTS_HEADING)
-                    if element.is_displayed():
-                        print("   Products heading found and displayed")
-                        verification_success = True
-                except:
-                    pass
+                if any(r.visible for r in snapshot(self.driver, self.PRODUCTS_HEADING)):
+                    log("   Products heading found and displayed")
+                    verification_success = True
             
             # Method 3: Check for any product grid
             if not verification_success:
-                try:
-                    product_grid = self.driver.find_element(By.XPATH, "//div[contains(@class, 'grid')]")
-                    if product_grid.is_displayed():
-                        print("  Product grid found - on products page")
-                        verification_success = True
-                except:
-                    pass
+                if any(r.visible for r in snapshot(self.driver, self.ANY_GRID)):
+                    log("  Product grid found - on products page")
+                    verification_success = True
             
             if verification_success:
-                print("  Successfully returned to home page")
+                log("  Successfully returned to home page")
                 return True
             else:
                 raise Exception(f"Could not verify home page. Current URL: {current_url}")
         except Exception as e:
-            print(f" Failed to verify home page: {str(e)[:100]}")
+            log(f" Failed to verify home page: {str(e)[:100]}")
             raise
     
     def click_logout(self):
         """Click Logout button with fast fallback strategies"""
-        print("\n Clicking Logout button...")
-        
-        # Quick check: try direct logout button first (most common case)
-        logout_locators = [
-            (By.XPATH, "//button[normalize-space()='Logout']"),
-            # (By.XPATH, "//a[normalize-space()='Logout']"),
-            # (By.XPATH, "//*[normalize-space()='Logout']"),
-        ]
+        log("\n Clicking Logout button...")
         
         logout_clicked = False
         
-        # Try direct logout first (2 second timeout)
-        for locator in logout_locators:
-            try:
-                element = WebDriverWait(self.driver, 2).until(
-                    EC.presence_of_element_located(locator)
-                )
-                if element.is_displayed():
-                    try:
-                        element.click()
-                        print(f"   Clicked Logout button directly")
-                    except:
-                        self.driver.execute_script("arguments[0].click();", element)
-                        print(f"  Clicked Logout button (JavaScript)")
-                    logout_clicked = True
-                    time.sleep(1)
-                    break
-            except:
-                continue
+        # Try direct logout first (2 second timeout, most common case)
+        element = self.locators.find(self.driver, "CartPage.logout", self.LOGOUT_LOCATORS, timeout=2)
+        if element is not None:
+            how = self.actions.click(element, "Logout button")
+            log(f"   Clicked Logout button directly ({how} click)")
+            logout_clicked = True
         
         # If logout not found, try opening menu then logout (only if needed)
         if not logout_clicked:
-            print("  Trying to open user menu...")
-            user_menu_locators = [
-                (By.XPATH, "//header//button[last()]"),
-                (By.XPATH, "//button[contains(@class, 'user')]"),
-                (By.XPATH, "//button[contains(@class, 'menu')]"),
-            ]
+            log("  Trying to open user menu...")
             
-            for menu_locator in user_menu_locators:
+            for menu_locator in self.locators.ordered("CartPage.user_menu", self.USER_MENU_LOCATORS):
                 try:
-                    menu_btn = WebDriverWait(self.driver, 1).until(
-                        EC.element_to_be_clickable(menu_locator)
-                    )
+                    _, menu_btn = self.locators.probe(self.driver, [menu_locator], timeout=1)
+                    if menu_btn is None:
+                        continue
                     self.driver.execute_script("arguments[0].click();", menu_btn)
-                    print(f"  Opened menu")
-                    time.sleep(0.5)
+                    log(f"  Opened menu")
                     
                     # Now try logout again
-                    for locator in logout_locators:
-                        try:
-                            element = WebDriverWait(self.driver, 1).until(
-                                EC.element_to_be_clickable(locator)
-                            )
-                            self.driver.execute_script("arguments[0].click();", element)
-                            print(f"  Clicked Logout from menu")
-                            logout_clicked = True
-                            time.sleep(1)
-                            break
-                        except:
-                            continue
-                    
-                    if logout_clicked:
+                    element = self.locators.find(self.driver, "CartPage.logout", self.LOGOUT_LOCATORS, timeout=1)
+                    if element is not None:
+                        self.driver.execute_script("arguments[0].click();", element)
+                        log(f"  Clicked Logout from menu")
+                        self.locators.record_hit("CartPage.user_menu", menu_locator)
+                        logout_clicked = True
                         break
                 except:
                     continue
         
         # Last resort: search all elements
         if not logout_clicked:
-            print("  Searching all elements for logout...")
+            log("  Searching all elements for logout...")
             try:
-                all_elements = self.driver.find_elements(By.XPATH, "//*[contains(translate(text(), 'LOGOUT', 'logout'), 'logout')]")
-                for elem in all_elements:
-                    try:
-                        if elem.is_displayed():
-                            self.driver.execute_script("arguments[0].click();", elem)
-                            print(f"   Found and clicked: '{elem.text}'")
-                            logout_clicked = True
-                            time.sleep(1)
-                            break
-                    except:
-                        continue
+                for record in snapshot(self.driver, self.ANY_LOGOUT_TEXT, elements=True):
+                    if record.visible:
+                        self.driver.execute_script("arguments[0].click();", record.element)
+                        log(f"   Found and clicked: '{record.text}'")
+                        logout_clicked = True
+                        break
             except:
                 pass
         
         # Ultimate fallback: direct navigation
         if not logout_clicked:
-            print("  Navigating directly to login page...")
+            log("  Navigating directly to login page...")
             current_url = self.driver.current_url
             base_url = current_url.split('/ecommerce')[0]
             self.driver.get(base_url + '/login')
-            time.sleep(1)
-            print("  Navigated to login page")
+            log("  Navigated to login page")
         else:
-            print("  Logout clicked")
+            log("  Logout clicked")
+
+        self.postconditions.wait_for_postcondition(self.logged_out())
 
     def verify_logout_successful(self):
         """Verify that user is logged out and on login page"""
-        print("\n Verifying logout successful...")
+        log("\n Verifying logout successful...")
         try:
             # Wait for page to load
-            time.sleep(2)
+            self.postconditions.wait_for_postcondition(self.logged_out())
             
             # Check current URL
             current_url = self.driver.current_url
-            print(f"  Current URL: {current_url}")
+            log(f"  Current URL: {current_url}")
             
             # Try multiple verification methods
             verification_success = False
             
             # Method 1: Check URL contains /login
             if '/login' in current_url:
-                print("  URL verification passed - on login page")
+                log("  URL verification passed - on login page")
                 verification_success = True
             
             # Method 2: Try to find Login heading
             if not verification_success:
-                try:
-                    element = self.driver.find_element(*self.LOGIN_PAGE_HEADING)
-                    if element.is_displayed():
-                        print(" Login heading found and displayed")
-                        verification_success = True
-                except:
-                    pass
+                if any(r.visible for r in snapshot(self.driver, self.LOGIN_PAGE_HEADING)):
+                    log(" Login heading found and displayed")
+                    verification_success = True
             
             # Method 3: Check for email input field (login page)
             if not verification_success:
-                try:
-                    email_input = self.driver.find_element(*self.EMAIL_INPUT_LOGIN)
-                    if email_input.is_displayed():
-                        print("  Email input found - on login page")
-                        verification_success = True
-                except:
-                    pass
+                if any(r.visible for r in snapshot(self.driver, self.EMAIL_INPUT_LOGIN)):
+                    log("  Email input found - on login page")
+                    verification_success = True
             
             if verification_success:
-                print("  Successfully logged out")
+                log("  Successfully logged out")
                 return True
             else:
                 raise Exception(f"Could not verify logout. Current URL: {current_url}")
                 
         except Exception as e:
-            print(f"   Failed to verify logout: {str(e)[:100]}")
+            log(f"   Failed to verify logout: {str(e)[:100]}")
             raise
\ No newline at end of file
@@ -1,9 +1,16 @@
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
-import time
-
+from selenium.common.exceptions import TimeoutException
+from config.config import Config
+from utilities.wait_utils import WaitUtils
+from utilities.action_engine import ActionEngine
+from utilities.locator_registry import LocatorRegistry
+from utilities.batch_actions import BatchActions
+from utilities.settle import SettleDetector
+from utilities.snapshot import snapshot
+from utilities.timeline import log, trace_actions
+from utilities import postconditions as post
+
+@trace_actions
 class DashboardPage:
 
     # Sort dropdown button
@@ -19,75 +26,55 @@ class DashboardPage:
     BACK_TO_PRODUCTS_BTN = (By.XPATH, "//button[@class='flex items-center gap-2 text-black font-semibold mb-8 cursor-pointer']")
     SAMPLE_SUNGLASS_FAVORITE = (By.XPATH, "//div[@class='products grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6']//div[2]//span[1]//button[1]")
     SAMPLE_SHIRT_REMOVE = (By.XPATH, "//div[8]//div[1]//button[normalize-space()='Remove from cart']")
+    PRODUCTS_GRID = (By.XPATH, "//div[contains(@class, 'products') and contains(@class, 'grid')]")
 
-    def __init__(self, driver):
-        self.driver = driver
-        self.wait = WebDriverWait(driver, 30)
+    # Quantity shown next to the + button on the product details page
+    QUANTITY_VALUE = (By.XPATH, "//button[normalize-space()='+']/preceding-sibling::*[1]")
 
-    def scroll_to_element(self, element):
-        """Scroll element into view"""
-        self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-        time.sleep(0.5)
+    # Counter badge on the header cart icon
+    CART_BADGE = (By.XPATH, "//a[contains(@class, 'relative') and contains(@href, 'cart')]//span[contains(@class, 'absolute')]")
 
-    def click_element(self, locator, element_name="element"):
-        """Smart click with fallback to JavaScript"""
-        try:
-            element = self.wait.until(EC.presence_of_element_located(locator))
-            self.scroll_to_element(element)
-            
-            # Wait for element to be clickable
-            element = self.wait.until(EC.element_to_be_clickable(locator))
-            element.click()
-            print(f" Clicked {element_name} (normal click)")
-        except (TimeoutException, ElementClickInterceptedException) as e:
-            print(f" Normal click failed, using JavaScript click...")
-            element = self.driver.find_element(*locator)
-            self.driver.execute_script("arguments[0].click();", element)
-            print(f" Clicked {element_name} (JavaScript click)")
+    def __init__(self, driver):
+        self.driver = driver
+        self.wait = WaitUtils(driver, 30)
+        self.postconditions = WaitUtils(driver, Config.POSTCONDITION_TIMEOUT)
+        self.locators = LocatorRegistry.shared()
+        self.batch = BatchActions(driver)
+        self.actions = ActionEngine(driver)
+        self.settle = SettleDetector(driver)
+
+    def cart_badge_changed(self):
+        """Postcondition: cart badge count differs from what it shows right now"""
+        before = post.current_text(self.driver, self.CART_BADGE)
+        return post.text_changed(self.CART_BADGE, before, "cart badge count")
+
+    def click_element(self, locator, element_name="element", postcondition=None):
+        """Click as soon as the element is actionable, then wait for the postcondition"""
+        how = self.actions.click(locator, element_name)
+        log(f" Clicked {element_name} ({how} click)")
+
+        if postcondition is not None:
+            self.postconditions.wait_for_postcondition(postcondition)
 
     def find_dropdown_button(self):
         """Try to find the dropdown button with multiple strategies"""
-        try:
-            elem = self.driver.find_element(*self.SORT_DROPDOWN)
-            if elem.is_displayed():
-                return elem
-        except:
-            pass
-        
-        try:
-            elem = self.driver.find_element(*self.SORT_DROPDOWN_ALT)
-            if elem.is_displayed():
-                return elem
-        except:
-            pass
-        
-        return None
+        return self.locators.find(self.driver, "DashboardPage.sort_dropdown", [self.SORT_DROPDOWN, self.SORT_DROPDOWN_ALT],
+                                  timeout=Config.POSTCONDITION_TIMEOUT)
 
     def wait_for_page_ready(self, max_wait=15):
-        """Wait for the page to be fully loaded"""
-        start_time = time.time()
-        
-        while (time.time() - start_time) < max_wait:
-            try:
-                ready = self.driver.execute_script("return document.readyState")
-                
-                if ready == "complete":
-                    time.sleep(0.5)
-                    dropdown = self.find_dropdown_button()
-                    if dropdown:
-                        return True
-                
-                time.sleep(1)
-            except:
-                time.sleep(1)
-        
-        return False
+        """Wait until the app has no requests in flight and the DOM has gone quiet"""
+        status = self.settle.wait(timeout=max_wait)
+        if not status["settled"]:
+            log(f" Page did not settle within {max_wait}s: {status}")
+        return status["settled"]
+
+    def select_sort_option(self, option_text, expected_param=None):
+        """Select a sort option by partial text match
 
-    def select_sort_option(self, option_text):
-        """Select a sort option by partial text match"""
-        print(f"\n{'='*70}")
-        print(f"SELECTING: '{option_text}'")
-        print('='*70)
+        Waits until the URL contains expected_param, or just changes when no
+        parameter is given.
+        """
+        log(f"\n Selecting sort option '{option_text}'...")
         
         self.wait_for_page_ready(max_wait=20)
         
@@ -95,30 +82,30 @@ class DashboardPage:
         if not dropdown:
             raise Exception("Dropdown button not found")
         
-        dropdown.click()
-        time.sleep(1)
+        self.actions.click(dropdown, "sort dropdown")
         
-        options = self.wait.until(
-            EC.presence_of_all_elements_located(self.SORT_OPTIONS)
-        )
+        options = self.wait_for_sort_options()
         
+        before_url = self.driver.current_url
         option_clicked = False
-        for idx, option in enumerate(options):
-            option_full_text = option.text.strip()
-            if option_full_text and option_text.lower() in option_full_text.lower():
-                try:
-                    option.click()
-                except:
-                    self.driver.execute_script("arguments[0].click();", option)
-                
+        for option in options:
+            if option.text and option_text.lower() in option.text.lower():
+                self.actions.click(option.element, f"sort option '{option.text}'")
                 option_clicked = True
                 break
         
         if not option_clicked:
-            available = [opt.text.strip() for opt in options]
+            available = [opt.text for opt in options]
             raise Exception(f"Option '{option_text}' not found. Available: {available}")
         
-        time.sleep(3)
+        if expected_param:
+            self.postconditions.wait_for_postcondition(post.url_contains(expected_param))
+        else:
+            self.postconditions.wait_for_postcondition(post.url_changed(before_url))
+
+    def wait_for_sort_options(self):
+        """Wait for the open dropdown's options and snapshot them in one call each poll"""
+        return self.wait.until(lambda driver: snapshot(driver, self.SORT_OPTIONS, elements=True) or False)
 
     def get_all_sort_options(self):
         """Get all available sort options"""
@@ -126,22 +113,29 @@ class DashboardPage:
         if not dropdown:
             raise Exception("Dropdown button not found")
         
-        dropdown.click()
-        time.sleep(0.5)
-        options = self.wait.until(
-            EC.presence_of_all_elements_located(self.SORT_OPTIONS)
-        )
+        self.actions.click(dropdown, "sort dropdown")
+        options = self.wait_for_sort_options()
         
-        option_texts = [opt.text.strip() for opt in options if opt.text.strip()]
+        option_texts = [opt.text for opt in options if opt.text]
         
         try:
-            dropdown.click()
-            time.sleep(0.3)
+            self.actions.click(dropdown, "sort dropdown")
+            self.postconditions.wait_for_postcondition(
+                post.element_absent(self.SORT_OPTIONS, "sort options"))
         except:
             pass
         
         return option_texts
 
+    def is_dashboard_displayed(self):
+        """Check that the products page finished rendering after login"""
+        try:
+            self.postconditions.wait_for_postcondition(
+                post.element_present(self.PRODUCTS_GRID, "product grid"))
+            return True
+        except TimeoutException:
+            return False
+
     def verify_sort_order_in_url(self, expected_param):
         """Verify the URL contains the expected order_by parameter"""
         current_url = self.driver.current_url
@@ -152,79 +146,68 @@ class DashboardPage:
     
     def click_add_to_cart_sample_shirt(self):
         """Click 'Add to cart' button for Sample Shirt"""
-        print("\n Adding Sample Shirt to cart...")
-        self.click_element(self.SAMPLE_SHIRT_ADD_TO_CART, "Sample Shirt Add to Cart button")
-        time.sleep(1)
-        print("  Sample Shirt added to cart")
+        log("\n Adding Sample Shirt to cart...")
+        self.click_element(
+            self.SAMPLE_SHIRT_ADD_TO_CART, "Sample Shirt Add to Cart button",
+            self.cart_badge_changed())
+        log("  Sample Shirt added to cart")
 
     def click_sample_shoe_image(self):
         """Click on Sample Shoe image to view details"""
-        print("\n Clicking Sample Shoe image...")
-        self.click_element(self.SAMPLE_SHOE_IMAGE, "Sample Shoe image")
-        time.sleep(1)
-        print("  Sample Shoe details page opened")
+        log("\n Clicking Sample Shoe image...")
+        self.click_element(
+            self.SAMPLE_SHOE_IMAGE, "Sample Shoe image",
+            post.element_present(self.INCREASE_QUANTITY_BTN, "+ button"))
+        log("  Sample Shoe details page opened")
 
     def increase_quantity_to(self, quantity):
         """Increase quantity by clicking + button"""
-        print(f"\n Increasing quantity to {quantity}...")
+        log(f"\n Increasing quantity to {quantity}...")
         
-        # Click the + button (quantity - 1) times (default is 1)
-        for i in range(quantity - 1):
-            self.click_element(self.INCREASE_QUANTITY_BTN, "+ button")
-            time.sleep(0.5)
-            print(f"  Quantity now: {i + 2}")
+        # Click the + button (quantity - 1) times (default is 1), all in one script call
+        results = self.batch.repeat_click(self.INCREASE_QUANTITY_BTN, quantity - 1, self.QUANTITY_VALUE)
+        for result in results:
+            log(f"  Quantity now: {result['text']}")
         
-        print(f"  Quantity set to {quantity}")
+        self.postconditions.wait_for_postcondition(
+            post.text_equals(self.QUANTITY_VALUE, quantity, "quantity"))
+        log(f"  Quantity set to {quantity}")
 
     def click_add_to_cart_on_details_page(self):
         """Click 'Add to cart' button on product details page"""
-        print("\n Adding product to cart from details page...")
-        self.click_element(self.ADD_TO_CART_BTN, "Add to Cart button")
-        time.sleep(1)
-        print("  Product added to cart")
+        log("\n Adding product to cart from details page...")
+        self.click_element(
+            self.ADD_TO_CART_BTN, "Add to Cart button",
+            self.cart_badge_changed())
+        log("  Product added to cart")
 
     def click_back_to_products(self):
         """Click 'Back to products' button"""
-        print("\n Going back to products page...")
-        self.click_element(self.BACK_TO_PRODUCTS_BTN, "Back to Products button")
-        time.sleep(2)
-        print("   Returned to products page")
+        log("\n Going back to products page...")
+        self.click_element(
+            self.BACK_TO_PRODUCTS_BTN, "Back to Products button",
+            post.element_present(self.PRODUCTS_GRID, "product grid"))
+        log("   Returned to products page")
 
     def remove_sample_shirt_from_cart(self):
         """Remove Sample Shirt from cart on dashboard page"""
-        print("\n Removing Sample Shirt from cart...")
-        self.click_element(self.SAMPLE_SHIRT_REMOVE, "Sample Shirt Remove from Cart button")
-        time.sleep(1)
-        print("  Sample Shirt removed from cart")
+        log("\n Removing Sample Shirt from cart...")
+        self.click_element(
+            self.SAMPLE_SHIRT_REMOVE, "Sample Shirt Remove from Cart button",
+            self.cart_badge_changed())
+        log("  Sample Shirt removed from cart")
 
     def add_favorite_sample_sunglass(self):
         """Add Sample Sunglass to favorites"""
-        print("\n Adding Sample Sunglass to favorites...")
+        log("\n Adding Sample Sunglass to favorites...")
         
         try:
-            # Find the button element (not SVG)
-            element = self.wait.until(
-                EC.presence_of_element_located(self.SAMPLE_SUNGLASS_FAVORITE)
-            )
-            
-            # Scroll to it
-            self.scroll_to_element(element)
-            
-            # Wait for it to be clickable
-            element = self.wait.until(
-                EC.element_to_be_clickable(self.SAMPLE_SUNGLASS_FAVORITE)
-            )
-            
-            # Try normal click first
-            try:
-                element.click()
-                print("   Sample Sunglass added to favorites (normal click)")
-            except:
-                # Fallback to JavaScript click on the button element
-                self.driver.execute_script("arguments[0].click();", element)
-                print("   Sample Sunglass added to favorites (JavaScript click)")
+            before = post.current_markup(self.driver, self.SAMPLE_SUNGLASS_FAVORITE)
+            how = self.actions.click(self.SAMPLE_SUNGLASS_FAVORITE, "Sample Sunglass favorite button")
+            log(f"   Sample Sunglass added to favorites ({how} click)")
             
-            time.sleep(1)
+            self.postconditions.wait_for_postcondition(
+                post.markup_changed(self.SAMPLE_SUNGLASS_FAVORITE, before, "favorite button"))
         except Exception as e:
-            print(f"  Error adding to favorites: {str(e)[:100]}")
+            log(f"  Error adding to favorites: {str(e)[:100]}")
             raise
\ No newline at end of file
@@ -1,6 +1,11 @@
 from selenium.webdriver.common.by import By
+from config.config import Config
 from utilities.wait_utils import WaitUtils
+from utilities.action_engine import ActionEngine
+from utilities import postconditions as post
+from utilities.timeline import trace_actions
 
+@trace_actions
 class LoginPage:
 
     EMAIL_INPUT = (By.ID, "email")
@@ -11,6 +16,7 @@ class LoginPage:
     def __init__(self, driver):
         self.driver = driver
         self.wait = WaitUtils(driver)
+        self.actions = ActionEngine(driver)
 
     def enter_email(self, email):
         self.wait.wait_for_element_visible(self.EMAIL_INPUT).send_keys(email)
@@ -19,11 +25,11 @@ class LoginPage:
         self.wait.wait_for_element_visible(self.PASSWORD_INPUT).send_keys(password)
 
     def click_login(self):
-        self.wait.wait_for_element_clickable(self.LOGIN_BUTTON).click()
+        self.actions.click(self.LOGIN_BUTTON, "Login button")
 
     def login(self, email, password):
+        login_url = self.driver.current_url
         self.enter_email(email)
         self.enter_password(password)
         self.click_login()
-    
-    
\ No newline at end of file
+        self.wait.wait_for_postcondition(post.url_changed(login_url), Config.POSTCONDITION_TIMEOUT)
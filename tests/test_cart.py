@@ -1,118 +1,103 @@
 import pytest
-import time
-from pages.login_page import LoginPage
-from pages.dashboard_page import DashboardPage
-from pages.cart_page import CartPage
 from config.config import Config
+from pages.cart_page import CartPage
+from utilities.data_matrix import CheckoutMatrix
+from utilities.timeline import step, log
 
 @pytest.mark.cart
-def test_checkout_process(setup):
+def test_checkout_process(logged_in, seed, checkpoints):
     """Test complete checkout process from cart to order completion"""
-    driver = setup
-    config = Config()
+    driver = logged_in
 
-    login_page = LoginPage(driver)
-    dashboard = DashboardPage(driver)
     cart_page = CartPage(driver)
 
-    # Login
-    print("\n" + "="*70)
-    print("LOGGING IN")
-    print("="*70)
-    login_page.login(config.EMAIL, config.PASSWORD)
-    time.sleep(2)
-
-    # Step 1: Add Sample Shirt to cart
-    print("\n" + "="*70)
-    print("STEP 1: ADD SAMPLE SHIRT TO CART")
-    print("="*70)
-    dashboard.click_add_to_cart_sample_shirt()
-    print("Sample Shirt added to cart")
+    # Step 1: Put Sample Shirt in the cart (adding through the UI is covered in test_dashboard)
+    @checkpoints.step("STEP 1: SEED CART WITH SAMPLE SHIRT", checkpoint=True)
+    def seed_cart():
+        seed.seed_cart({"Sample Shirt": 1})
+        log("Sample Shirt in cart")
 
     # Step 2: Click cart icon and go to cart page
-    print("\n" + "="*70)
-    print("STEP 2: NAVIGATE TO CART PAGE")
-    print("="*70)
-    cart_page.click_cart_icon()
-    print("Cart page opened")
+    @checkpoints.step("STEP 2: NAVIGATE TO CART PAGE")
+    def open_cart():
+        cart_page.click_cart_icon()
+        log("Cart page opened")
 
     # Step 3: Click Checkout
-    print("\n" + "="*70)
-    print("STEP 3: CLICK CHECKOUT")
-    print("="*70)
-    cart_page.click_checkout()
-    print("✓ Checkout initiated")
-
-    # Step 4: Fill checkout form (3 fields only)
-    print("\n" + "="*70)
-    print("STEP 4: FILL CHECKOUT FORM")
-    print("="*70)
-    cart_page.fill_checkout_form(
-        first_name="John",
-        last_name="Doe",
-        postcode="123"
-    )
-    print("Form filled successfully")
+    @checkpoints.step("STEP 3: CLICK CHECKOUT", checkpoint=True)
+    def checkout():
+        cart_page.click_checkout()
+        log("✓ Checkout initiated")
+
+    # Step 4: Fill checkout form (3 fields only; typed values are not checkpointed)
+    @checkpoints.step("STEP 4: FILL CHECKOUT FORM")
+    def fill_form():
+        cart_page.fill_checkout_form(
+            first_name="John",
+            last_name="Doe",
+            postcode="123"
+        )
+        log("Form filled successfully")
 
     # Step 5: Click Continue
-    print("\n" + "="*70)
-    print("STEP 5: CLICK CONTINUE")
-    print("="*70)
-    cart_page.click_continue()
-    print("Continued to next step")
+    @checkpoints.step("STEP 5: CLICK CONTINUE", checkpoint=True)
+    def continue_checkout():
+        cart_page.click_continue()
+        log("Continued to next step")
 
     # Step 6: Click Finish
-    print("\n" + "="*70)
-    print("STEP 6: CLICK FINISH")
-    print("="*70)
-    cart_page.click_finish()
-    print(" Order completed")
+    @checkpoints.step("STEP 6: CLICK FINISH")
+    def finish():
+        cart_page.click_finish()
+        log(" Order completed")
 
     # Step 7: Click Continue Shopping
-    print("\n" + "="*70)
-    print("STEP 7: CLICK CONTINUE SHOPPING")
-    print("="*70)
-    cart_page.click_continue_shopping()
-    print("Continue shopping clicked")
+    @checkpoints.step("STEP 7: CLICK CONTINUE SHOPPING")
+    def continue_shopping():
+        cart_page.click_continue_shopping()
+        log("Continue shopping clicked")
 
     # Step 8: Verify back to home page
-    print("\n" + "="*70)
-    print("STEP 8: VERIFY BACK TO HOME PAGE")
-    print("="*70)
-    cart_page.verify_back_to_home_page()
-    print("Verified back on home page")
-    
+    @checkpoints.step("STEP 8: VERIFY BACK TO HOME PAGE")
+    def verify_home():
+        cart_page.verify_back_to_home_page()
+        log("Verified back on home page")
+
+
+@pytest.mark.cart
+@pytest.mark.budget(Config.MATRIX_BUDGET)
+def test_checkout_data_matrix(checkout_rows, logged_in, seed):
+    """Drive every --checkout-data row through the checkout form in one logged-in browser"""
+    matrix = CheckoutMatrix(logged_in, Config.MATRIX_RESULTS_FILE)
+
+    with step("SEED CART AND OPEN CHECKOUT"):
+        seed.seed_cart({"Sample Shirt": 1})
+        matrix.open_checkout()
+        log(f"Checkout form at {matrix.checkout_url}")
+
+    counts = matrix.run(checkout_rows)
+    log(f"{sum(counts.values())} rows: " + ", ".join(f"{n} {result}" for result, n in counts.items()))
+    log(f"Results: {Config.MATRIX_RESULTS_FILE}")
+
+    assert not matrix.mismatches, f"{len(matrix.mismatches)} row(s) did not behave as expected:\n" + "\n".join(
+        f"  row {m['id']}: expected {m['expect'] or '-'}, got {m['outcome']} {m['message']}"
+        for m in matrix.mismatches[:20])
+
 @pytest.mark.cart
-def test_logout_only(setup):
+def test_logout_only(logged_in):
     """Test logout functionality only"""
-    driver = setup
-    config = Config()
+    driver = logged_in
 
-    login_page = LoginPage(driver)
     cart_page = CartPage(driver)
 
-    # Login
-    print("\n" + "="*70)
-    print("LOGGING IN")
-    print("="*70)
-    login_page.login(config.EMAIL, config.PASSWORD)
-    time.sleep(2)
-    print("Login successful")
-
     # Logout
-    print("\n" + "="*70)
-    print("LOGOUT")
-    print("="*70)
-    cart_page.click_logout()
-    print(" Logout clicked")
+    with step("LOGOUT"):
+        cart_page.click_logout()
+        log(" Logout clicked")
 
     # Verify logout
-    print("\n" + "="*70)
-    print("VERIFY LOGOUT")
-    print("="*70)
-    cart_page.verify_logout_successful()
-    print("Logout verified successfully")
-
-    print("\n" + "="*70)
-    print("LOGOUT TEST PASSED ")
-    print("="*70)
\ No newline at end of file
+    with step("VERIFY LOGOUT"):
+        cart_page.verify_logout_successful()
+        log("Logout verified successfully")
+
+    log("LOGOUT TEST PASSED ")
@@ -0,0 +1,66 @@
+import time
+from selenium.common.exceptions import InvalidCookieDomainException
+from config.config import Config
+from utilities.checkpoints import CheckpointStore, ResumableFlow
+from utilities.settle import SettleDetector
+
+CHECKPOINT = {"step": "STEP 1", "index": 0, "steps": ["STEP 1"], "saved": 0,
+              "state": {"url": "http://127.0.0.1:5001/cart", "cookies": [{"name": "s", "value": "1"}],
+                        "local_storage": {}, "session_storage": {}}}
+
+
+class FakeDriver:
+    """Just enough of a WebDriver for capture/restore; add_cookie fails like on a dead or foreign origin"""
+
+    def __init__(self, url):
+        self.current_url = url
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+        self.current_url = url
+
+    def get_cookies(self):
+        return [{"name": "login", "value": "fixture"}]
+
+    def delete_all_cookies(self):
+        pass
+
+    def add_cookie(self, cookie):
+        if cookie["name"] == "s":
+            raise InvalidCookieDomainException("invalid cookie domain")
+
+    def execute_script(self, script, *args):
+        return {}, {}
+
+
+def save(tmp_path, origin):
+    store = CheckpointStore(str(tmp_path / "checkpoints.json"))
+    store.update("t", {"checkpoint": dict(CHECKPOINT, saved=time.time()), "failed_step": "STEP 2", "origin": origin})
+    return store
+
+
+def test_checkpoints_from_another_origin_are_ignored(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "BASE_URL", "http://127.0.0.1:5002/login")
+    store = save(tmp_path, "http://127.0.0.1:5001")
+    assert store.get("t", origin="http://127.0.0.1:5002") is None
+    assert store.get("t", origin="http://127.0.0.1:5001") is not None
+    assert ResumableFlow(FakeDriver("http://127.0.0.1:5002/products"), "t", store).entry is None
+
+
+def test_unrestorable_checkpoint_is_dropped_and_steps_replay(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "BASE_URL", "http://127.0.0.1:5001/login")
+    monkeypatch.setattr(SettleDetector, "wait", lambda self: None)
+    store = save(tmp_path, "http://127.0.0.1:5001")
+    driver = FakeDriver("http://127.0.0.1:5001/products")
+    flow = ResumableFlow(driver, "t", store)
+    ran = []
+
+    @flow.step("STEP 1", checkpoint=True)
+    def first():
+        ran.append("STEP 1")
+
+    assert ran == ["STEP 1"]
+    assert flow.resumed_from is None
+    assert driver.visited[-1] == "http://127.0.0.1:5001/products"
+    assert store.read() == {}
@@ -0,0 +1,35 @@
+from utilities import test_impact
+from utilities.test_impact import ImpactIndex
+
+ENTRY = {"functions": ["pages/cart_page.py::CartPage.click_checkout"], "outcome": "passed", "commit": "abc123"}
+
+
+def select_after(monkeypatch, changes):
+    index = ImpactIndex(path="")
+    index.entries = {"tests/test_cart.py::test_checkout_process": ENTRY,
+                     "tests/test_login.py::test_login_valid_user": dict(ENTRY, functions=[])}
+    monkeypatch.setattr(ImpactIndex, "changed_lines", staticmethod(lambda base: changes))
+    return index.select(list(index.entries))
+
+
+def test_driver_setup_changes_select_every_test(monkeypatch):
+    """Driver modules run outside the recorded window, so any change to them selects everything"""
+    for path in ("utilities/driver_factory.py", "utilities/driver_pool.py", "conftest.py"):
+        selected, skipped = select_after(monkeypatch, {path: {30}})
+        assert not skipped, path
+        assert all(path in why for why in selected.values())
+
+
+def test_unrelated_change_keeps_last_results(monkeypatch):
+    selected, skipped = select_after(monkeypatch, {"README.md": {1}})
+    assert not selected
+    assert len(skipped) == 2
+
+
+def test_run_passes_options_but_not_paths(monkeypatch):
+    calls = []
+    monkeypatch.setattr(test_impact, "collect", lambda args: ["tests/test_cart.py::test_checkout_process"])
+    monkeypatch.setattr(ImpactIndex, "select", lambda self, nodeids, base: ({nodeids[0]: "new"}, []))
+    monkeypatch.setattr(test_impact.subprocess, "call", lambda command, **kwargs: calls.append(command) or 0)
+    test_impact.main(["--run", "--full-mode", "--index=", "--", "tests/", "-m", "cart"])
+    assert calls[0][3:] == ["-m", "cart", "tests/test_cart.py::test_checkout_process"]
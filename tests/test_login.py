@@ -3,6 +3,7 @@ from pages.dashboard_page import DashboardPage
 from config.config import Config
 
 def test_login_valid_user(setup):
+    # Uses the bare setup driver, so this is always a real UI login
     driver = setup
 
     login_page = LoginPage(driver)
@@ -11,3 +12,22 @@ def test_login_valid_user(setup):
     login_page.login(Config.EMAIL, Config.PASSWORD)
 
     assert dashboard_page.is_dashboard_displayed(), "Dashboard not displayed after login"
+
+
+def test_cached_session_restores_dashboard(setup, session_cache):
+    driver = setup
+    dashboard_page = DashboardPage(driver)
+
+    session_cache.authenticate(driver, Config.EMAIL, Config.PASSWORD)
+
+    # Drop the browser state; the second login must come from the cache
+    driver.delete_all_cookies()
+    driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    driver.get(Config.BASE_URL)
+    restores = session_cache.restores
+
+    session_cache.authenticate(driver, Config.EMAIL, Config.PASSWORD)
+
+    assert dashboard_page.is_dashboard_displayed(), "Dashboard not displayed after restoring session"
+    if Config.CACHE_LOGIN_SESSION:
+        assert session_cache.restores == restores + 1, "Session was not restored from the cache"
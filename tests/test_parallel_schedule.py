@@ -0,0 +1,73 @@
+from utilities.duration_store import DurationStore
+from utilities.grid_runner import GridRunner
+from utilities.parallel_runner import ParallelRunner
+from utilities.pytest_args import split_pytest_args
+
+
+def test_duration_store_blends_and_round_trips(tmp_path):
+    path = str(tmp_path / "durations.json")
+    store = DurationStore(path)
+    store.record("a", 10.0)
+    store.record("a", 20.0)
+    assert store.get("a") == 15.0
+    store.save()
+
+    other = str(tmp_path / "worker.json")
+    worker = DurationStore(other)
+    worker.record("a", 25.0)
+    worker.record("b", 4.0)
+    worker.save()
+
+    reloaded = DurationStore(path)
+    reloaded.merge_file(other)
+    assert reloaded.durations == {"a": 20.0, "b": 4.0}
+    assert reloaded.default_duration(99) == 12.0
+    assert DurationStore(str(tmp_path / "missing.json")).default_duration(99) == 99
+
+
+def test_duration_store_keys_browsers_apart():
+    assert DurationStore.key("t::x") == "t::x"
+    assert DurationStore.key("t::x", "chrome") == "t::x"
+    assert DurationStore.key("t::x", "firefox") == "t::x@firefox"
+
+
+def test_schedule_balances_longest_first(tmp_path):
+    runner = ParallelRunner(2, durations_file=str(tmp_path / "durations.json"))
+    runner.store.durations = {"a": 8, "b": 7, "c": 6, "d": 5, "e": 4}
+    shards = runner.schedule(["e", "d", "c", "b", "a"])
+    loads = sorted(sum(runner.store.get(n) for n in shard) for shard in shards)
+    assert loads == [13, 17]
+    assert [shard[0] for shard in shards] == ["a", "b"]
+
+
+def test_schedule_estimates_unknown_tests_and_drops_empty_workers(tmp_path):
+    runner = ParallelRunner(4, durations_file=str(tmp_path / "durations.json"))
+    runner.store.durations = {"a": 10}
+    shards = runner.schedule(["a", "new"])
+    assert sorted(map(sorted, shards)) == [["a"], ["new"]]
+
+
+def test_split_pytest_args_keeps_option_values_with_their_options():
+    options, paths = split_pytest_args(["tests/", "-m", "cart", "--browser", "firefox", "-x",
+                                        "--tb=short", "tests/test_cart.py::test_checkout_process"])
+    assert options == ["-m", "cart", "--browser", "firefox", "-x", "--tb=short"]
+    assert paths == ["tests/", "tests/test_cart.py::test_checkout_process"]
+
+
+def test_workers_get_the_options_but_not_the_paths(tmp_path, monkeypatch):
+    commands = []
+    monkeypatch.setattr("subprocess.Popen", lambda command, **kwargs: commands.append(command))
+    runner = ParallelRunner(1, ["tests/", "-m", "cart", "-k", "checkout"], durations_file=str(tmp_path / "d.json"))
+    runner._start_worker(0, ["tests/test_cart.py::test_checkout_process"], str(tmp_path))
+    assert commands[0][3:8] == ["tests/test_cart.py::test_checkout_process", "-m", "cart", "-k", "checkout"]
+    assert "tests/" not in commands[0]
+
+
+def test_grid_workers_get_the_options_but_not_the_paths(tmp_path, monkeypatch):
+    commands = []
+    monkeypatch.setattr("subprocess.Popen", lambda command, **kwargs: commands.append(command))
+    runner = GridRunner("http://localhost:4444", ["firefox"], ["tests/", "-m", "cart"],
+                        durations_file=str(tmp_path / "d.json"))
+    runner._start_worker(0, ["tests/test_cart.py::test_checkout_process"], str(tmp_path), "firefox")
+    assert commands[0][3:7] == ["tests/test_cart.py::test_checkout_process", "-m", "cart", "--browser=firefox"]
+    assert "tests/" not in commands[0]
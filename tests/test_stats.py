@@ -0,0 +1,33 @@
+import pytest
+from utilities.stats import mann_whitney_u, percentile
+
+
+def test_mann_whitney_matches_reference_p_value():
+    # R: wilcox.test(1:5, 6:10, exact = FALSE) -> W = 0, p-value = 0.01219
+    assert mann_whitney_u([1, 2, 3, 4, 5], [6, 7, 8, 9, 10]) == pytest.approx(0.012186, abs=1e-6)
+
+
+def test_mann_whitney_corrects_for_ties():
+    # Midranks 1, 2.5, 6, 9.5, 11.5; U = 3, tie term 138, sigma^2 = 3 * (13 - 138 / 132)
+    # R: wilcox.test(c(1, 2, 2, 3, 3, 3), c(3, 3, 4, 4, 5, 5), exact = FALSE) -> p-value = 0.01547
+    assert mann_whitney_u([1, 2, 2, 3, 3, 3], [3, 3, 4, 4, 5, 5]) == pytest.approx(0.015467, abs=1e-6)
+
+
+def test_mann_whitney_is_symmetric():
+    before, after = [10, 11, 12, 13, 14, 15], [12, 14, 16, 18, 20, 22]
+    assert mann_whitney_u(before, after) == pytest.approx(mann_whitney_u(after, before))
+
+
+def test_mann_whitney_small_or_degenerate_samples_are_never_significant():
+    assert mann_whitney_u([], [1, 2, 3]) == 1.0
+    assert mann_whitney_u([1.0], [2.0]) == 1.0
+    assert mann_whitney_u([5, 5, 5], [5, 5, 5]) == 1.0
+    # Two runs per side cannot reach p < 0.05 with the normal approximation
+    assert mann_whitney_u([1, 2], [3, 4]) > 0.05
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) is None
+    assert percentile([3], 95) == 3
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([4, 1, 3, 2], 100) == 4
@@ -0,0 +1,100 @@
+"""Click elements once they are actionable, deciding how in one browser-side call.
+
+The actionability script waits, frame by frame, until the target is
+attached, visible, enabled and has the same box on two consecutive
+animation frames, scrolling it to the centre instantly on the way. It then
+hit-tests the centre point: when another element (a toast, modal backdrop,
+sticky header) sits on top, the script clicks the target itself right away,
+instead of the caller first waiting out a timeout on a native click that can
+never land. Otherwise the element comes back and gets a real WebDriver click.
+"""
+from selenium.common.exceptions import ElementClickInterceptedException, TimeoutException
+from config.config import Config
+from utilities.deadline import remaining
+from utilities.snapshot import RESOLVE_LOCATOR_JS
+from utilities.timeline import log
+from utilities.wait_utils import ensure_script_timeout
+
+ACTIONABILITY_SCRIPT = RESOLVE_LOCATOR_JS + """
+var element = arguments[0], locator = arguments[1], timeoutMs = arguments[2],
+    done = arguments[arguments.length - 1];
+var started = Date.now(), lastRect = null, scrolled = false, reason = 'not found';
+function target() {
+    if (element) { return element; }
+    var nodes = resolveLocator(locator[0], locator[1]);
+    return nodes.filter(isVisible)[0] || nodes[0] || null;
+}
+function disabled(el) {
+    return el.disabled === true || el.getAttribute('aria-disabled') === 'true' ||
+        !!(el.closest && el.closest('fieldset[disabled]'));
+}
+function describe(el) {
+    var text = (el.innerText || el.textContent || '').trim().slice(0, 40);
+    return el.tagName.toLowerCase() + (el.id ? '#' + el.id : '') +
+        (typeof el.className === 'string' && el.className ? '.' + el.className.trim().split(/\\s+/).join('.') : '') +
+        (text ? ' "' + text + '"' : '');
+}
+function check() {
+    var el = target();
+    if (!el) { reason = 'not found'; }
+    else if (!el.isConnected) { reason = 'detached from the DOM'; }
+    else if (!isVisible(el)) { reason = 'not visible'; }
+    else if (disabled(el)) { reason = 'disabled'; }
+    else {
+        if (!scrolled) { el.scrollIntoView({behavior: 'instant', block: 'center', inline: 'center'}); scrolled = true; }
+        var r = el.getBoundingClientRect();
+        var stable = lastRect && r.left === lastRect.left && r.top === lastRect.top &&
+            r.width === lastRect.width && r.height === lastRect.height;
+        lastRect = r;
+        if (!stable) {
+            reason = 'still moving';
+        } else {
+            var hit = document.elementFromPoint(r.left + r.width / 2, r.top + r.height / 2);
+            if (hit && hit !== el && !el.contains(hit)) {
+                el.click();
+                done({state: 'covered', covered_by: describe(hit), element: el});
+            } else {
+                done({state: 'ready', element: el});
+            }
+            return;
+        }
+    }
+    if (Date.now() - started >= timeoutMs) {
+        done({state: 'timeout', reason: reason, element: el});
+        return;
+    }
+    requestAnimationFrame(check);
+}
+check();
+"""
+
+
+class NotActionable(TimeoutException):
+    """Raised when an element never became clickable within the time available"""
+
+
+class ActionEngine:
+
+    def __init__(self, driver, timeout=Config.POSTCONDITION_TIMEOUT):
+        self.driver = driver
+        self.timeout = timeout
+
+    def click(self, target, name="element", timeout=None):
+        """Click a locator or element once actionable; return 'normal' or 'JavaScript'"""
+        timeout = remaining(self.timeout if timeout is None else timeout)
+        element, locator = (None, list(target)) if isinstance(target, tuple) else (target, None)
+        ensure_script_timeout(self.driver, timeout + 5)
+        result = self.driver.execute_async_script(ACTIONABILITY_SCRIPT, element, locator, int(timeout * 1000))
+
+        if result["state"] == "covered":
+            log(f"  {name} is covered by {result['covered_by']}, clicked with JavaScript")
+            return "JavaScript"
+        if result["state"] != "ready":
+            raise NotActionable(f"{name} not actionable within {timeout:.1f}s: {result['reason']}")
+        try:
+            result["element"].click()
+            return "normal"
+        except ElementClickInterceptedException:
+            # Something moved on top between the check and the click
+            self.driver.execute_script("arguments[0].click();", result["element"])
+            return "JavaScript"
@@ -0,0 +1,115 @@
+"""Run multi-step input in one browser-side script instead of a call per step."""
+from config.config import Config
+from utilities.deadline import remaining
+from utilities.wait_utils import ensure_script_timeout
+from utilities.snapshot import RESOLVE_LOCATOR_JS
+
+# Sets each value through the native setter so framework-controlled inputs
+# see the change, then fires the input/change events they listen for.
+# Values are set as strings; an input may still normalise one (maxlength,
+# type=number), so the result carries what the field ended up holding.
+FILL_FIELDS_SCRIPT = """
+var fields = arguments[0];
+return fields.map(function (field) {
+    var el = field[0], value = field[1] == null ? '' : String(field[1]), name = field[2];
+    try {
+        el.scrollIntoView({behavior: 'instant', block: 'center'});
+        el.focus();
+        var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        var setValue = Object.getOwnPropertyDescriptor(proto, 'value').set;
+        setValue.call(el, '');
+        setValue.call(el, value);
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        return {name: name, ok: true, value: el.value, requested: value, normalised: el.value !== value, error: null};
+    } catch (e) {
+        return {name: name, ok: false, value: null, requested: value, normalised: false, error: String(e)};
+    }
+});
+"""
+
+# Clicks the first visible match N times. Between clicks it waits until the
+# progress element's text changes (or two animation frames pass when there
+# is none) so the app re-renders before the next click sees stale state.
+REPEAT_CLICK_SCRIPT = RESOLVE_LOCATOR_JS + """
+var locator = arguments[0], times = arguments[1], progress = arguments[2],
+    stepTimeout = arguments[3] * 1000, done = arguments[arguments.length - 1];
+function first(loc) {
+    var nodes = resolveLocator(loc[0], loc[1]).filter(isVisible);
+    return nodes.length ? nodes[0] : null;
+}
+function progressText() {
+    if (!progress) { return null; }
+    var el = first(progress);
+    return el ? (el.innerText || el.textContent || el.value || '').trim() : null;
+}
+var results = [];
+function step(i) {
+    if (i >= times) { done(results); return; }
+    var target = first(locator);
+    if (!target) { results.push({step: i + 1, ok: false, text: progressText(), error: 'element not found'}); done(results); return; }
+    var before = progressText(), started = Date.now();
+    target.scrollIntoView({behavior: 'instant', block: 'center'});
+    target.click();
+    function settled() {
+        var now = progressText();
+        if (!progress || now !== before) { results.push({step: i + 1, ok: true, text: now, error: null}); step(i + 1); return; }
+        if (Date.now() - started > stepTimeout) {
+            results.push({step: i + 1, ok: false, text: now, error: 'no change after click'}); done(results); return;
+        }
+        requestAnimationFrame(settled);
+    }
+    requestAnimationFrame(function () { requestAnimationFrame(settled); });
+}
+step(0);
+"""
+
+
+class BatchActionError(Exception):
+    """Raised when some steps of a batch failed; carries the per-step results"""
+
+    def __init__(self, message, results):
+        super().__init__(message)
+        self.results = results
+
+
+class BatchActions:
+
+    def __init__(self, driver, step_timeout=Config.POSTCONDITION_TIMEOUT):
+        self.driver = driver
+        self.step_timeout = step_timeout
+
+    def fill_form(self, fields):
+        """Fill every (element, value, name) in fields with one script call
+
+        Returns one {name, ok, value, requested, normalised, error} result per
+        field, where value is what the field holds (normalised when the input
+        changed the requested text), and raises BatchActionError if any field
+        could not be filled.
+        """
+        results = self.driver.execute_script(
+            FILL_FIELDS_SCRIPT, [[element, value, name] for element, value, name in fields])
+        failed = [r for r in results if not r["ok"]]
+        if failed:
+            details = ", ".join(f"{r['name']}: {r['error'] or repr(r['value'])}" for r in failed)
+            raise BatchActionError(f"Failed to fill {len(failed)} field(s): {details}", results)
+        return results
+
+    def repeat_click(self, locator, times, progress_locator=None):
+        """Click locator times times in one async script call
+
+        Returns one {step, ok, text, error} result per click, where text is
+        the progress element's text after that click.
+        """
+        if times <= 0:
+            return []
+        step_timeout = remaining(self.step_timeout)
+        ensure_script_timeout(self.driver, step_timeout * times + 5)
+        results = self.driver.execute_async_script(
+            REPEAT_CLICK_SCRIPT, list(locator), times,
+            list(progress_locator) if progress_locator else None, step_timeout)
+        if len(results) < times or not all(r["ok"] for r in results):
+            last = results[-1] if results else {"step": 1, "error": "no clicks ran"}
+            raise BatchActionError(
+                f"Repeated click on {locator[1]} stopped at step {last['step']}/{times}: {last['error']}", results)
+        return results
@@ -0,0 +1,116 @@
+"""Benchmark the test flows end to end against the local stand-in shop.
+
+Runs the suite (or a -k selection) N times, each in a fresh headless pytest
+process with its own stand-in server, and reads the step timeline each run
+writes. Reports p50/p95 wall time per flow (test) and per step, so the
+effect of a framework change can be measured without network noise.
+Every step runs (no checkpoint resumes), and durations, results history,
+impact index, locator stats and checkpoints go to a scratch directory, so
+benchmark runs neither read nor feed the state real runs learn from.
+
+    python -m utilities.benchmark --runs 20 -- -k checkout
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from utilities.stats import summarize
+
+
+class Benchmark:
+
+    def __init__(self, runs, pytest_args=None, latency_ms=0.0):
+        self.runs = runs
+        self.pytest_args = list(pytest_args or [])
+        self.latency_ms = latency_ms
+        self.flows = defaultdict(list)
+        self.steps = defaultdict(list)
+        self.failed_runs = 0
+
+    def run(self):
+        workdir = tempfile.mkdtemp(prefix="benchmark-")
+        try:
+            for index in range(self.runs):
+                trace = os.path.join(workdir, f"run-{index}.json")
+                command = [
+                    sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+                    "--standin", f"--standin-latency-ms={self.latency_ms}",
+                    "--headless", "--no-step-console", "--full-replay",
+                    f"--trace-file={trace}",
+                    f"--state-dir={os.path.join(workdir, 'state')}",
+                    *self.pytest_args,
+                ]
+                result = subprocess.run(command, capture_output=True, text=True)
+                if result.returncode != 0:
+                    self.failed_runs += 1
+                    print(f"  run {index + 1}: exit {result.returncode}")
+                    print("\n".join(result.stdout.splitlines()[-5:]))
+                self.add_trace(trace)
+                print(f"Run {index + 1}/{self.runs} done")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        return self.report()
+
+    def add_trace(self, path):
+        """Fold one run's Chrome trace into the per-flow and per-step samples"""
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        tests = [e for e in events if e.get("cat") == "test"]
+        for test in tests:
+            if test.get("args", {}).get("outcome") == "passed":
+                self.flows[test["name"]].append(test["dur"] / 1e6)
+        for event in events:
+            if event.get("cat") != "step" or "error" in event.get("args", {}):
+                continue
+            owner = next((t for t in tests if t["ts"] <= event["ts"] <= t["ts"] + t["dur"]), None)
+            flow = owner["name"] if owner else "<unknown>"
+            self.steps[(flow, event["name"])].append(event["dur"] / 1e6)
+
+    def report(self):
+        return {
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "flows": {flow: summarize(samples) for flow, samples in sorted(self.flows.items())},
+            "steps": {f"{flow} :: {step}": summarize(samples)
+                      for (flow, step), samples in sorted(self.steps.items())},
+        }
+
+
+def format_table(title, rows):
+    lines = [title, f"{'name':75} {'n':>4} {'p50 s':>8} {'p95 s':>8} {'max s':>8}"]
+    for name, s in rows.items():
+        if s["count"]:
+            lines.append(f"{name[-75:]:75} {s['count']:4d} {s['p50']:8.3f} {s['p95']:8.3f} {s['max']:8.3f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark test flows against the stand-in shop")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="artificial server latency per request")
+    parser.add_argument("--output", help="also write the report as JSON")
+    args, pytest_args = parser.parse_known_args(argv)
+    if pytest_args[:1] == ["--"]:
+        pytest_args = pytest_args[1:]
+
+    report = Benchmark(args.runs, pytest_args, args.latency_ms).run()
+    print()
+    print(format_table("Per flow", report["flows"]))
+    print()
+    print(format_table("Per step", report["steps"]))
+    if report["failed_runs"]:
+        print(f"\n{report['failed_runs']} of {report['runs']} runs had failures; failed spans are excluded")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["failed_runs"] == report["runs"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
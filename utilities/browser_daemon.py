@@ -0,0 +1,296 @@
+"""Keep Chrome sessions launched ahead of time, across pytest invocations.
+
+Every pytest run normally pays for driver resolution, chromedriver start-up
+and a cold Chrome before its first command. The daemon pays that in the
+background instead: per browser spec (the arguments and capabilities
+DriverFactory would launch with) it keeps Config.BROWSER_DAEMON_POOL
+sessions ready, each with a fresh profile on tmpfs. DriverFactory leases
+one over a local HTTP call when a daemon is running and attaches to it;
+quitting the driver hands it back, and the daemon quits that browser,
+deletes its profile and launches a replacement. Sessions leased by a
+process that has since exited are reclaimed the same way.
+
+    python -m utilities.browser_daemon --pool 3          # keep running in a terminal
+    pytest --headless                                    # attaches to ready sessions
+    python -m utilities.browser_daemon --status
+
+A spec the daemon has not seen yet is launched on demand for that first
+lease and kept warm from then on.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from config.config import Config
+from utilities.daemon_client import DaemonClient
+from utilities.driver_factory import DriverFactory
+
+
+class WarmSession:
+
+    def __init__(self, spec, driver, profile, launch_seconds):
+        self.spec = spec
+        self.driver = driver
+        self.profile = profile
+        self.launch_seconds = launch_seconds
+        self.lease = None
+        self.pid = None
+
+    def describe(self):
+        return {"lease": self.lease, "executor": self.driver.service.service_url,
+                "session_id": self.driver.session_id, "capabilities": self.driver.caps}
+
+
+class BrowserDaemon:
+
+    def __init__(self, pool_size=None, profile_root=None):
+        self.pool_size = pool_size or Config.BROWSER_DAEMON_POOL
+        root = profile_root or Config.BROWSER_DAEMON_PROFILE_DIR
+        self.profile_root = root if root and os.path.isdir(root) else None
+        self.ready = {}
+        self.leased = {}
+        self.launching = {}
+        self.driver_path = None
+        self.served = 0
+        self.warm_hits = 0
+        self.lock = threading.Condition()
+        self.running = True
+
+    @staticmethod
+    def key(spec):
+        return json.dumps(spec, sort_keys=True)
+
+    def launch(self, spec):
+        """Start one Chrome for spec on a fresh tmpfs profile"""
+        profile = tempfile.mkdtemp(prefix="warm-chrome-", dir=self.profile_root)
+        options = DriverFactory.chrome_options(spec)
+        options.add_argument(f"--user-data-dir={profile}")
+        # Resolve chromedriver once; later launches skip Selenium Manager
+        service = webdriver.ChromeService(executable_path=self.driver_path) if self.driver_path else None
+        started = time.perf_counter()
+        try:
+            driver = webdriver.Chrome(options=options, service=service)
+        except Exception:
+            shutil.rmtree(profile, ignore_errors=True)
+            raise
+        self.driver_path = driver.service.path
+        return WarmSession(spec, driver, profile, time.perf_counter() - started)
+
+    def retire(self, session):
+        try:
+            session.driver.quit()
+        except WebDriverException:
+            pass
+        shutil.rmtree(session.profile, ignore_errors=True)
+
+    def lease(self, spec, pid):
+        key = self.key(spec)
+        session = None
+        while session is None:
+            with self.lock:
+                self.ready.setdefault(key, [])
+                warm = bool(self.ready[key])
+                session = self.ready[key].pop(0) if warm else None
+                self.lock.notify_all()
+            if session is None:
+                session = self.launch(spec)
+            elif not self._responsive(session):
+                self.retire(session)
+                session = None
+        session.lease, session.pid = uuid.uuid4().hex, pid
+        with self.lock:
+            self.leased[session.lease] = session
+            self.served += 1
+            self.warm_hits += warm
+        return dict(session.describe(), warm=warm)
+
+    @staticmethod
+    def _responsive(session):
+        """A ready browser can have crashed while it waited"""
+        try:
+            session.driver.current_window_handle
+            return True
+        except WebDriverException:
+            return False
+
+    def release(self, lease_id):
+        with self.lock:
+            session = self.leased.pop(lease_id, None)
+            self.lock.notify_all()
+        if session is not None:
+            self.retire(session)
+        return session is not None
+
+    def refill_loop(self):
+        """Top up every spec's ready sessions; launches run in parallel"""
+        while self.running:
+            with self.lock:
+                missing = [(key, self.pool_size - len(sessions) - self.launching.get(key, 0))
+                           for key, sessions in self.ready.items()]
+                for key, count in missing:
+                    if count > 0:
+                        self.launching[key] = self.launching.get(key, 0) + count
+                if not any(count > 0 for _, count in missing):
+                    self.lock.wait(1.0)
+                    continue
+            for key, count in missing:
+                for _ in range(max(0, count)):
+                    threading.Thread(target=self._launch_ready, args=(key,), daemon=True).start()
+
+    def _launch_ready(self, key):
+        try:
+            session = self.launch(json.loads(key))
+        except Exception as e:
+            print(f"Launch failed: {str(e).strip()[:200]}", flush=True)
+            time.sleep(5)
+            session = None
+        with self.lock:
+            self.launching[key] -= 1
+            if session is not None and self.running:
+                self.ready[key].append(session)
+                session = None
+            self.lock.notify_all()
+        if session is not None:
+            self.retire(session)
+
+    def reap_loop(self):
+        """Take back sessions whose leasing process has exited without releasing them"""
+        while self.running:
+            time.sleep(5)
+            with self.lock:
+                orphaned = [lease for lease, session in self.leased.items() if not self._alive(session.pid)]
+            for lease in orphaned:
+                self.release(lease)
+
+    @staticmethod
+    def _alive(pid):
+        if not pid:
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def status(self):
+        with self.lock:
+            return {
+                "pool_size": self.pool_size, "served": self.served, "warm_hits": self.warm_hits,
+                "leased": len(self.leased),
+                "specs": [{"spec": json.loads(key), "ready": len(sessions), "launching": self.launching.get(key, 0),
+                           "launch_seconds": [round(s.launch_seconds, 2) for s in sessions]}
+                          for key, sessions in self.ready.items()],
+            }
+
+    def warm(self, spec):
+        with self.lock:
+            self.ready.setdefault(self.key(spec), [])
+            self.lock.notify_all()
+
+    def shutdown(self):
+        self.running = False
+        with self.lock:
+            sessions = [s for group in self.ready.values() for s in group] + list(self.leased.values())
+            self.ready, self.leased = {}, {}
+        for session in sessions:
+            self.retire(session)
+
+
+class BrowserDaemonHandler(BaseHTTPRequestHandler):
+
+    browser_daemon = None
+    server_ref = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/status":
+            return self._json(200, self.browser_daemon.status())
+        self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        try:
+            if self.path == "/lease":
+                return self._json(200, self.browser_daemon.lease(body["spec"], body.get("pid")))
+            if self.path == "/release":
+                return self._json(200, {"released": self.browser_daemon.release(body.get("lease"))})
+            if self.path == "/shutdown":
+                self._json(200, {"ok": True})
+                threading.Thread(target=self.server_ref.shutdown, daemon=True).start()
+                return None
+        except (KeyError, OSError, WebDriverException) as e:
+            return self._json(500, {"error": f"{type(e).__name__}: {str(e).strip()[:200]}"})
+        self._json(404, {"error": "not found"})
+
+    def _json(self, status, data):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def serve(daemon, port, specs):
+    class Handler(BrowserDaemonHandler):
+        pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    Handler.browser_daemon, Handler.server_ref = daemon, server
+    for spec in specs:
+        daemon.warm(spec)
+    threading.Thread(target=daemon.refill_loop, name="refill", daemon=True).start()
+    threading.Thread(target=daemon.reap_loop, name="reaper", daemon=True).start()
+    print(f"Browser daemon on 127.0.0.1:{port}, keeping {daemon.pool_size} sessions per spec "
+          f"(profiles in {daemon.profile_root or tempfile.gettempdir()})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep pre-launched Chrome sessions for pytest runs to attach to")
+    parser.add_argument("--port", type=int, default=Config.BROWSER_DAEMON_PORT)
+    parser.add_argument("--pool", type=int, default=Config.BROWSER_DAEMON_POOL, help="ready sessions per spec")
+    parser.add_argument("--browser-profile", choices=("default", "performance"), default=Config.BROWSER_PROFILE,
+                        help="warm sessions for this profile up front")
+    parser.add_argument("--headed", action="store_true", help="warm headed sessions instead of headless ones")
+    parser.add_argument("--status", action="store_true", help="show a running daemon's pools and exit")
+    parser.add_argument("--stop", action="store_true", help="stop a running daemon")
+    args = parser.parse_args(argv)
+
+    client = DaemonClient(port=args.port, timeout=10)
+    if args.status or args.stop:
+        try:
+            print(json.dumps(client.call("POST", "/shutdown") if args.stop else client.status(), indent=2))
+        except ConnectionRefusedError:
+            print(f"No browser daemon on port {args.port}")
+            return 1
+        return 0
+
+    Config.HEADLESS = not args.headed
+    Config.BROWSER_PROFILE = args.browser_profile
+    serve(BrowserDaemon(args.pool), args.port, [DriverFactory.chrome_spec()])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""Resume a failed multi-step test from its last good checkpoint.
+
+Steps are declared with the ``checkpoints`` fixture's decorator, which runs
+the step on the spot (inside the usual timeline ``step``):
+
+    @checkpoints.step("STEP 3: CLICK CHECKOUT", checkpoint=True)
+    def checkout():
+        cart_page.click_checkout()
+
+After a checkpoint step passes, the URL, cookies, localStorage and
+sessionStorage are captured. When the test then fails, the last checkpoint
+and the failing step are saved to Config.CHECKPOINT_FILE. The next run of
+that test restores the checkpoint, skips the steps up to it and continues
+from the step after it, and is reported as a resumed attempt. A pass clears
+the entry; ``--full-replay`` ignores it, and so does a run against another
+origin than Config.BASE_URL had when it was saved (the stand-in shop gets a
+new port every run). A checkpoint that cannot be restored is dropped, the
+browser goes back to the state the fixtures left it in and every step runs.
+Only checkpoint after steps whose outcome lives in that state (a typed-in
+form field does not).
+"""
+import json
+import os
+import time
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+from config.config import Config
+from utilities.session_cache import AuthenticatedSession, SessionCache
+from utilities.settle import SettleDetector
+from utilities.timeline import log, step
+
+
+class CheckpointMismatch(Exception):
+    """Raised when the test's steps no longer match the ones the checkpoint was taken in"""
+
+
+class CheckpointStore:
+
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, nodeid, max_age=None, origin=None):
+        """The saved entry for nodeid, or None when there is none, it is too old or from another origin"""
+        entry = self.read().get(nodeid)
+        max_age = Config.CHECKPOINT_MAX_AGE if max_age is None else max_age
+        if entry is None or time.time() - entry["checkpoint"]["saved"] > max_age:
+            return None
+        if origin is not None and entry.get("origin") != origin:
+            return None
+        return entry
+
+    def update(self, nodeid, entry):
+        """Set (or with None, drop) one test's entry; other workers' entries are kept"""
+        entries = self.read()
+        if entry is None and nodeid not in entries:
+            return
+        if entry is None:
+            entries.pop(nodeid, None)
+        else:
+            entries[nodeid] = entry
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class ResumableFlow:
+
+    def __init__(self, driver, nodeid, store, resume=True):
+        self.driver = driver
+        self.nodeid = nodeid
+        self.store = store
+        self.origin = self._origin(Config.BASE_URL)
+        self.entry = store.get(nodeid, origin=self.origin) if resume else None
+        self.index = 0
+        self.names = []
+        self.checkpoint = self.entry["checkpoint"] if self.entry else None
+        self.current = None
+        self.resumed_from = None
+
+    def step(self, name, checkpoint=False):
+        """Decorator: run the step now, or skip it when resuming past it"""
+        def run(action):
+            position = self.index
+            self.index += 1
+            self.names.append(name)
+            if self.entry is not None and position == 0:
+                self._resume()
+            if self.entry is not None and position <= self.entry["checkpoint"]["index"]:
+                self._skip(name, position)
+                return None
+            with step(name):
+                self.current = name
+                result = action()
+            self.current = None
+            if checkpoint:
+                self.checkpoint = {"step": name, "index": position, "steps": list(self.names),
+                                   "state": self.capture(), "saved": time.time()}
+            return result
+        return run
+
+    def _resume(self):
+        """Restore the saved checkpoint, or fall back to a full replay if the app rejects it"""
+        checkpoint = self.entry["checkpoint"]
+        start = self.capture()
+        try:
+            self.restore(checkpoint["state"])
+            restored = urlsplit(self.driver.current_url).path == urlsplit(checkpoint["state"]["url"]).path
+            problem = f"landed on {self.driver.current_url}"
+        except WebDriverException as e:
+            restored, problem = False, f"{type(e).__name__}: {(e.msg or '').strip()}"
+        if not restored:
+            log(f"Checkpoint '{checkpoint['step']}' no longer valid ({problem}), replaying all steps")
+            self.store.update(self.nodeid, None)
+            self.entry = self.checkpoint = None
+            self.restore(start)
+            return
+        self.resumed_from = checkpoint["step"]
+        log(f"Resumed from checkpoint '{checkpoint['step']}' (last failed at '{self.entry['failed_step']}')")
+
+    def _skip(self, name, position):
+        expected = self.entry["checkpoint"]["steps"][position]
+        if expected != name:
+            self.store.update(self.nodeid, None)
+            self.entry = None
+            raise CheckpointMismatch(f"Step {position + 1} is now {name!r}, checkpoint was taken after "
+                                     f"{expected!r}; run again (or with --full-replay)")
+        log(f"Skipping '{name}' (restored from checkpoint)")
+
+    def capture(self):
+        local_storage, session_storage = self.driver.execute_script(SessionCache.READ_STORAGE_SCRIPT)
+        cookies = AuthenticatedSession(self.driver.get_cookies(), {}, {}, None).cookies
+        return {"url": self.driver.current_url, "cookies": cookies,
+                "local_storage": local_storage, "session_storage": session_storage}
+
+    def restore(self, state):
+        """Replace the browser's state with state and reopen its URL"""
+        if self._origin(self.driver.current_url) != self._origin(state["url"]):
+            self.driver.get(state["url"])
+        self.driver.delete_all_cookies()
+        self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        for cookie in state["cookies"]:
+            self.driver.add_cookie(cookie)
+        self.driver.execute_script(SessionCache.WRITE_STORAGE_SCRIPT, state["local_storage"], state["session_storage"])
+        self.driver.get(state["url"])
+        SettleDetector(self.driver).wait()
+
+    def finish(self, failed):
+        """Save the last checkpoint and failing step, or clear them after a pass"""
+        if not failed:
+            self.store.update(self.nodeid, None)
+        elif self.checkpoint is not None and self.current is not None:
+            self.store.update(self.nodeid, {"checkpoint": self.checkpoint, "failed_step": self.current,
+                                            "origin": self.origin})
+
+    @staticmethod
+    def _origin(url):
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
@@ -0,0 +1,176 @@
+"""Count and time WebDriver commands and sleeps per page-object method.
+
+The profiler wraps ``driver.execute`` (every WebDriver and WebElement
+command goes through it) and ``time.sleep``. Each call is attributed to the
+outermost page-object method on the stack, so ``CartPage.click_checkout``
+owns the commands its ``click_element`` helper sends. Calls made outside
+page objects go to the outermost utilities method (e.g. the session cache),
+or to ``<test>``.
+
+Time is split into categories per method:
+
+* ``cmd:<name>`` - each WebDriver command, e.g. ``cmd:findElement``
+* ``implicit_wait_miss`` - find commands that came back empty, i.e. sat
+  out the implicit wait (also counted under their ``cmd:`` entry)
+* ``sleep`` - explicit ``time.sleep`` calls
+* ``wait_poll`` - sleeps between polls, in WebDriverWait or our own helpers
+"""
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from selenium.common.exceptions import NoSuchElementException
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(ROOT_DIR, "pages") + os.sep
+UTILITIES_DIR = os.path.join(ROOT_DIR, "utilities") + os.sep
+WAIT_MODULE_SUFFIX = os.path.join("support", "wait.py")
+
+FIND_COMMANDS = {"findElement", "findElements", "findChildElement", "findChildElements"}
+
+
+def _new_test_stats():
+    return defaultdict(lambda: defaultdict(lambda: [0, 0.0]))
+
+
+class CommandProfiler:
+
+    def __init__(self):
+        self.current = None
+        self.current_nodeid = None
+        self.started = None
+        self.tests = {}
+        self._original_sleep = None
+
+    def install(self, driver):
+        """Route driver's commands through the profiler (idempotent)"""
+        if getattr(driver, "_command_profiler", None) is self:
+            return driver
+        original_execute = driver.execute
+        profiler = self
+
+        def execute(driver_command, params=None):
+            if profiler.current is None:
+                return original_execute(driver_command, params)
+            started = time.perf_counter()
+            missed = False
+            try:
+                response = original_execute(driver_command, params)
+                if driver_command in FIND_COMMANDS and not (response or {}).get("value"):
+                    missed = True
+                return response
+            except NoSuchElementException:
+                missed = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                owner = profiler._owner()
+                profiler._add(owner, "cmd:" + driver_command, elapsed)
+                if missed:
+                    profiler._add(owner, "implicit_wait_miss", elapsed)
+
+        driver.execute = execute
+        driver._command_profiler = self
+        return driver
+
+    def start_test(self, nodeid):
+        self.current = _new_test_stats()
+        self.current_nodeid = nodeid
+        self.started = time.perf_counter()
+        if self._original_sleep is None:
+            self._original_sleep = time.sleep
+            time.sleep = self._sleep
+
+    def finish_test(self):
+        """Stop recording and return the breakdown for the test just run"""
+        if self.current is None:
+            return None
+        breakdown = {
+            "duration": time.perf_counter() - self.started,
+            "methods": {
+                owner: {category: {"count": count, "seconds": seconds}
+                        for category, (count, seconds) in sorted(categories.items())}
+                for owner, categories in sorted(self.current.items())
+            },
+        }
+        self.tests[self.current_nodeid] = breakdown
+        self.current = None
+        self.current_nodeid = None
+        return breakdown
+
+    def uninstall_sleep(self):
+        if self._original_sleep is not None:
+            time.sleep = self._original_sleep
+            self._original_sleep = None
+
+    def _sleep(self, seconds):
+        if self.current is None:
+            return self._original_sleep(seconds)
+        started = time.perf_counter()
+        try:
+            return self._original_sleep(seconds)
+        finally:
+            caller = sys._getframe(1).f_code.co_filename
+            polling = caller.endswith(WAIT_MODULE_SUFFIX) or caller.startswith(UTILITIES_DIR)
+            category = "wait_poll" if polling else "sleep"
+            self._add(self._owner(), category, time.perf_counter() - started)
+
+    def _add(self, owner, category, seconds):
+        entry = self.current[owner][category]
+        entry[0] += 1
+        entry[1] += seconds
+
+    @staticmethod
+    def _owner():
+        page_frame = utility_frame = None
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(PAGES_DIR):
+                page_frame = frame
+            elif filename.startswith(UTILITIES_DIR) and filename != __file__:
+                utility_frame = frame
+            frame = frame.f_back
+        chosen = page_frame or utility_frame
+        if chosen is None:
+            return "<test>"
+        code = chosen.f_code
+        return getattr(code, "co_qualname", code.co_name)
+
+    def write(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.tests, f, indent=2, sort_keys=True)
+
+    def summary(self):
+        """Per-method totals across all recorded tests, slowest first"""
+        totals = defaultdict(lambda: {"commands": 0, "command_s": 0.0, "script_s": 0.0,
+                                      "implicit_miss_s": 0.0, "sleep_s": 0.0, "wait_poll_s": 0.0})
+        for breakdown in self.tests.values():
+            for owner, categories in breakdown["methods"].items():
+                row = totals[owner]
+                for category, entry in categories.items():
+                    if category.startswith("cmd:"):
+                        row["commands"] += entry["count"]
+                        row["command_s"] += entry["seconds"]
+                        if category.startswith("cmd:executeScript") or category.startswith("cmd:executeAsyncScript"):
+                            row["script_s"] += entry["seconds"]
+                    elif category == "implicit_wait_miss":
+                        row["implicit_miss_s"] += entry["seconds"]
+                    elif category == "sleep":
+                        row["sleep_s"] += entry["seconds"]
+                    elif category == "wait_poll":
+                        row["wait_poll_s"] += entry["seconds"]
+        return sorted(totals.items(), key=lambda item: -(item[1]["command_s"] + item[1]["sleep_s"] + item[1]["wait_poll_s"]))
+
+    def summary_lines(self):
+        header = f"{'method':45} {'cmds':>6} {'cmd s':>8} {'script s':>8} {'miss s':>8} {'sleep s':>8} {'poll s':>8}"
+        lines = [header, "-" * len(header)]
+        for owner, row in self.summary():
+            lines.append(
+                f"{owner[:45]:45} {row['commands']:6d} {row['command_s']:8.2f} {row['script_s']:8.2f} "
+                f"{row['implicit_miss_s']:8.2f} {row['sleep_s']:8.2f} {row['wait_poll_s']:8.2f}")
+        return lines
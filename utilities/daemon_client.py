@@ -0,0 +1,85 @@
+"""Client side of the warm browser daemon (see utilities.browser_daemon).
+
+``lease`` asks the daemon for a ready Chrome session matching a browser
+spec and attaches to it. It first checks, within
+Config.BROWSER_DAEMON_PROBE_TIMEOUT, that a daemon is answering, and returns
+None when none is or its replies make no sense, so callers simply launch a
+browser themselves. Quitting an
+attached driver hands the session back to the daemon, which throws it away
+and launches a fresh one in the background.
+"""
+import http.client
+import json
+import os
+from selenium import webdriver
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+from selenium.webdriver.remote.command import Command
+from config.config import Config
+
+
+class AttachedChrome(webdriver.Remote):
+    """A Chrome session the daemon launched, driven as if this process had started it"""
+
+    def __init__(self, client, lease):
+        self.daemon = client
+        self.lease = lease
+        super().__init__(command_executor=ChromeRemoteConnection(lease["executor"]), options=webdriver.ChromeOptions())
+        self._is_remote = False
+
+    def start_session(self, capabilities):
+        self.session_id = self.lease["session_id"]
+        self.caps = self.lease["capabilities"]
+
+    def get_log(self, log_type):
+        return self.execute(Command.GET_LOG, {"type": log_type})["value"]
+
+    def quit(self):
+        self.daemon.release(self.lease["lease"])
+
+
+class DaemonClient:
+
+    def __init__(self, host="127.0.0.1", port=None, timeout=120):
+        self.host = host
+        self.port = port or Config.BROWSER_DAEMON_PORT
+        self.timeout = timeout
+
+    def call(self, method, path, payload=None):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request(method, path, json.dumps(payload or {}), {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            data = json.loads(response.read() or b"{}")
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise RuntimeError(f"Browser daemon {path}: {data.get('error', response.status)}")
+        return data
+
+    def probe(self):
+        """Whether a daemon answers /status quickly; a refused, reset or half-open connection does not"""
+        quick = DaemonClient(self.host, self.port, Config.BROWSER_DAEMON_PROBE_TIMEOUT)
+        try:
+            return "pool_size" in quick.status()
+        except (OSError, ValueError, RuntimeError):
+            return False
+
+    def lease(self, spec):
+        """An attached driver for spec, or None when no daemon is running or it cannot serve one"""
+        if not self.probe():
+            return None
+        try:
+            lease = self.call("POST", "/lease", {"spec": spec, "pid": os.getpid()})
+            return AttachedChrome(self, lease)
+        except (OSError, ValueError, KeyError, RuntimeError):
+            return None
+
+    def release(self, lease_id):
+        try:
+            self.call("POST", "/release", {"lease": lease_id})
+        except (OSError, RuntimeError):
+            # The daemon also reclaims leases of processes that have exited
+            pass
+
+    def status(self):
+        return self.call("GET", "/status")
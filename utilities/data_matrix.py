@@ -0,0 +1,194 @@
+"""Run rows of checkout data through the checkout form in one logged-in browser.
+
+Rows come from a CSV file (with a header) or a JSONL file and are read one
+line at a time, so a file of any size costs the same memory. A row has
+``first_name``, ``last_name`` and ``postcode`` and optionally ``id``,
+``expect`` ("accept" or "reject") and ``expect_error`` (text the
+validation message must contain). The matrix logs in and seeds the cart
+once, opens checkout, and from then on only reloads the checkout step
+between rows: fill, Continue, then read whether the form moved on to the
+overview or showed a validation message. Finish is never clicked, so the
+cart and the session stay as they are for the next row.
+
+Each row is a ``step`` and one line of a CSV results table, written as the
+row finishes. ``--data-shard=I/N`` keeps only the rows whose position is I
+modulo N; the command below starts N pytest workers, one shard each, and
+merges their tables.
+
+    pytest tests/test_cart.py -k data_matrix --checkout-data=data/checkout_rows.csv
+    python -m utilities.data_matrix data/checkout_rows.csv -n 4
+"""
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from config.config import Config
+from pages.cart_page import CartPage
+from utilities.timeline import log, step
+
+FIELDS = ("first_name", "last_name", "postcode")
+RESULT_COLUMNS = ("row", "id", *FIELDS, "expect", "outcome", "message", "seconds", "result")
+
+
+def read_rows(path, shard=0, shards=1):
+    """Yield (position, row) for the rows of a CSV or JSONL file that belong to shard"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for position, row in enumerate(rows):
+            if position % shards == shard:
+                yield position, row
+
+
+def parse_shard(value):
+    """"I/N" -> (I, N), with 0 <= I < N"""
+    try:
+        shard, shards = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Expected a shard like 0/4, got {value!r}")
+    if not 0 <= shard < shards:
+        raise ValueError(f"Shard {shard} is outside 0..{shards - 1}")
+    return shard, shards
+
+
+def results_path(shard, shards, path=None):
+    """Where one shard writes its table; shard 0/1 writes straight to Config.MATRIX_RESULTS_FILE"""
+    path = path or Config.MATRIX_RESULTS_FILE
+    if shards == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard-{shard}-of-{shards}{ext}"
+
+
+class CheckoutMatrix:
+
+    def __init__(self, driver, results_file):
+        self.driver = driver
+        self.cart_page = CartPage(driver)
+        self.results_file = results_file
+        self.checkout_url = None
+        self.form_fresh = False
+        self.counts = Counter()
+        self.mismatches = []
+
+    def open_checkout(self):
+        """From the products page with a seeded cart, go to the checkout step and remember its URL"""
+        self.cart_page.click_cart_icon()
+        self.cart_page.click_checkout()
+        self.checkout_url = self.driver.current_url
+        self.form_fresh = True
+
+    def run(self, rows):
+        """Drive every (position, row) through the form; returns the outcome counts"""
+        directory = os.path.dirname(self.results_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        errors_in_a_row = 0
+        with open(self.results_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, RESULT_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            for position, row in rows:
+                result = self.run_row(position, row)
+                writer.writerow(result)
+                f.flush()
+                errors_in_a_row = errors_in_a_row + 1 if result["result"] == "error" else 0
+                if errors_in_a_row >= Config.MATRIX_MAX_CONSECUTIVE_ERRORS:
+                    raise RuntimeError(f"Stopped after {errors_in_a_row} rows in a row failed to run; "
+                                       f"last: {result['message']}")
+        return self.counts
+
+    def run_row(self, position, row):
+        row_id = row.get("id") or str(position + 1)
+        values = {name: "" if row.get(name) is None else str(row[name]) for name in FIELDS}
+        expect = (row.get("expect") or "").strip().lower()
+        started = time.perf_counter()
+        with step(f"ROW {row_id}") as args:
+            try:
+                if not self.form_fresh:
+                    self.cart_page.reopen_checkout(self.checkout_url)
+                self.form_fresh = False
+                self.cart_page.fill_checkout_form(values["first_name"], values["last_name"], values["postcode"])
+                outcome, message = self.cart_page.submit_checkout_form()
+            except Exception as e:
+                outcome, message = "error", f"{type(e).__name__}: {str(e).strip()[:200]}"
+            result = self.judge(outcome, message, expect, row.get("expect_error"))
+            args.update(outcome=outcome, result=result)
+        self.counts[result] += 1
+        line = {"row": position, "id": row_id, **values, "expect": expect, "outcome": outcome,
+                "message": message, "seconds": round(time.perf_counter() - started, 3), "result": result}
+        if result in ("fail", "error"):
+            self.mismatches.append(line)
+        log(f"  Row {row_id}: {outcome}{' - ' + message if message else ''} [{result}]")
+        return line
+
+    @staticmethod
+    def judge(outcome, message, expect, expect_error=None):
+        """pass/fail against the row's expectation, "-" when it has none, "error" when the row did not run"""
+        if outcome == "error":
+            return "error"
+        if not expect:
+            return "-"
+        expected_outcome = {"accept": "accepted", "reject": "rejected"}.get(expect, expect)
+        if outcome != expected_outcome:
+            return "fail"
+        if expect_error and expect_error.lower() not in message.lower():
+            return "fail"
+        return "pass"
+
+
+def merge_results(paths, output):
+    """Concatenate shard tables into one, ordered by row position"""
+    rows = []
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                rows.extend(csv.DictReader(f))
+    rows.sort(key=lambda row: int(row["row"]))
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, RESULT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return Counter(row["result"] for row in rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a checkout data file across several pytest workers")
+    parser.add_argument("data", help="CSV or JSONL file of checkout rows")
+    parser.add_argument("-n", "--workers", type=int, default=2)
+    parser.add_argument("--output", default=Config.MATRIX_RESULTS_FILE, help="merged results table")
+    parser.add_argument("--headed", action="store_true", help="show the browsers instead of running headless")
+    args, pytest_args = parser.parse_known_args(argv)
+    if pytest_args[:1] == ["--"]:
+        pytest_args = pytest_args[1:]
+
+    started = time.perf_counter()
+    workers = []
+    for shard in range(args.workers):
+        command = [sys.executable, "-m", "pytest", "tests/test_cart.py::test_checkout_data_matrix",
+                   f"--checkout-data={args.data}", f"--data-shard={shard}/{args.workers}",
+                   f"--matrix-results={args.output}", "--no-step-console", "-q", *pytest_args]
+        if not args.headed:
+            command.append("--headless")
+        env = dict(os.environ, PARALLEL_WORKER=str(shard))
+        workers.append(subprocess.Popen(command, env=env))
+    codes = [worker.wait() for worker in workers]
+
+    paths = [results_path(shard, args.workers, args.output) for shard in range(args.workers)]
+    counts = merge_results(paths, args.output)
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+    print(f"{sum(counts.values())} rows on {args.workers} workers in {time.perf_counter() - started:.1f}s: "
+          + ", ".join(f"{counts[r]} {r}" for r in ("pass", "fail", "error", "-") if counts[r]))
+    print(f"Results: {args.output}")
+    return max(codes)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
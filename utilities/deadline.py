@@ -0,0 +1,99 @@
+"""Time budgets for tests and steps that every nested wait draws from.
+
+Each test gets Config.TEST_BUDGET seconds and each ``step`` inside it
+Config.STEP_BUDGET (or ``step(name, budget=...)``), never more than what
+is left of the enclosing budget. Waits ask ``remaining(timeout)`` instead of
+using their own timeout as-is, so a fallback cascade that already burned
+most of a step cannot stack further full-length waits on top; once the
+budget is spent, probes still look once but no longer wait.
+
+Budgets follow the timeline's test/step spans, so tests need no extra code.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from config.config import Config
+from utilities.timeline import timeline
+
+
+class Deadline:
+
+    def __init__(self, name, seconds, parent=None):
+        self.name = name
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+        if parent is not None:
+            self.expires = min(self.expires, parent.expires)
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    def __repr__(self):
+        return f"Deadline({self.name!r}, {self.remaining():.1f}s left)"
+
+
+class Budgets:
+    """Per-thread stack of nested deadlines"""
+
+    DEFAULTS = {"test": "TEST_BUDGET", "step": "STEP_BUDGET"}
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def push(self, name, seconds):
+        deadline = Deadline(name, seconds, self.current())
+        self._stack().append(deadline)
+        return deadline
+
+    def pop(self):
+        return self._stack().pop()
+
+    @contextmanager
+    def budget(self, name, seconds):
+        deadline = self.push(name, seconds)
+        try:
+            yield deadline
+        finally:
+            self.pop()
+
+    def remaining(self, timeout):
+        """timeout, cut down to what the innermost budget has left"""
+        deadline = self.current()
+        return timeout if deadline is None else min(timeout, deadline.remaining())
+
+    def limiting(self, timeout):
+        """The deadline that cuts timeout short, or None when timeout fits"""
+        deadline = self.current()
+        if deadline is not None and deadline.remaining() < timeout:
+            return deadline
+        return None
+
+    def on_span(self, kind, name, category, data):
+        if category not in self.DEFAULTS:
+            return
+        if kind == "begin":
+            self.push(name, data.get("budget") or getattr(Config, self.DEFAULTS[category]))
+        else:
+            self.pop()
+
+
+budgets = Budgets()
+timeline.add_listener(budgets.on_span)
+
+
+def remaining(timeout):
+    return budgets.remaining(timeout)
+
+
+def budget(name, seconds):
+    return budgets.budget(name, seconds)
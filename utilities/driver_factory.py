@@ -0,0 +1,133 @@
+from selenium import webdriver
+from config.config import Config
+from utilities.daemon_client import DaemonClient
+from utilities.resource_blocker import ResourceBlocker
+from utilities.settle import SettleDetector
+from utilities.step_metrics import StepMetrics
+from utilities.timeline import log
+
+PERFORMANCE_ARGS = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--no-first-run",
+    "--mute-audio",
+)
+
+# Firefox has no CDP request blocking; the performance profile turns images and web fonts off instead
+FIREFOX_PERFORMANCE_PREFS = {
+    "permissions.default.image": 2,
+    "gfx.downloadable_fonts.enabled": False,
+    "media.autoplay.default": 5,
+}
+
+SUPPORTED_BROWSERS = ("chrome", "firefox")
+
+
+class DriverFactory:
+
+    @staticmethod
+    def chrome_spec():
+        """Chrome arguments and capabilities for the current Config, as plain JSON data"""
+        performance = Config.BROWSER_PROFILE == "performance"
+        arguments = []
+        if Config.HEADLESS or performance:
+            arguments.append("--headless=new")
+            arguments.append("--window-size={},{}".format(*Config.WINDOW_SIZE))
+        if performance:
+            arguments.extend(PERFORMANCE_ARGS)
+        # Chrome buffers console and network events; they are only fetched
+        # by ResourceReport or when the flight recorder captures a failure
+        logging_prefs = {}
+        if Config.FLIGHT_RECORDER:
+            logging_prefs["browser"] = "ALL"
+        if performance or Config.RECORD_HTTP_DIR or (Config.FLIGHT_RECORDER and Config.FLIGHT_RECORDER_NETWORK):
+            logging_prefs["performance"] = "ALL"
+        capabilities = {"goog:loggingPrefs": logging_prefs} if logging_prefs else {}
+        return {"browser": "chrome", "arguments": arguments, "capabilities": capabilities}
+
+    @staticmethod
+    def firefox_spec():
+        """Firefox arguments and preferences for the current Config, as plain JSON data"""
+        performance = Config.BROWSER_PROFILE == "performance"
+        arguments = []
+        if Config.HEADLESS or performance:
+            arguments.append("-headless")
+            arguments.extend(["--width={}".format(Config.WINDOW_SIZE[0]), "--height={}".format(Config.WINDOW_SIZE[1])])
+        preferences = dict(FIREFOX_PERFORMANCE_PREFS) if performance else {}
+        return {"browser": "firefox", "arguments": arguments, "preferences": preferences, "capabilities": {}}
+
+    @staticmethod
+    def spec(browser=None):
+        browser = browser or Config.BROWSER
+        if browser == "chrome":
+            return DriverFactory.chrome_spec()
+        if browser == "firefox":
+            return DriverFactory.firefox_spec()
+        raise ValueError(f"Unsupported browser: {browser} (expected one of {', '.join(SUPPORTED_BROWSERS)})")
+
+    @staticmethod
+    def chrome_options(spec):
+        options = webdriver.ChromeOptions()
+        for argument in spec["arguments"]:
+            options.add_argument(argument)
+        for name, value in spec["capabilities"].items():
+            options.set_capability(name, value)
+        return options
+
+    @staticmethod
+    def firefox_options(spec):
+        options = webdriver.FirefoxOptions()
+        for argument in spec["arguments"]:
+            options.add_argument(argument)
+        for name, value in spec["preferences"].items():
+            options.set_preference(name, value)
+        for name, value in spec["capabilities"].items():
+            options.set_capability(name, value)
+        return options
+
+    @staticmethod
+    def options(spec):
+        if spec["browser"] == "firefox":
+            return DriverFactory.firefox_options(spec)
+        return DriverFactory.chrome_options(spec)
+
+    @staticmethod
+    def create(browser=None):
+        """Launch a browser configured the way the tests expect and open BASE_URL
+
+        With Config.GRID_URL the session is started on that Selenium Grid.
+        Otherwise, with Config.BROWSER_DAEMON, a ready Chrome session from a
+        running browser daemon is used instead of launching one, when there
+        is a daemon.
+        """
+        spec = DriverFactory.spec(browser)
+        chrome = spec["browser"] == "chrome"
+        performance = Config.BROWSER_PROFILE == "performance"
+        headless = Config.HEADLESS or performance
+        driver = None
+        if Config.GRID_URL:
+            driver = webdriver.Remote(command_executor=Config.GRID_URL, options=DriverFactory.options(spec))
+        elif chrome and Config.BROWSER_DAEMON:
+            try:
+                driver = DaemonClient().lease(spec)
+            except (OSError, ValueError, RuntimeError) as e:
+                log(f"  Browser daemon unusable ({type(e).__name__}: {str(e)[:100]}); launching a browser instead")
+        if driver is None:
+            options = DriverFactory.options(spec)
+            driver = webdriver.Chrome(options=options) if chrome else webdriver.Firefox(options=options)
+
+        # Start-of-document scripts, metrics and request blocking go through CDP, i.e. Chrome only
+        if chrome:
+            SettleDetector.register(driver)
+            if Config.STEP_METRICS:
+                StepMetrics.register(driver)
+            if performance:
+                driver.resource_blocker = ResourceBlocker(driver)
+                driver.resource_blocker.apply()
+        driver.get(Config.BASE_URL)
+        if not headless:
+            driver.maximize_window()
+        # Sessions keep the default implicit wait of 0 and nothing sets one: lookups and waits
+        # poll explicitly, and an implicit wait would stretch every find_element miss inside them
+        return driver
@@ -0,0 +1,92 @@
+import threading
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+from config.config import Config
+from utilities.timeline import log
+
+
+class DriverPool:
+    """Keeps launched browsers alive between tests and resets them instead.
+
+    A driver handed back with ``release`` is reset to a clean state (single
+    tab, no cookies, empty web storage, on BASE_URL). Only a driver whose
+    reset fails is quit and replaced on the next ``acquire``. Safe to share
+    between threads; launching and resetting happen outside the lock.
+    """
+
+    CLEAR_STORAGE_SCRIPT = """
+        try { window.localStorage.clear(); } catch (e) {}
+        try { window.sessionStorage.clear(); } catch (e) {}
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.idle = []
+        self.in_use = []
+        self.launched = 0
+        self.recycled = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Return a clean driver, launching one only when none is idle"""
+        with self.lock:
+            driver = self.idle.pop() if self.idle else None
+        launched = driver is None
+        if launched:
+            driver = self.factory()
+        with self.lock:
+            self.launched += launched
+            self.in_use.append(driver)
+        return driver
+
+    def release(self, driver):
+        """Reset the driver for the next test, or recycle it if that fails"""
+        with self.lock:
+            self.in_use.remove(driver)
+        try:
+            self.reset(driver)
+        except WebDriverException as e:
+            log(f"  Driver reset failed, recycling browser: {str(e)[:100]}")
+            self.discard(driver)
+            return False
+        with self.lock:
+            self.idle.append(driver)
+        return True
+
+    def reset(self, driver):
+        """Close extra tabs, clear cookies and web storage, go back to BASE_URL"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        # Web storage is per origin, so clear it from a page on the app's origin
+        if self._origin(driver.current_url) != self._origin(Config.BASE_URL):
+            driver.get(Config.BASE_URL)
+        driver.execute_script(self.CLEAR_STORAGE_SCRIPT)
+        driver.delete_all_cookies()
+        driver.get(Config.BASE_URL)
+
+    @staticmethod
+    def _origin(url):
+        parts = urlsplit(url)
+        return (parts.scheme, parts.netloc)
+
+    def discard(self, driver):
+        with self.lock:
+            self.recycled += 1
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def quit_all(self):
+        with self.lock:
+            drivers = self.idle + self.in_use
+            self.idle, self.in_use = [], []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
@@ -0,0 +1,60 @@
+import json
+import os
+
+
+class DurationStore:
+    """Per-test wall times from earlier runs, kept as a JSON map of node id to seconds.
+
+    New measurements are blended into the stored value so one slow outlier
+    does not reshuffle the next run's schedule.
+    """
+
+    def __init__(self, path, smoothing=0.5):
+        self.path = path
+        self.smoothing = smoothing
+        self.durations = self._read(path)
+
+    @staticmethod
+    def _read(path):
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def key(nodeid, browser=None):
+        """Chrome timings keep the plain node id; other browsers get their own entry"""
+        return nodeid if browser in (None, "chrome") else f"{nodeid}@{browser}"
+
+    def get(self, nodeid, default=None):
+        return self.durations.get(nodeid, default)
+
+    def default_duration(self, fallback):
+        """Estimate for tests that have never been timed: the mean of known tests"""
+        if not self.durations:
+            return fallback
+        return sum(self.durations.values()) / len(self.durations)
+
+    def record(self, nodeid, seconds):
+        previous = self.durations.get(nodeid)
+        if previous is None:
+            self.durations[nodeid] = seconds
+        else:
+            self.durations[nodeid] = self.smoothing * previous + (1 - self.smoothing) * seconds
+
+    def merge_file(self, path):
+        """Fold in measurements another process wrote to its own file"""
+        for nodeid, seconds in self._read(path).items():
+            self.record(nodeid, seconds)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.durations, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,225 @@
+"""Keep the recent history of a test in memory and dump it to disk when it fails.
+
+While a test runs, a bounded ring buffer collects timeline events (tests,
+steps, page-object actions, log messages) and every WebDriver command with
+its duration and outcome. Console messages and network events are collected
+by Chrome itself (``goog:loggingPrefs`` browser/performance logs, fed from
+its CDP Runtime/Network domains) and only fetched when they are needed.
+
+On a passing test nothing is fetched or written, so the cost is the
+bookkeeping above, which the recorder times itself and reports in the
+terminal summary. On a failure the screenshot and DOM are grabbed while the
+browser still shows the failing state; turning logs into a HAR and writing
+files happens on a background thread, flushed at the end of the session:
+
+    artifacts/<test>/screenshot.png, dom.html, console.json, network.har, events.json
+"""
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from selenium.common.exceptions import WebDriverException
+from config.config import Config
+from utilities.timeline import timeline
+
+
+def read_log(driver, log_type):
+    """Drain one of Chrome's log buffers, or [] when it is not being recorded (or not Chrome)"""
+    try:
+        return driver.get_log(log_type)
+    except (AttributeError, WebDriverException):
+        return []
+
+
+def har_from_performance_log(entries, since_ms=0):
+    """Build a HAR 1.2 document from Chrome performance-log Network events"""
+    requests = {}
+    order = []
+    for entry in entries:
+        if entry.get("timestamp", 0) < since_ms:
+            continue
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method", ""), message.get("params", {})
+        if not method.startswith("Network."):
+            continue
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            requests[request_id] = {"request": params["request"], "wall_time": params.get("wallTime"),
+                                    "started": params.get("timestamp"), "ended": None,
+                                    "response": None, "size": 0, "error": None}
+            order.append(request_id)
+        elif request_id in requests:
+            record = requests[request_id]
+            if method == "Network.responseReceived":
+                record["response"] = params["response"]
+            elif method == "Network.loadingFinished":
+                record["ended"] = params.get("timestamp")
+                record["size"] = int(params.get("encodedDataLength", 0))
+            elif method == "Network.loadingFailed":
+                record["ended"] = params.get("timestamp")
+                record["error"] = params.get("blockedReason") or params.get("errorText")
+
+    def headers(mapping):
+        return [{"name": name, "value": str(value)} for name, value in (mapping or {}).items()]
+
+    har_entries = []
+    for request_id in order:
+        record = requests[request_id]
+        request, response = record["request"], record["response"] or {}
+        elapsed = ((record["ended"] or record["started"] or 0) - (record["started"] or 0)) * 1000
+        started = datetime.fromtimestamp(record["wall_time"] or 0, timezone.utc).isoformat()
+        har_entries.append({
+            "startedDateTime": started,
+            "time": round(elapsed, 3),
+            "request": {"method": request.get("method", "GET"), "url": request.get("url", ""),
+                        "httpVersion": response.get("protocol", ""), "headers": headers(request.get("headers")),
+                        "queryString": [], "cookies": [], "headersSize": -1, "bodySize": -1},
+            "response": {"status": response.get("status", 0), "statusText": response.get("statusText", ""),
+                         "httpVersion": response.get("protocol", ""), "headers": headers(response.get("headers")),
+                         "cookies": [], "content": {"size": record["size"], "mimeType": response.get("mimeType", "")},
+                         "redirectURL": "", "headersSize": -1, "bodySize": record["size"]},
+            "cache": {},
+            "timings": {"send": 0, "wait": round(elapsed, 3), "receive": 0},
+            "_error": record["error"],
+        })
+    return {"log": {"version": "1.2", "creator": {"name": "flight_recorder", "version": "1"},
+                    "entries": har_entries}}
+
+
+class FlightRecorder:
+
+    def __init__(self, capacity=None, directory=None):
+        self.events = deque(maxlen=capacity or Config.FLIGHT_RECORDER_EVENTS)
+        self.directory = directory or Config.ARTIFACTS_DIR
+        self.recording = False
+        self.nodeid = None
+        self.started_ms = 0
+        self.overhead = 0.0
+        self.tests = 0
+        self.captured = []
+        self._writes = queue.Queue()
+        self._writer = None
+        timeline.add_listener(self._on_timeline)
+
+    def install(self, driver):
+        """Route driver's commands through the recorder (idempotent)"""
+        if getattr(driver, "_flight_recorder", None) is self:
+            return driver
+        original_execute = driver.execute
+        recorder = self
+
+        def execute(driver_command, params=None):
+            if not recorder.recording:
+                return original_execute(driver_command, params)
+            started = time.perf_counter()
+            error = None
+            try:
+                return original_execute(driver_command, params)
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e)[:120]}"
+                raise
+            finally:
+                finished = time.perf_counter()
+                recorder.events.append(("command", time.time(), driver_command, round(finished - started, 4), error))
+                recorder.overhead += time.perf_counter() - finished
+
+        driver.execute = execute
+        driver._flight_recorder = self
+        return driver
+
+    def _on_timeline(self, kind, name, category, data):
+        if self.recording:
+            started = time.perf_counter()
+            self.events.append((kind, time.time(), name, category, None))
+            self.overhead += time.perf_counter() - started
+
+    def start_test(self, nodeid, driver):
+        self.install(driver)
+        self.events.clear()
+        self.nodeid = nodeid
+        self.started_ms = time.time() * 1000
+        self.recording = True
+        self.tests += 1
+
+    def finish_test(self, driver, failed, performance_log=None):
+        """Stop recording; on failure snapshot the browser and queue the artifacts
+
+        A passing test's network log is drained and dropped, so it does not
+        pile up in chromedriver across tests on a reused browser.
+        """
+        self.recording = False
+        if not failed:
+            if Config.FLIGHT_RECORDER_NETWORK and performance_log is None:
+                started = time.perf_counter()
+                read_log(driver, "performance")
+                self.overhead += time.perf_counter() - started
+            return None
+        path = os.path.join(self.directory, re.sub(r"[^\w.-]+", "_", self.nodeid).strip("_"))
+        capture = {"path": path, "nodeid": self.nodeid, "events": list(self.events), "since_ms": self.started_ms}
+        try:
+            capture["screenshot"] = driver.get_screenshot_as_png()
+            capture["dom"] = driver.page_source
+            capture["url"] = driver.current_url
+        except WebDriverException as e:
+            capture["error"] = f"{type(e).__name__}: {str(e)[:200]}"
+        capture["console"] = read_log(driver, "browser")
+        capture["performance"] = read_log(driver, "performance") if performance_log is None else performance_log
+        self._queue(capture)
+        self.captured.append(path)
+        return path
+
+    def _queue(self, capture):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="flight-recorder", daemon=True)
+            self._writer.start()
+        self._writes.put(capture)
+
+    def _write_loop(self):
+        while True:
+            capture = self._writes.get()
+            try:
+                if capture is not None:
+                    self.write(capture)
+            finally:
+                self._writes.task_done()
+
+    def flush(self):
+        """Wait until every queued failure has been written"""
+        if self._writer is not None:
+            self._writes.join()
+
+    @staticmethod
+    def write(capture):
+        path = capture["path"]
+        os.makedirs(path, exist_ok=True)
+        if capture.get("screenshot"):
+            with open(os.path.join(path, "screenshot.png"), "wb") as f:
+                f.write(capture["screenshot"])
+        if capture.get("dom") is not None:
+            with open(os.path.join(path, "dom.html"), "w", encoding="utf-8") as f:
+                f.write(capture["dom"])
+        since = capture["since_ms"]
+        console = [entry for entry in capture["console"] if entry.get("timestamp", 0) >= since]
+        with open(os.path.join(path, "console.json"), "w") as f:
+            json.dump(console, f, indent=2)
+        with open(os.path.join(path, "network.har"), "w") as f:
+            json.dump(har_from_performance_log(capture["performance"], since), f)
+        events = [{"kind": kind, "time": at, "name": name, "detail": detail, "error": error}
+                  for kind, at, name, detail, error in capture["events"]]
+        with open(os.path.join(path, "events.json"), "w") as f:
+            json.dump({"nodeid": capture["nodeid"], "url": capture.get("url"),
+                       "capture_error": capture.get("error"), "events": events}, f, indent=2)
+
+    def summary_lines(self, test_seconds):
+        per_test = self.overhead / self.tests * 1000 if self.tests else 0.0
+        share = self.overhead / test_seconds * 100 if test_seconds else 0.0
+        network = ("network capture on; includes draining the performance log, not Chrome's own logging"
+                   if Config.FLIGHT_RECORDER_NETWORK else "network capture off")
+        lines = [f"Recorded {self.tests} test(s); bookkeeping overhead {self.overhead * 1000:.1f} ms "
+                 f"({per_test:.2f} ms/test, {share:.3f}% of test time; {network})"]
+        lines += [f"Failure artifacts: {path}" for path in self.captured]
+        return lines
@@ -0,0 +1,223 @@
+"""Run the suite in several browsers on a Selenium Grid started on this machine.
+
+Start the Grid first, e.g. ``java -jar selenium-server-<version>.jar standalone``
+(or a hub plus ``node`` processes). Its ``/status`` lists every node's slots
+per browser, which are in use and how many sessions the node allows at once.
+Every collected test runs once per browser in Config.GRID_BROWSERS, queued
+per browser longest first by the durations recorded for that browser (a test
+not timed in that browser yet is estimated from its Chrome time).
+
+Whenever the Grid has a free slot for a browser with tests left, a headless
+pytest worker is started for that browser with the next batch; a worker
+holds one session at a time, so it occupies one slot. Batches shrink as the
+queue empties, so the run ends on short tests and slots finish close
+together. Sessions someone else started on the Grid count against the
+capacity, and the Grid is re-read as workers finish.
+
+    python -m utilities.grid_runner --grid-url http://localhost:4444 [--browsers chrome firefox] [-- pytest args]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from urllib.error import URLError
+from urllib.request import urlopen
+from config.config import Config
+from utilities.driver_factory import SUPPORTED_BROWSERS
+from utilities.duration_store import DurationStore
+from utilities.parallel_runner import ParallelRunner
+
+
+class GridCapacity:
+    """Session slots per browser on a Grid's UP nodes, read from /status"""
+
+    def __init__(self, url, timeout=10):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def nodes(self):
+        with urlopen(f"{self.url}/status", timeout=self.timeout) as response:
+            status = json.load(response)["value"]
+        nodes = []
+        for node in status.get("nodes", []):
+            if node.get("availability") != "UP":
+                continue
+            slots, busy = Counter(), Counter()
+            for slot in node.get("slots", []):
+                browser = slot.get("stereotype", {}).get("browserName")
+                slots[browser] += 1
+                if slot.get("session"):
+                    busy[browser] += 1
+            nodes.append({"id": node.get("id"), "uri": node.get("uri"), "slots": slots, "busy": busy,
+                          "max_sessions": node.get("maxSessions") or sum(slots.values())})
+        return nodes
+
+    @staticmethod
+    def total(nodes):
+        """Sessions each browser could run at once if the Grid were idle"""
+        total = Counter()
+        for node in nodes:
+            for browser, count in node["slots"].items():
+                total[browser] += min(count, node["max_sessions"])
+        return total
+
+    @staticmethod
+    def free(nodes, running):
+        """Sessions each browser can start now, given the workers already running per browser
+
+        A worker that is still starting has no session yet, and a busy slot
+        may belong to someone else; whichever count is higher is in use.
+        """
+        busy = Counter()
+        for node in nodes:
+            busy.update(node["busy"])
+        headroom = sum(min(node["max_sessions"], sum(node["slots"].values())) for node in nodes)
+        headroom -= max(sum(busy.values()), sum(running.values()))
+        total = GridCapacity.total(nodes)
+        return {browser: max(0, min(count - max(busy[browser], running[browser]), headroom))
+                for browser, count in total.items()}
+
+
+class GridRunner(ParallelRunner):
+
+    def __init__(self, grid_url, browsers, pytest_args=None, durations_file=Config.DURATIONS_FILE,
+                 report_file=Config.PARALLEL_REPORT_FILE, headless=True):
+        super().__init__(None, pytest_args, durations_file, report_file, headless)
+        self.grid_url = grid_url
+        self.browsers = list(browsers)
+        self.capacity = GridCapacity(grid_url)
+        self.queues = {}
+        self.slots = Counter()
+        self.default = self.store.default_duration(Config.DEFAULT_TEST_DURATION)
+
+    def estimate(self, nodeid, browser):
+        estimate = self.store.get(DurationStore.key(nodeid, browser))
+        if estimate is None:
+            estimate = self.store.get(nodeid, self.default)
+        return estimate
+
+    def next_batch(self, browser):
+        """Longest tests first; keep adding until the batch is half a slot's fair share of what is left"""
+        queue = self.queues[browser]
+        target = sum(self.estimate(nodeid, browser) for nodeid in queue) / (2 * max(1, self.slots[browser]))
+        batch = [queue.pop(0)]
+        load = self.estimate(batch[0], browser)
+        while queue and load < target:
+            batch.append(queue.pop(0))
+            load += self.estimate(batch[-1], browser)
+        return batch
+
+    def run(self):
+        nodeids = self.collect()
+        if not nodeids:
+            print("No tests collected")
+            return 5
+        try:
+            nodes = self.capacity.nodes()
+        except (OSError, URLError, ValueError) as e:
+            print(f"Cannot read {self.grid_url}/status: {e}")
+            return 1
+        self.slots = GridCapacity.total(nodes)
+        missing = [browser for browser in self.browsers if not self.slots[browser]]
+        if missing:
+            print(f"The Grid has no slots for {', '.join(missing)}; nodes offer {dict(self.slots) or 'nothing'}")
+            return 1
+
+        self.queues = {browser: sorted(nodeids, key=lambda nodeid: self.estimate(nodeid, browser), reverse=True)
+                       for browser in self.browsers}
+        workdir = tempfile.mkdtemp(prefix="grid-run-")
+        print(f"Running {len(nodeids)} tests in {', '.join(self.browsers)} on {len(nodes)} Grid node(s) "
+              f"with {', '.join(f'{self.slots[b]} {b}' for b in self.browsers)} slot(s)")
+
+        started = polled = time.time()
+        running, finished = [], []
+        busy_seconds = Counter()
+        not_started = 0
+        while running or any(self.queues.values()):
+            for worker in [w for w in running if w["process"].poll() is not None]:
+                worker["log_file"].close()
+                worker["elapsed"] = time.time() - started
+                busy_seconds[worker["browser"]] += worker["elapsed"] - worker["started"]
+                running.remove(worker)
+                finished.append(worker)
+                nodes = None
+            if any(self.queues.values()):
+                if nodes is None or time.time() - polled >= Config.GRID_POLL_INTERVAL:
+                    try:
+                        nodes = self.capacity.nodes()
+                    except (OSError, URLError, ValueError) as e:
+                        if not running:
+                            not_started = sum(map(len, self.queues.values()))
+                            print(f"Lost the Grid ({e}); {not_started} test runs not started")
+                            break
+                        nodes = []
+                    polled = time.time()
+                self._fill_slots(nodes, running, len(running) + len(finished), workdir, started)
+            time.sleep(0.2)
+        elapsed = time.time() - started
+
+        if not finished:
+            return 1
+        for worker in finished:
+            self.store.merge_file(worker["durations"])
+        self.store.save()
+        finished.sort(key=lambda w: w["number"])
+        self._write_report(finished, elapsed)
+        self._print_output(finished, elapsed)
+        for browser in self.browsers:
+            print(f"{browser}: {busy_seconds[browser] / (self.slots[browser] * elapsed) * 100:.0f}% of "
+                  f"{self.slots[browser]} slot(s) busy")
+        shutil.rmtree(workdir, ignore_errors=True)
+        return max([worker["process"].returncode for worker in finished] + [1 if not_started else 0])
+
+    def _fill_slots(self, nodes, running, number, workdir, started):
+        """Start workers while a browser with tests left has a free slot, most work per slot first"""
+        while True:
+            free = GridCapacity.free(nodes, Counter(worker["browser"] for worker in running))
+            waiting = [browser for browser in self.browsers if self.queues[browser] and free.get(browser, 0) > 0]
+            if not waiting:
+                return
+            browser = max(waiting, key=lambda b: sum(self.estimate(n, b) for n in self.queues[b]) / self.slots[b])
+            worker = self._start_worker(number, self.next_batch(browser), workdir, browser)
+            worker["started"] = time.time() - started
+            running.append(worker)
+            number += 1
+
+    def _start_worker(self, index, shard, workdir, browser=None):
+        paths = {name: os.path.join(workdir, f"worker-{index}.{name}") for name in ("xml", "log", "durations")}
+        command = [
+            sys.executable, "-m", "pytest", *shard, *self.worker_args,
+            f"--browser={browser}", f"--grid-url={self.grid_url}",
+            f"--junitxml={paths['xml']}",
+            f"--durations-file={paths['durations']}",
+        ]
+        if self.headless:
+            command.append("--headless")
+        # Numeric, since the timeline uses it as the worker's thread id in merged traces
+        env = dict(os.environ, PARALLEL_WORKER=str(index))
+        log_file = open(paths["log"], "w")
+        process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT, env=env)
+        return {"index": f"{browser}-{index}", "number": index, "browser": browser, "tests": shard, "process": process, "log_file": log_file, **paths}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grid-url", default=Config.GRID_URL or "http://localhost:4444")
+    parser.add_argument("--browsers", nargs="+", choices=SUPPORTED_BROWSERS, default=list(Config.GRID_BROWSERS))
+    parser.add_argument("--durations-file", default=Config.DURATIONS_FILE)
+    parser.add_argument("--report", default=Config.PARALLEL_REPORT_FILE)
+    parser.add_argument("--headed", action="store_true", help="show the browsers instead of running headless")
+    args, pytest_args = parser.parse_known_args(argv)
+    if pytest_args[:1] == ["--"]:
+        pytest_args = pytest_args[1:]
+    runner = GridRunner(args.grid_url, args.browsers, pytest_args, args.durations_file, args.report, not args.headed)
+    return runner.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Record the HTTP requests behind a browser flow as a replayable scenario.
+
+While a test runs, Chrome logs its Network events (CDP, through the
+``goog:loggingPrefs`` performance log). At the end of a passing test the
+recorder keeps the document/XHR/fetch requests to the app's own origin,
+labels each with the step and page-object action it was sent from (so the
+calls behind ``DashboardPage.select_sort_option`` or ``click_finish`` stay
+identifiable) and writes them to Config.RECORD_HTTP_DIR/<test>.json:
+
+- the login credentials become ``${email}``/``${password}`` variables;
+- values a response handed out (JSON fields, headers) that a later request
+  sends back are replaced by ``${name}`` plus an ``extract`` rule on the
+  response they came from, so each replayed session uses its own;
+- cookies are left to the replaying session's cookie jar;
+- the gaps between requests are kept as think times.
+
+    pytest tests/test_cart.py --record-http=scenarios
+    python -m utilities.http_replay scenarios/<test>.json --standin --sessions 2000
+"""
+import base64
+import json
+import os
+import re
+import time
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+from config.config import Config
+from utilities.timeline import timeline
+
+# Request headers the replaying client sets itself or that only make sense in a browser
+DROPPED_REQUEST_HEADERS = {"cookie", "host", "content-length", "connection", "accept-encoding",
+                           "user-agent", "referer", "origin", "upgrade-insecure-requests"}
+# Response headers that never carry a value the client has to send back
+IGNORED_RESPONSE_HEADERS = {"date", "content-type", "content-length", "cache-control", "server",
+                            "connection", "set-cookie", "keep-alive", "expires", "vary"}
+MIN_CORRELATED_LENGTH = 8
+
+
+def flatten(value, path=()):
+    """(path, value) for every string/number leaf of a JSON document"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, path + (str(key),))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from flatten(item, path + (str(index),))
+    elif isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        yield path, value
+
+
+class HttpRecorder:
+
+    def __init__(self, directory=None, resource_types=None):
+        self.directory = directory or Config.RECORD_HTTP_DIR
+        self.resource_types = set(resource_types or Config.RECORD_RESOURCE_TYPES)
+        self.recording = False
+        self.nodeid = None
+        self.started = 0.0
+        self.labels = []
+        self.stack = []
+        self.saved = []
+        timeline.add_listener(self._on_timeline)
+
+    def _on_timeline(self, kind, name, category, data):
+        if not self.recording or category not in ("step", "action"):
+            return
+        if kind == "begin":
+            self.stack.append(name)
+        elif kind == "end" and self.stack:
+            self.stack.pop()
+        else:
+            return
+        self.labels.append((time.time(), " > ".join(self.stack)))
+
+    def start_test(self, nodeid):
+        self.nodeid = nodeid
+        self.started = time.time()
+        self.labels = [(self.started, "")]
+        self.stack = []
+        self.recording = True
+
+    def finish_test(self, driver, performance_log, failed):
+        """Turn the test's network log into a scenario file; None when it failed or sent nothing"""
+        self.recording = False
+        if failed:
+            return None
+        requests = self.requests(performance_log, Config.BASE_URL)
+        if not requests:
+            return None
+        self.fetch_bodies(driver, requests)
+        scenario = self.scenario(requests)
+        path = os.path.join(self.directory, re.sub(r"[^\w.-]+", "_", self.nodeid).strip("_") + ".json")
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(scenario, f, indent=2)
+        self.saved.append(path)
+        return path
+
+    def label_at(self, wall_time):
+        label = ""
+        for at, name in self.labels:
+            if at > wall_time:
+                break
+            label = name
+        return label
+
+    def requests(self, entries, base_url):
+        """The test's same-origin requests of the recorded types, in the order they were sent"""
+        origin = urlsplit(base_url)[:2]
+        records = {}
+        order = []
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method, params = message.get("method", ""), message.get("params", {})
+            request_id = params.get("requestId")
+            if method == "Network.requestWillBeSent":
+                if request_id in records and params.get("redirectResponse"):
+                    # The same id continues a redirect chain: close the previous hop
+                    previous = records.pop(request_id)
+                    previous["status"] = params["redirectResponse"]["status"]
+                    previous["ended"] = params.get("timestamp")
+                request = params["request"]
+                if params.get("wallTime", 0) < self.started or params.get("type") not in self.resource_types:
+                    continue
+                if urlsplit(request["url"])[:2] != origin:
+                    continue
+                record = {"id": request_id, "method": request["method"], "url": request["url"],
+                          "headers": request.get("headers", {}), "body": self._post_data(request),
+                          "wall_time": params["wallTime"], "started": params.get("timestamp"),
+                          "ended": None, "status": None, "response_headers": {}}
+                records[request_id] = record
+                order.append(record)
+            elif request_id in records:
+                record = records[request_id]
+                if method == "Network.responseReceived":
+                    record["status"] = params["response"]["status"]
+                    record["response_headers"] = params["response"].get("headers", {})
+                elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                    record["ended"] = params.get("timestamp")
+        return [record for record in order if record["status"] is not None]
+
+    @staticmethod
+    def _post_data(request):
+        if "postData" in request:
+            return request["postData"]
+        entries = request.get("postDataEntries") or []
+        if entries:
+            return b"".join(base64.b64decode(e.get("bytes", "")) for e in entries).decode("utf-8", "replace")
+        return None
+
+    @staticmethod
+    def fetch_bodies(driver, requests):
+        """Response bodies, for finding values later requests send back (best effort)"""
+        for record in requests:
+            try:
+                result = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": record["id"]})
+            except WebDriverException:
+                record["response_body"] = None
+                continue
+            body = result.get("body", "")
+            record["response_body"] = base64.b64decode(body).decode("utf-8", "replace") \
+                if result.get("base64Encoded") else body
+
+    def scenario(self, requests):
+        """Parameterize and correlate the recorded requests into a scenario document"""
+        base = urlsplit(Config.BASE_URL)
+        variables = {"email": Config.EMAIL, "password": Config.PASSWORD}
+        produced = []
+        steps = []
+        previous_end = None
+        for index, record in enumerate(requests):
+            url = urlsplit(record["url"])
+            target = url.path + (f"?{url.query}" if url.query else "")
+            headers = {name: value for name, value in record["headers"].items()
+                       if name.lower() not in DROPPED_REQUEST_HEADERS and not name.lower().startswith("sec-")}
+            body = record["body"]
+
+            def parameterize(text):
+                if text is None:
+                    return None
+                for name, value in variables.items():
+                    if value:
+                        text = text.replace(str(value), "${" + name + "}")
+                for value, name, source, rule in produced:
+                    if value in text:
+                        text = text.replace(value, "${" + name + "}")
+                        steps[source]["extract"][name] = rule
+                return text
+
+            think = 0.0
+            if previous_end is not None and record["started"] is not None:
+                think = max(0.0, record["started"] - previous_end)
+            previous_end = record["ended"] or record["started"]
+            steps.append({
+                "name": f"{record['method']} {url.path}",
+                "label": self.label_at(record["wall_time"]),
+                "method": record["method"],
+                "target": parameterize(target),
+                "headers": {name: parameterize(value) for name, value in headers.items()},
+                "body": parameterize(body),
+                "expect_status": record["status"],
+                "think_time": round(think, 3),
+                "extract": {},
+            })
+            produced.extend(self._produced_values(index, record, variables))
+        return {
+            "name": self.nodeid,
+            "recorded": time.time(),
+            "base_url": f"{base.scheme}://{base.netloc}",
+            "variables": variables,
+            "requests": steps,
+        }
+
+    @staticmethod
+    def _produced_values(index, record, variables):
+        """(value, variable name, request index, extract rule) for values worth correlating"""
+        known = {str(value) for value in variables.values()}
+        found = []
+        body = record.get("response_body")
+        headers = {name.lower(): str(value) for name, value in record["response_headers"].items()}
+        if body and "json" in headers.get("content-type", ""):
+            try:
+                document = json.loads(body)
+            except ValueError:
+                document = None
+            for path, value in flatten(document):
+                found.append((str(value), path[-1] if path else "value", {"json": ".".join(path)}))
+        for name, value in headers.items():
+            if name not in IGNORED_RESPONSE_HEADERS:
+                found.append((value, name, {"header": name}))
+        return [(value, re.sub(r"\W+", "_", f"{name}_{index}"), index, rule)
+                for value, name, rule in found
+                if len(value) >= MIN_CORRELATED_LENGTH and value not in known]
+
+    def summary_lines(self):
+        return [f"Scenario: {path}" for path in self.saved]
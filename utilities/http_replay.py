@@ -0,0 +1,323 @@
+"""Replay a recorded HTTP scenario as thousands of concurrent browserless sessions.
+
+Each session is an asyncio task with its own keep-alive connection, cookie
+jar and variables: the scenario's defaults, overridden by ``--var`` and by
+one row of ``--data`` (CSV, rows handed out round robin, ``${session}`` is
+the session number). Requests run in recorded order with their think times
+(scaled by ``--think-scale``); ``extract`` rules take values from responses
+for the requests after them. A session stops at its first failed request.
+Latency is reported per request as percentiles and a histogram:
+
+    python -m utilities.http_replay scenarios/<test>.json --standin --sessions 2000 --concurrency 500
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import re
+import ssl
+import sys
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+from config.config import Config
+from utilities.standin_shop import StandinShop
+from utilities.stats import percentile
+
+VARIABLE_RE = re.compile(r"\$\{(\w+)\}")
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class ReplayError(Exception):
+    """Raised when a replayed request fails or its response is not the recorded one"""
+
+
+class LatencyHistogram:
+    """Latency samples of one request, bucketed on a roughly logarithmic scale"""
+
+    def __init__(self, bounds_ms=HISTOGRAM_BOUNDS_MS):
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.samples = []
+        self.errors = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        milliseconds = seconds * 1000
+        index = next((i for i, bound in enumerate(self.bounds_ms) if milliseconds <= bound), len(self.bounds_ms))
+        self.counts[index] += 1
+
+    def summary(self):
+        return {
+            "count": len(self.samples),
+            "errors": self.errors,
+            **{f"p{q}": percentile(self.samples, q) for q in (50, 95, 99)},
+            "max": max(self.samples) if self.samples else None,
+            "buckets": {**{f"<={bound}ms": count for bound, count in zip(self.bounds_ms, self.counts)},
+                        f">{self.bounds_ms[-1]}ms": self.counts[-1]},
+        }
+
+
+class HttpConnection:
+    """Minimal HTTP/1.1 keep-alive client connection on asyncio streams"""
+
+    def __init__(self, base_url, timeout=Config.REPLAY_TIMEOUT):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self.netloc = url.netloc
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def request(self, method, target, headers, body):
+        """Send one request; returns (status, [(header, value)], body bytes)"""
+        for attempt in (1, 2):
+            fresh = self.writer is None
+            if fresh:
+                self.reader, self.writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout)
+            try:
+                return await asyncio.wait_for(self._exchange(method, target, headers, body), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # The server may close an idle keep-alive connection; retry once on a new one
+                await self.close()
+                if fresh or attempt == 2:
+                    raise
+
+    async def _exchange(self, method, target, headers, body):
+        payload = body.encode() if body is not None else b""
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.netloc}", f"Content-Length: {len(payload)}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+        response_headers = []
+        while True:
+            line = (await self.reader.readline()).decode("latin-1").rstrip("\r\n")
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            response_headers.append((name.strip().lower(), value.strip()))
+        fields = dict(response_headers)
+        if fields.get("transfer-encoding", "").lower() == "chunked":
+            data = b""
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                data += await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                data = data[:-2]
+            await self._skip_trailers()
+        elif "content-length" in fields:
+            data = await self.reader.readexactly(int(fields["content-length"]))
+        elif method == "HEAD" or status in (204, 304):
+            data = b""
+        else:
+            data = await self.reader.read()
+            fields["connection"] = "close"
+        if fields.get("connection", "").lower() == "close":
+            await self.close()
+        return status, response_headers, data
+
+    async def _skip_trailers(self):
+        while (await self.reader.readline()).strip():
+            pass
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+        self.reader = self.writer = None
+
+
+class ReplaySession:
+    """One virtual user: a connection, a cookie jar and the variables it has extracted"""
+
+    def __init__(self, number, base_url, variables):
+        self.number = number
+        self.connection = HttpConnection(base_url)
+        self.cookies = {}
+        self.variables = dict(variables, session=str(number))
+
+    def substitute(self, text):
+        if text is None:
+            return None
+        return VARIABLE_RE.sub(lambda match: str(self.variables.get(match.group(1), match.group(0))), text)
+
+    def store_cookies(self, headers):
+        for name, value in headers:
+            if name != "set-cookie":
+                continue
+            pair = value.split(";", 1)[0]
+            key, _, cookie_value = pair.partition("=")
+            max_age = re.search(r"max-age=(-?\d+)", value, re.IGNORECASE)
+            if cookie_value == "" or (max_age and int(max_age.group(1)) <= 0):
+                self.cookies.pop(key.strip(), None)
+            else:
+                self.cookies[key.strip()] = cookie_value.strip()
+
+    def extract(self, rules, headers, body):
+        """Store the values the extract rules point at; a missing value fails the session"""
+        document = None
+        for name, rule in rules.items():
+            if "header" in rule:
+                value = dict(headers).get(rule["header"])
+            else:
+                if document is None:
+                    document = json.loads(body or b"null")
+                value = document
+                for key in rule["json"].split(".") if rule["json"] else ():
+                    value = value[int(key)] if isinstance(value, list) else (value or {}).get(key)
+            if value is None:
+                raise ReplayError(f"nothing to extract for ${{{name}}} ({rule})")
+            self.variables[name] = value
+
+
+class ReplayEngine:
+
+    def __init__(self, scenario, sessions=Config.REPLAY_SESSIONS, concurrency=Config.REPLAY_CONCURRENCY,
+                 ramp_up=0.0, think_scale=1.0, base_url=None, variables=None, data_rows=None):
+        self.scenario = scenario
+        self.sessions = sessions
+        self.concurrency = concurrency
+        self.ramp_up = ramp_up
+        self.think_scale = think_scale
+        self.base_url = base_url or scenario["base_url"]
+        self.variables = dict(scenario.get("variables", {}), **(variables or {}))
+        self.data_rows = list(data_rows or [])
+        self.histograms = defaultdict(LatencyHistogram)
+        self.failures = defaultdict(int)
+        self.completed = 0
+        self.elapsed = 0.0
+
+    def run(self):
+        return asyncio.run(self._run())
+
+    async def _run(self):
+        started = time.perf_counter()
+        limit = asyncio.Semaphore(self.concurrency)
+        rows = itertools.cycle(self.data_rows) if self.data_rows else itertools.repeat({})
+
+        async def launch(number, row):
+            await asyncio.sleep(self.ramp_up * number / self.sessions)
+            async with limit:
+                await self.session(ReplaySession(number, self.base_url, dict(self.variables, **row)))
+
+        await asyncio.gather(*(launch(number, next(rows)) for number in range(self.sessions)))
+        self.elapsed = time.perf_counter() - started
+        return self.report()
+
+    async def session(self, session):
+        try:
+            for request in self.scenario["requests"]:
+                if request["think_time"] and self.think_scale:
+                    await asyncio.sleep(request["think_time"] * self.think_scale)
+                await self.send(session, request)
+            self.completed += 1
+        except Exception as e:
+            self.failures[f"{type(e).__name__}: {str(e)[:100]}"] += 1
+        finally:
+            await session.connection.close()
+
+    async def send(self, session, request):
+        histogram = self.histograms[request["name"]]
+        headers = {name: session.substitute(value) for name, value in request["headers"].items()}
+        if session.cookies:
+            headers["Cookie"] = "; ".join(f"{key}={value}" for key, value in session.cookies.items())
+        started = time.perf_counter()
+        try:
+            status, response_headers, body = await session.connection.request(
+                request["method"], session.substitute(request["target"]), headers, session.substitute(request["body"]))
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            histogram.errors += 1
+            raise
+        histogram.add(time.perf_counter() - started)
+        if status != request["expect_status"]:
+            histogram.errors += 1
+            raise ReplayError(f"{request['name']} returned {status}, recorded {request['expect_status']}")
+        session.store_cookies(response_headers)
+        session.extract(request["extract"], response_headers, body)
+
+    def report(self):
+        requests_sent = sum(len(h.samples) for h in self.histograms.values())
+        return {
+            "scenario": self.scenario["name"], "sessions": self.sessions, "concurrency": self.concurrency,
+            "completed": self.completed, "elapsed": self.elapsed,
+            "requests_per_second": requests_sent / self.elapsed if self.elapsed else 0.0,
+            "requests": {name: histogram.summary() for name, histogram in self.histograms.items()},
+            "failures": dict(self.failures),
+        }
+
+
+def format_report(report):
+    lines = [f"{report['scenario']}: {report['completed']}/{report['sessions']} sessions completed "
+             f"(concurrency {report['concurrency']}) in {report['elapsed']:.1f}s, "
+             f"{report['requests_per_second']:.0f} requests/s"]
+    for name, s in report["requests"].items():
+        timings = " ".join(f"{key} {s[key] * 1000:.1f}ms" for key in ("p50", "p95", "p99", "max") if s[key] is not None)
+        lines.append(f"\n{name}  n={s['count']} errors={s['errors']}  {timings}")
+        peak = max(s["buckets"].values()) or 1
+        for bucket, count in s["buckets"].items():
+            if count:
+                lines.append(f"  {bucket:>9} {count:7d} {'#' * max(1, round(40 * count / peak))}")
+    for failure, count in sorted(report["failures"].items(), key=lambda item: -item[1]):
+        lines.append(f"  {count:6d} x {failure}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded HTTP scenario without browsers")
+    parser.add_argument("scenario", help="scenario JSON written by pytest --record-http")
+    parser.add_argument("--sessions", type=int, default=Config.REPLAY_SESSIONS)
+    parser.add_argument("--concurrency", type=int, default=Config.REPLAY_CONCURRENCY,
+                        help="sessions running at the same time")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which sessions are started")
+    parser.add_argument("--think-scale", type=float, default=1.0,
+                        help="multiply recorded think times (0 = none)")
+    parser.add_argument("--base-url", help="send the requests here instead of the recorded origin")
+    parser.add_argument("--standin", action="store_true", help="start the local stand-in shop and replay against it")
+    parser.add_argument("--latency-ms", type=float, default=Config.STANDIN_LATENCY_MS,
+                        help="artificial stand-in latency per request")
+    parser.add_argument("--var", action="append", default=[], metavar="NAME=VALUE",
+                        help="override a scenario variable")
+    parser.add_argument("--data", help="CSV whose rows (header = variable names) are handed to sessions in turn")
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.scenario) as f:
+        scenario = json.load(f)
+    variables = dict(item.split("=", 1) for item in args.var)
+    rows = []
+    if args.data:
+        with open(args.data, newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    shop = None
+    base_url = args.base_url
+    if args.standin:
+        shop = StandinShop(latency=args.latency_ms / 1000.0).start()
+        base_url = shop.base_url
+    try:
+        report = ReplayEngine(scenario, args.sessions, args.concurrency, args.ramp_up, args.think_scale,
+                              base_url, variables, rows).run()
+    finally:
+        if shop is not None:
+            shop.stop()
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["completed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Run the checkout flow as concurrent virtual users against the stand-in shop.
+
+Each virtual user is a thread driving its own headless browser from a
+shared DriverPool, through the same page objects the tests use: UI login,
+add Sample Shirt to the cart, check out and finish. Users start evenly
+spread over the ramp-up; with a target rate, iteration starts are handed
+out on a fixed schedule shared by all users (an iteration that could not
+start on time because every user was busy is counted as late), otherwise
+each user loops back to back. The run stops starting iterations after the
+duration and reports throughput and latency percentiles per step:
+
+    python -m utilities.load_runner --users 8 --ramp-up 20 --rate 2 --duration 120
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from selenium.common.exceptions import WebDriverException
+from config.config import Config
+from pages.cart_page import CartPage
+from pages.dashboard_page import DashboardPage
+from pages.login_page import LoginPage
+from utilities.driver_factory import DriverFactory
+from utilities.driver_pool import DriverPool
+from utilities.standin_shop import StandinShop
+from utilities.stats import percentile
+from utilities.timeline import step, timeline
+
+ITERATION = "ITERATION"
+
+
+def checkout_flow(driver):
+    """One iteration: log in through the UI, add Sample Shirt, check out and finish"""
+    login_page = LoginPage(driver)
+    dashboard = DashboardPage(driver)
+    cart_page = CartPage(driver)
+    with step("LOGIN"):
+        login_page.login(Config.EMAIL, Config.PASSWORD)
+    with step("ADD SAMPLE SHIRT TO CART"):
+        dashboard.click_add_to_cart_sample_shirt()
+    with step("NAVIGATE TO CART PAGE"):
+        cart_page.click_cart_icon()
+    with step("CLICK CHECKOUT"):
+        cart_page.click_checkout()
+    with step("FILL CHECKOUT FORM"):
+        cart_page.fill_checkout_form(first_name="John", last_name="Doe", postcode="123")
+    with step("CLICK CONTINUE"):
+        cart_page.click_continue()
+    with step("CLICK FINISH"):
+        cart_page.click_finish()
+
+
+class LoadRunner:
+
+    def __init__(self, users=Config.LOAD_USERS, ramp_up=Config.LOAD_RAMP_UP, rate=Config.LOAD_RATE,
+                 duration=Config.LOAD_DURATION, flow=checkout_flow, factory=DriverFactory.create):
+        self.users = users
+        self.ramp_up = ramp_up
+        self.rate = rate
+        self.duration = duration
+        self.flow = flow
+        self.pool = DriverPool(factory)
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.failures = defaultdict(int)
+        self.late_starts = 0
+        self.started = None
+        self.finished = None
+        self.next_start = None
+        self.lock = threading.Lock()
+        timeline.add_listener(self._on_timeline)
+
+    def _on_timeline(self, kind, name, category, data):
+        if kind != "end" or category != "step" or self.started is None:
+            return
+        with self.lock:
+            if "error" in data.get("args", {}):
+                self.errors[name] += 1
+            else:
+                self.samples[name].append(data["dur"] / 1e6)
+
+    def run(self):
+        """Run all virtual users to the end of the duration and return the report"""
+        self.started = time.monotonic()
+        self.next_start = self.started
+        threads = [threading.Thread(target=self._user, args=(index,), name=f"vu-{index + 1}", daemon=True)
+                   for index in range(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.finished = time.monotonic()
+        self.pool.quit_all()
+        return self.report()
+
+    def _user(self, index):
+        ends = self.started + self.duration
+        time.sleep(max(0.0, self.started + self.ramp_up * index / self.users - time.monotonic()))
+        driver = self._acquire()
+        while driver is not None:
+            start_at = self._claim_start()
+            if start_at >= ends:
+                break
+            time.sleep(max(0.0, start_at - time.monotonic()))
+            try:
+                # An iteration is a whole test, so give it a test's budget rather than a step's
+                with step(ITERATION, budget=Config.TEST_BUDGET):
+                    self.flow(driver)
+            except Exception as e:
+                message = str(e).strip().splitlines()[0][:80] if str(e).strip() else ""
+                with self.lock:
+                    self.failures[f"{type(e).__name__}: {message}"] += 1
+            # Reset for the next iteration; a browser that cannot be reset is replaced
+            self.pool.release(driver)
+            driver = self._acquire()
+
+    def _acquire(self):
+        try:
+            return self.pool.acquire()
+        except WebDriverException as e:
+            with self.lock:
+                self.failures[f"browser launch: {str(e).strip()[:80]}"] += 1
+            return None
+
+    def _claim_start(self):
+        """When this user may start its next iteration"""
+        now = time.monotonic()
+        if not self.rate:
+            return now
+        with self.lock:
+            start_at = self.next_start
+            self.next_start += 1.0 / self.rate
+            # More than one interval behind: every user was busy when this slot came up
+            if now - start_at > 1.0 / self.rate:
+                self.late_starts += 1
+        return start_at
+
+    def report(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        names = [ITERATION] + sorted((name for name in set(self.samples) | set(self.errors) if name != ITERATION),
+                                     key=self._step_order)
+        steps = {}
+        for name in names:
+            samples = self.samples.get(name, [])
+            steps[name] = {
+                "count": len(samples),
+                "errors": self.errors.get(name, 0),
+                "throughput": len(samples) / elapsed if elapsed else 0.0,
+                **{f"p{q}": percentile(samples, q) for q in (50, 90, 95, 99)},
+                "max": max(samples) if samples else None,
+            }
+        return {
+            "users": self.users, "ramp_up": self.ramp_up, "rate": self.rate, "duration": self.duration,
+            "elapsed": elapsed, "late_starts": self.late_starts, "browsers_launched": self.pool.launched,
+            "browsers_recycled": self.pool.recycled, "steps": steps, "failures": dict(self.failures),
+        }
+
+    def _step_order(self, name):
+        """Steps in the order the flow first completed them"""
+        order = list(self.samples) + list(self.errors)
+        return order.index(name)
+
+
+def format_report(report):
+    lines = [f"{report['users']} users, ramp-up {report['ramp_up']}s, "
+             f"rate {report['rate'] or 'unpaced'}/s, {report['elapsed']:.1f}s elapsed",
+             f"{'step':28} {'ok':>6} {'err':>5} {'per s':>7} {'p50 s':>7} {'p90 s':>7} "
+             f"{'p95 s':>7} {'p99 s':>7} {'max s':>7}"]
+    for name, s in report["steps"].items():
+        timings = " ".join(f"{s[key]:7.3f}" if s[key] is not None else f"{'-':>7}"
+                           for key in ("p50", "p90", "p95", "p99", "max"))
+        lines.append(f"{name[:28]:28} {s['count']:6d} {s['errors']:5d} {s['throughput']:7.2f} {timings}")
+    if report["late_starts"]:
+        lines.append(f"{report['late_starts']} iteration(s) started late: all users busy, add users or lower --rate")
+    for failure, count in sorted(report["failures"].items(), key=lambda item: -item[1]):
+        lines.append(f"  {count:4d} x {failure}")
+    lines.append(f"Browsers launched {report['browsers_launched']}, recycled {report['browsers_recycled']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the checkout flow as concurrent virtual users "
+                                                 "against the local stand-in shop")
+    parser.add_argument("--users", type=int, default=Config.LOAD_USERS)
+    parser.add_argument("--ramp-up", type=float, default=Config.LOAD_RAMP_UP,
+                        help="seconds over which the users are started")
+    parser.add_argument("--rate", type=float, default=Config.LOAD_RATE,
+                        help="target iterations per second across all users (0 = back to back)")
+    parser.add_argument("--duration", type=float, default=Config.LOAD_DURATION,
+                        help="seconds after which no new iteration starts")
+    parser.add_argument("--latency-ms", type=float, default=Config.STANDIN_LATENCY_MS,
+                        help="artificial server latency per request")
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    Config.HEADLESS = True
+    Config.FLIGHT_RECORDER = False
+    timeline.console = False
+    timeline.record = False
+    shop = StandinShop(latency=args.latency_ms / 1000.0).start()
+    Config.BASE_URL = shop.login_url
+    try:
+        report = LoadRunner(args.users, args.ramp_up, args.rate, args.duration).run()
+    finally:
+        shop.stop()
+    report["orders_placed"] = len(shop.orders)
+    print(format_report(report))
+    print(f"Orders placed on the stand-in shop: {report['orders_placed']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["steps"][ITERATION]["count"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Adaptive ordering for page objects that try several locators for one element.
+
+The registry remembers, per fallback group (e.g. ``CartPage.cart_icon``),
+which candidate matched and when. Later lookups try the historical winner
+first, and all candidates of a lookup are probed in a single script call so
+a miss never waits on the implicit wait. Statistics are persisted to
+Config.LOCATOR_STATS_FILE at the end of the session.
+
+    python -m utilities.locator_registry --stale-days 30
+"""
+import argparse
+import json
+import os
+import time
+from config.config import Config
+from utilities.deadline import remaining
+from utilities.snapshot import RESOLVE_LOCATOR_JS
+
+FIRST_VISIBLE_MATCH_SCRIPT = RESOLVE_LOCATOR_JS + """
+var candidates = arguments[0];
+for (var i = 0; i < candidates.length; i++) {
+    var nodes = resolveLocator(candidates[i][0], candidates[i][1]);
+    for (var j = 0; j < nodes.length; j++) {
+        if (isVisible(nodes[j])) { return [i, nodes[j]]; }
+    }
+}
+return null;
+"""
+
+
+class LocatorRegistry:
+
+    _shared = None
+
+    def __init__(self, path):
+        self.path = path
+        self.stats = self._read(path)
+        self.pending = {}
+
+    @classmethod
+    def shared(cls):
+        """Process-wide registry backed by Config.LOCATOR_STATS_FILE"""
+        if cls._shared is None:
+            cls._shared = cls(Config.LOCATOR_STATS_FILE)
+        return cls._shared
+
+    @staticmethod
+    def _read(path):
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def key(locator):
+        return f"{locator[0]}={locator[1]}"
+
+    def ordered(self, group, candidates):
+        """Candidates sorted by past hits, most recent winner first on ties"""
+        now = time.time()
+        group_stats = self.stats.setdefault(group, {})
+        for locator in candidates:
+            entry = group_stats.setdefault(self.key(locator), {"hits": 0, "last_hit": None, "first_seen": now})
+            self._pending_entry(group, locator).setdefault("first_seen", entry["first_seen"])
+
+        def rank(indexed):
+            index, locator = indexed
+            entry = group_stats[self.key(locator)]
+            return (-entry["hits"], -(entry["last_hit"] or 0), index)
+
+        return [locator for _, locator in sorted(enumerate(candidates), key=rank)]
+
+    def probe(self, driver, candidates, timeout=0):
+        """First visible match of candidates, in order: (locator, element) or (None, None)"""
+        deadline = time.time() + remaining(timeout)
+        while True:
+            match = driver.execute_script(FIRST_VISIBLE_MATCH_SCRIPT, [list(c) for c in candidates])
+            if match:
+                return candidates[match[0]], match[1]
+            if time.time() >= deadline:
+                return None, None
+            time.sleep(Config.POLL_FREQUENCY)
+
+    def find(self, driver, group, candidates, timeout=0):
+        """Find the element for group, trying the historically winning locator first"""
+        locator, element = self.probe(driver, self.ordered(group, candidates), timeout)
+        if locator is not None:
+            self.record_hit(group, locator)
+        return element
+
+    def record_hit(self, group, locator):
+        now = time.time()
+        entry = self.stats.setdefault(group, {}).setdefault(
+            self.key(locator), {"hits": 0, "last_hit": None, "first_seen": now})
+        entry["hits"] += 1
+        entry["last_hit"] = now
+        pending = self._pending_entry(group, locator)
+        pending["hits"] = pending.get("hits", 0) + 1
+        pending["last_hit"] = now
+        pending.setdefault("first_seen", entry["first_seen"])
+
+    def _pending_entry(self, group, locator):
+        return self.pending.setdefault(group, {}).setdefault(self.key(locator), {})
+
+    def stale(self, max_age_days=Config.LOCATOR_STALE_DAYS, now=None):
+        """(group, locator key, last hit) for candidates unmatched for max_age_days"""
+        now = time.time() if now is None else now
+        cutoff = now - max_age_days * 86400
+        result = []
+        for group, entries in sorted(self.stats.items()):
+            for key, entry in sorted(entries.items()):
+                seen = entry["last_hit"] if entry["last_hit"] is not None else entry["first_seen"]
+                if seen < cutoff:
+                    result.append((group, key, entry["last_hit"]))
+        return result
+
+    def save(self):
+        """Merge this process's hits into the stats file; safe with parallel workers"""
+        if not self.pending:
+            return
+        merged = self._read(self.path)
+        for group, entries in self.pending.items():
+            for key, delta in entries.items():
+                entry = merged.setdefault(group, {}).setdefault(
+                    key, {"hits": 0, "last_hit": None, "first_seen": delta["first_seen"]})
+                entry["hits"] += delta.get("hits", 0)
+                entry["first_seen"] = min(entry["first_seen"], delta["first_seen"])
+                if delta.get("last_hit") is not None:
+                    entry["last_hit"] = max(entry["last_hit"] or 0, delta["last_hit"])
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(merged, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.stats = merged
+        self.pending = {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report locator candidates that no longer match")
+    parser.add_argument("--stats-file", default=Config.LOCATOR_STATS_FILE)
+    parser.add_argument("--stale-days", type=float, default=Config.LOCATOR_STALE_DAYS)
+    args = parser.parse_args(argv)
+
+    stale = LocatorRegistry(args.stats_file).stale(args.stale_days)
+    if not stale:
+        print(f"No candidates unmatched for more than {args.stale_days:g} days")
+        return 0
+    print(f"Candidates unmatched for more than {args.stale_days:g} days:")
+    for group, key, last_hit in stale:
+        when = time.strftime("%Y-%m-%d", time.localtime(last_hit)) if last_hit else "never"
+        print(f"  {group:30} last hit {when:10}  {key}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
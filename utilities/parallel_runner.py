@@ -0,0 +1,166 @@
+"""Run the suite across several headless worker processes.
+
+Tests are assigned with the longest-processing-time-first rule using the
+durations recorded by earlier runs, so workers finish close together
+instead of waiting on whoever drew the checkout tests. Each worker is a
+plain pytest process with its own browser; their JUnit reports and output
+are merged into one report at the end.
+
+    python -m utilities.parallel_runner -n 4 [-- extra pytest args]
+"""
+import argparse
+import heapq
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from config.config import Config
+from utilities.duration_store import DurationStore
+from utilities.pytest_args import split_pytest_args
+from utilities.results_store import ResultsStore
+from utilities.timeline import Timeline
+
+
+class ParallelRunner:
+
+    def __init__(self, workers, pytest_args=None, durations_file=Config.DURATIONS_FILE,
+                 report_file=Config.PARALLEL_REPORT_FILE, headless=True, trace_file=None):
+        self.workers = workers
+        self.trace_file = trace_file
+        self.pytest_args = list(pytest_args or [])
+        # Workers get node ids, so the paths that chose them would only add the whole selection back
+        self.worker_args, _ = split_pytest_args(self.pytest_args)
+        self.store = DurationStore(durations_file)
+        if Config.RESULTS_DB and os.path.exists(Config.RESULTS_DB):
+            # Tests the durations file has not seen yet can still be estimated from the results history
+            store = ResultsStore(Config.RESULTS_DB)
+            self.store.durations = {**store.durations(), **self.store.durations}
+            store.close()
+        self.report_file = report_file
+        self.headless = headless
+
+    def collect(self):
+        """Ask pytest for the node ids it would run with the given arguments"""
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "--collect-only", "-q", *self.pytest_args],
+            capture_output=True, text=True,
+        )
+        if result.returncode == 5:
+            return []
+        if result.returncode != 0:
+            raise RuntimeError(f"Test collection failed:\n{result.stdout}{result.stderr}")
+        return [line.strip() for line in result.stdout.splitlines() if "::" in line]
+
+    def schedule(self, nodeids):
+        """Split nodeids into per-worker lists balanced by recorded duration"""
+        default = self.store.default_duration(Config.DEFAULT_TEST_DURATION)
+        estimated = sorted(nodeids, key=lambda nodeid: self.store.get(nodeid, default), reverse=True)
+        shards = [[] for _ in range(self.workers)]
+        loads = [(0.0, index) for index in range(self.workers)]
+        for nodeid in estimated:
+            load, index = heapq.heappop(loads)
+            shards[index].append(nodeid)
+            heapq.heappush(loads, (load + self.store.get(nodeid, default), index))
+        return [shard for shard in shards if shard]
+
+    def run(self):
+        nodeids = self.collect()
+        if not nodeids:
+            print("No tests collected")
+            return 5
+        shards = self.schedule(nodeids)
+        workdir = tempfile.mkdtemp(prefix="parallel-run-")
+        print(f"Running {len(nodeids)} tests on {len(shards)} workers")
+
+        started = time.time()
+        processes = []
+        for index, shard in enumerate(shards):
+            processes.append(self._start_worker(index, shard, workdir))
+        for worker in processes:
+            worker["process"].wait()
+            worker["log_file"].close()
+            worker["elapsed"] = time.time() - started
+        elapsed = time.time() - started
+
+        for worker in processes:
+            self.store.merge_file(worker["durations"])
+        self.store.save()
+
+        if self.trace_file:
+            Timeline.merge_chrome_traces([worker["trace"] for worker in processes], self.trace_file)
+        self._write_report(processes, elapsed)
+        self._print_output(processes, elapsed)
+        shutil.rmtree(workdir, ignore_errors=True)
+        return max(worker["process"].returncode for worker in processes)
+
+    def _start_worker(self, index, shard, workdir):
+        paths = {name: os.path.join(workdir, f"worker-{index}.{name}")
+                 for name in ("xml", "log", "durations", "trace")}
+        command = [
+            sys.executable, "-m", "pytest", *shard, *self.worker_args,
+            f"--junitxml={paths['xml']}",
+            f"--durations-file={paths['durations']}",
+        ]
+        if self.headless:
+            command.append("--headless")
+        if self.trace_file:
+            command.append(f"--trace-file={paths['trace']}")
+        env = dict(os.environ, PARALLEL_WORKER=str(index))
+        log_file = open(paths["log"], "w")
+        process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT, env=env)
+        return {"index": index, "tests": shard, "process": process, "log_file": log_file, **paths}
+
+    def _write_report(self, processes, elapsed):
+        """Merge the workers' JUnit files into a single <testsuites> document"""
+        merged = ET.Element("testsuites", name="parallel run")
+        totals = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+        for worker in processes:
+            if not os.path.exists(worker["xml"]):
+                continue
+            root = ET.parse(worker["xml"]).getroot()
+            for suite in root.iter("testsuite"):
+                suite.set("name", f"worker-{worker['index']}")
+                for key in totals:
+                    totals[key] += int(suite.get(key, 0))
+                merged.append(suite)
+        for key, value in totals.items():
+            merged.set(key, str(value))
+        merged.set("time", f"{elapsed:.3f}")
+        ET.ElementTree(merged).write(self.report_file, encoding="utf-8", xml_declaration=True)
+        self.totals = totals
+
+    def _print_output(self, processes, elapsed):
+        for worker in processes:
+            print(f"\n{'='*70}")
+            print(f"WORKER {worker['index']} ({len(worker['tests'])} tests, "
+                  f"exit {worker['process'].returncode}, done at {worker['elapsed']:.1f}s)")
+            print('='*70)
+            with open(worker["log"]) as f:
+                print(f.read())
+        print(f"{'='*70}")
+        print(f"{self.totals['tests']} tests, {self.totals['failures']} failures, "
+              f"{self.totals['errors']} errors, {self.totals['skipped']} skipped "
+              f"in {elapsed:.1f}s on {len(processes)} workers")
+        print(f"Merged report: {self.report_file}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--durations-file", default=Config.DURATIONS_FILE)
+    parser.add_argument("--report", default=Config.PARALLEL_REPORT_FILE)
+    parser.add_argument("--headed", action="store_true", help="show the browsers instead of running headless")
+    parser.add_argument("--trace-file", help="merge the workers' step timelines into this Chrome trace file")
+    args, pytest_args = parser.parse_known_args(argv)
+    if pytest_args[:1] == ["--"]:
+        pytest_args = pytest_args[1:]
+    runner = ParallelRunner(args.workers, pytest_args, args.durations_file, args.report,
+                            not args.headed, args.trace_file)
+    return runner.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+from selenium.common.exceptions import WebDriverException
+from utilities.snapshot import snapshot
+
+
+class Postcondition:
+    """State an action is expected to produce, checked by polling the driver.
+
+    ``check`` receives the driver and returns ``(satisfied, observed)``. The
+    last observed value is kept so a timeout can say what the page looked
+    like instead of just that it did not change.
+    """
+
+    def __init__(self, description, check):
+        self.description = description
+        self.check = check
+        self.last_observed = None
+
+    def __call__(self, driver):
+        try:
+            satisfied, observed = self.check(driver)
+        except WebDriverException as e:
+            satisfied, observed = False, f"{type(e).__name__}: {str(e)[:80]}"
+        self.last_observed = observed
+        return satisfied
+
+    def __repr__(self):
+        return f"Postcondition({self.description!r})"
+
+
+def _first_record(driver, locator, html=False):
+    records = snapshot(driver, locator, html=html)
+    return records[0] if records else None
+
+
+def _record_text(record):
+    return None if record is None else record.display_text
+
+
+def url_contains(fragment):
+    return Postcondition(
+        f"URL contains '{fragment}'",
+        lambda driver: (fragment in driver.current_url, driver.current_url),
+    )
+
+
+def url_changed(from_url):
+    return Postcondition(
+        f"URL changed from '{from_url}'",
+        lambda driver: (driver.current_url != from_url, driver.current_url),
+    )
+
+
+def url_excludes(*fragments):
+    def check(driver):
+        url = driver.current_url
+        return all(fragment not in url for fragment in fragments), url
+
+    return Postcondition(f"URL does not contain any of {list(fragments)}", check)
+
+
+def element_present(locator, name=None):
+    def check(driver):
+        records = snapshot(driver, locator)
+        return any(record.visible for record in records), f"{len(records)} match(es)"
+
+    return Postcondition(f"{name or locator[1]} present", check)
+
+
+def element_absent(locator, name=None):
+    def check(driver):
+        records = snapshot(driver, locator)
+        visible = [record for record in records if record.visible]
+        return not visible, f"{len(visible)} visible match(es)"
+
+    return Postcondition(f"{name or locator[1]} absent", check)
+
+
+def visible_count_at_least(locator, count, name=None):
+    def check(driver):
+        visible = [record for record in snapshot(driver, locator) if record.visible]
+        return len(visible) >= count, f"{len(visible)} visible"
+
+    return Postcondition(f"at least {count} visible {name or locator[1]}", check)
+
+
+def text_equals(locator, expected, name=None):
+    expected = str(expected)
+
+    def check(driver):
+        text = _record_text(_first_record(driver, locator))
+        return text == expected, text
+
+    return Postcondition(f"{name or locator[1]} text equals '{expected}'", check)
+
+
+def text_changed(locator, before, name=None):
+    """Text of the first match differs from ``before`` (None means absent)"""
+    def check(driver):
+        text = _record_text(_first_record(driver, locator))
+        return text != before, text
+
+    return Postcondition(f"{name or locator[1]} changed from {before!r}", check)
+
+
+def text_shown(locator, before=None, name=None):
+    """First match has non-empty text other than ``before``, e.g. a new validation message"""
+    def check(driver):
+        text = _record_text(_first_record(driver, locator))
+        return bool(text) and text != before, text
+
+    return Postcondition(f"{name or locator[1]} shows text other than {before!r}", check)
+
+
+def markup_changed(locator, before, name=None):
+    def check(driver):
+        record = _first_record(driver, locator, html=True)
+        html = record.html if record else None
+        return html != before, (html or "")[:80]
+
+    return Postcondition(f"{name or locator[1]} markup changed", check)
+
+
+def property_equals(element, name, expected, label=None):
+    def check(driver):
+        actual = element.get_property(name)
+        return actual == expected, actual
+
+    return Postcondition(f"{label or 'element'} {name} equals {expected!r}", check)
+
+
+def any_of(*postconditions):
+    def check(driver):
+        observed = {}
+        for postcondition in postconditions:
+            if postcondition(driver):
+                return True, postcondition.description
+            observed[postcondition.description] = postcondition.last_observed
+        return False, observed
+
+    return Postcondition(" or ".join(p.description for p in postconditions), check)
+
+
+def current_text(driver, locator):
+    """Snapshot the text of the first match, or None when nothing matches"""
+    return _record_text(_first_record(driver, locator))
+
+
+def current_markup(driver, locator):
+    record = _first_record(driver, locator, html=True)
+    return record.html if record else None
@@ -0,0 +1,28 @@
+"""Tell the options in a pytest command line apart from the paths and node ids it collects."""
+
+# Options that take the next argument as their value, pytest's and conftest.py's;
+# without this a value such as "-m cart" would look like a path to collect
+VALUE_OPTIONS = {
+    "-k", "-m", "-p", "-c", "-o", "-W", "-r", "--deselect", "--ignore", "--ignore-glob", "--rootdir",
+    "--confcutdir", "--basetemp", "--junitxml", "--junit-xml", "--durations", "--maxfail", "--tb",
+    "--capture", "--import-mode", "--override-ini", "--log-level", "--log-file", "--log-cli-level",
+    "--browser", "--grid-url", "--browser-profile", "--durations-file", "--trace-file", "--record-http",
+    "--metric-regression", "--results-db", "--checkout-data", "--data-shard", "--matrix-results",
+    "--app-url", "--standin-latency-ms",
+}
+
+
+def split_pytest_args(args):
+    """(options, paths): the paths/node ids choose what to collect, the options apply to every run"""
+    options, paths = [], []
+    takes_value = False
+    for arg in args:
+        if takes_value:
+            options.append(arg)
+            takes_value = False
+        elif arg.startswith("-"):
+            options.append(arg)
+            takes_value = arg in VALUE_OPTIONS
+        else:
+            paths.append(arg)
+    return options, paths
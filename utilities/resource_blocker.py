@@ -0,0 +1,146 @@
+"""Block requests no test asserts on (images, media, fonts, analytics) via CDP.
+
+Blocking uses ``Network.setBlockedURLs``, so the browser fails matching
+requests before they leave it. Resource types are expressed as URL patterns
+(file extensions plus known hosts/paths). Allow patterns exempt deny
+patterns: any deny pattern equal to, or matched by, an allow glob is dropped,
+e.g. ``*.svg*`` keeps SVGs loading while other images stay blocked.
+
+With the ``performance`` profile Chrome also records its network log, which
+``ResourceReport`` reads after each test to count blocked and transferred
+requests. Blocked requests never download, so with
+Config.ESTIMATE_BLOCKED_BYTES the bytes saved are estimated at the end of
+the session by fetching each distinct blocked image, font and media URL
+once; analytics and anything matching Config.BLOCKED_URL_PATTERNS are never
+fetched, since that would send the very beacons the profile blocks.
+"""
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from urllib.error import URLError
+from urllib.request import urlopen
+from selenium.common.exceptions import WebDriverException
+from config.config import Config
+
+TYPE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "media": ("mp4", "webm", "ogg", "ogv", "mp3", "wav", "m4a", "mov"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+}
+
+TYPE_EXTRA_PATTERNS = {
+    "image": ("*/_next/image*",),
+    "font": ("*fonts.googleapis.com*", "*fonts.gstatic.com*"),
+}
+
+# CDP resource types whose blocked URLs may be fetched to estimate their size
+SIZED_TYPES = ("Image", "Font", "Media")
+
+
+def type_patterns(resource_type):
+    """URL patterns that stand for one resource type"""
+    patterns = []
+    for extension in TYPE_EXTENSIONS.get(resource_type, ()):
+        patterns += [f"*.{extension}", f"*.{extension}?*"]
+    return patterns + list(TYPE_EXTRA_PATTERNS.get(resource_type, ()))
+
+
+class ResourceBlocker:
+    """Keeps a driver's blocked-URL list in line with Config and the test's opt-outs"""
+
+    def __init__(self, driver, block_types=None, deny_patterns=None, allow_patterns=None):
+        self.driver = driver
+        self.block_types = tuple(Config.BLOCKED_RESOURCE_TYPES if block_types is None else block_types)
+        self.deny_patterns = tuple(Config.BLOCKED_URL_PATTERNS if deny_patterns is None else deny_patterns)
+        self.allow_patterns = tuple(Config.ALLOWED_URL_PATTERNS if allow_patterns is None else allow_patterns)
+        self.active = None
+
+    def patterns(self, allow_types=()):
+        patterns = []
+        for resource_type in self.block_types:
+            if resource_type not in allow_types:
+                patterns += type_patterns(resource_type)
+        patterns += self.deny_patterns
+        return [pattern for pattern in patterns
+                if not any(pattern == allow or fnmatch(pattern, allow) for allow in self.allow_patterns)]
+
+    def apply(self, allow_types=()):
+        """Block everything configured except ``allow_types`` (no-op if unchanged)"""
+        patterns = self.patterns(allow_types)
+        if patterns == self.active:
+            return patterns
+        if self.active is None:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+        self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        self.active = patterns
+        return patterns
+
+
+class ResourceReport:
+    """Blocked/transferred request totals read from Chrome's performance log"""
+
+    def __init__(self):
+        self.blocked = Counter()
+        self.blocked_types = Counter()
+        self.blocked_url_types = {}
+        self.requests = 0
+        self.transferred_bytes = 0
+
+    def collect(self, driver):
+        """Drain the driver's network log into the totals (it is cleared by reading)"""
+        try:
+            entries = driver.get_log("performance")
+        except (AttributeError, WebDriverException):
+            return []
+        self.add(entries)
+        return entries
+
+    def add(self, entries):
+        urls = {}
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method, params = message.get("method"), message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                urls[params["requestId"]] = params["request"]["url"]
+                self.requests += 1
+            elif method == "Network.loadingFinished":
+                self.transferred_bytes += int(params.get("encodedDataLength", 0))
+            elif method == "Network.loadingFailed" and params.get("blockedReason"):
+                url = urls.get(params["requestId"])
+                if url:
+                    self.blocked[url] += 1
+                    self.blocked_types[params.get("type", "Other")] += 1
+                    self.blocked_url_types[url] = params.get("type", "Other")
+
+    def estimate_saved_bytes(self, limit=200, timeout=3):
+        """Fetch each distinct blocked image/font/media URL once and weight its size by hit count"""
+        urls = [url for url, _ in self.blocked.most_common()
+                if self.blocked_url_types.get(url) in SIZED_TYPES
+                and not any(fnmatch(url, pattern) for pattern in Config.BLOCKED_URL_PATTERNS)][:limit]
+
+        def size(url):
+            try:
+                with urlopen(url, timeout=timeout) as response:
+                    length = response.headers.get("Content-Length")
+                    return int(length) if length else len(response.read())
+            except (URLError, OSError, ValueError):
+                return 0
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            sizes = dict(zip(urls, pool.map(size, urls)))
+        return sum(sizes[url] * self.blocked[url] for url in urls), len(urls)
+
+    def summary_lines(self):
+        blocked = sum(self.blocked.values())
+        by_type = ", ".join(f"{kind} {count}" for kind, count in self.blocked_types.most_common())
+        if Config.ESTIMATE_BLOCKED_BYTES:
+            saved, sampled = self.estimate_saved_bytes()
+            saved_line = f"Bytes saved: ~{saved / 1024:.0f} KB (estimated from {sampled} distinct URLs)"
+        else:
+            saved_line = "Bytes saved: not estimated (--estimate-blocked-bytes fetches blocked images, fonts and media)"
+        return [
+            f"Requests blocked: {blocked} of {self.requests} ({by_type or 'none'})",
+            saved_line,
+            f"Bytes transferred: {self.transferred_bytes / 1024:.0f} KB",
+        ]
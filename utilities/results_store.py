@@ -0,0 +1,255 @@
+"""Keep every run's test and step timings in SQLite and find slowdowns in them.
+
+During a session the recorder follows the timeline's test and step spans
+and counts the WebDriver commands sent in each. At session end one row per
+run (git commit, whether the tree was dirty, and the settings that change
+timings), per test (outcome, wall time, commands, attempt) and per step goes
+to Config.RESULTS_DB. ``attempt`` counts the failed runs of that test on the
+same commit and config just before this one, i.e. how many retries it took.
+
+Runs are only compared within the same config. ``regressions`` takes, for
+each test and step, the latest commit with enough samples and compares it
+with the commits before it: a slowdown is reported when the median grew by
+more than Config.REGRESSION_THRESHOLD and a Mann-Whitney U test puts it
+below Config.REGRESSION_ALPHA.
+
+    python -m utilities.results_store trend -k checkout
+    python -m utilities.results_store regressions
+"""
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+from config.config import Config
+from utilities.stats import mann_whitney_u, percentile
+from utilities.test_impact import git, head_commit
+from utilities.timeline import timeline
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY, started REAL, finished REAL, git_commit TEXT, dirty INTEGER,
+    config_key TEXT, config TEXT, host TEXT, worker TEXT);
+CREATE TABLE IF NOT EXISTS tests (
+    run_id INTEGER REFERENCES runs(id), nodeid TEXT, outcome TEXT, seconds REAL, commands INTEGER,
+    attempt INTEGER, resumed_from TEXT);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER REFERENCES runs(id), nodeid TEXT, step TEXT, seconds REAL, commands INTEGER, outcome TEXT);
+CREATE INDEX IF NOT EXISTS tests_by_nodeid ON tests(nodeid);
+CREATE INDEX IF NOT EXISTS steps_by_nodeid ON steps(nodeid, step);
+"""
+
+# Settings that change how long a test takes; runs are only compared when these match
+TIMING_SETTINGS = ("BROWSER", "BROWSER_PROFILE", "HEADLESS", "REUSE_DRIVER", "CACHE_LOGIN_SESSION",
+                   "FLIGHT_RECORDER", "PROFILE_COMMANDS", "STEP_METRICS", "STANDIN_LATENCY_MS")
+
+
+def run_config():
+    """The timing-relevant settings of this run and a short key for them"""
+    url = urlsplit(Config.BASE_URL)
+    settings = {name: getattr(Config, name, None) for name in TIMING_SETTINGS}
+    # The stand-in shop listens on a new port every run
+    settings["target"] = "standin" if url.hostname in ("127.0.0.1", "localhost") else url.hostname
+    encoded = json.dumps(settings, sort_keys=True)
+    return hashlib.sha1(encoded.encode()).hexdigest()[:10], encoded
+
+
+class ResultsRecorder:
+    """Follows test/step spans and counts WebDriver commands while the session runs"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.tests = {}
+        self.steps = []
+        self.current = None
+        self.open_steps = []
+        self.commands = 0
+        timeline.add_listener(self._on_timeline)
+
+    def install(self, driver):
+        if getattr(driver, "_results_recorder", None) is self:
+            return driver
+        original_execute = driver.execute
+        recorder = self
+
+        def execute(driver_command, params=None):
+            recorder.commands += 1
+            return original_execute(driver_command, params)
+
+        driver.execute = execute
+        driver._results_recorder = self
+        return driver
+
+    def _on_timeline(self, kind, name, category, data):
+        if category == "test":
+            if kind == "begin":
+                self.current = name
+                self.tests[name] = {"commands": self.commands}
+            elif kind == "end" and name in self.tests:
+                self.tests[name]["commands"] = self.commands - self.tests[name]["commands"]
+                self.current = None
+        elif category == "step" and self.current is not None:
+            if kind == "begin":
+                self.open_steps.append(self.commands)
+            elif kind == "end" and self.open_steps:
+                commands = self.commands - self.open_steps.pop()
+                outcome = "failed" if "error" in data.get("args", {}) else "passed"
+                self.steps.append((self.current, name, data["dur"] / 1e6, commands, outcome))
+
+
+class ResultsStore:
+
+    def __init__(self, path=None):
+        self.path = path or Config.RESULTS_DB
+        self.db = sqlite3.connect(self.path, timeout=30)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def save_run(self, recorder, durations, failed, resumed=None):
+        """Write one session: durations/failed/resumed are conftest's per-test bookkeeping"""
+        config_key, config = run_config()
+        commit = head_commit()
+        try:
+            dirty = int(bool(git("status", "--porcelain", "--untracked-files=no").strip()))
+        except (RuntimeError, OSError):
+            dirty = None
+        with self.db:
+            run_id = self.db.execute(
+                "INSERT INTO runs (started, finished, git_commit, dirty, config_key, config, host, worker) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (recorder.started, time.time(), commit, dirty, config_key, config, socket.gethostname(),
+                 os.environ.get("PARALLEL_WORKER"))).lastrowid
+            for nodeid, seconds in durations.items():
+                attempt = self._previous_failures(nodeid, commit, config_key) + 1
+                self.db.execute(
+                    "INSERT INTO tests (run_id, nodeid, outcome, seconds, commands, attempt, resumed_from) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, nodeid, "failed" if nodeid in failed else "passed", seconds,
+                     recorder.tests.get(nodeid, {}).get("commands"), attempt, (resumed or {}).get(nodeid)))
+            self.db.executemany(
+                "INSERT INTO steps (run_id, nodeid, step, seconds, commands, outcome) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, *step) for step in recorder.steps])
+        return run_id
+
+    def _previous_failures(self, nodeid, commit, config_key):
+        """Failed runs of nodeid on this commit and config since it last passed there"""
+        rows = self.db.execute(
+            "SELECT t.outcome FROM tests t JOIN runs r ON r.id = t.run_id "
+            "WHERE t.nodeid = ? AND r.git_commit IS ? AND r.config_key = ? ORDER BY r.id DESC",
+            (nodeid, commit, config_key)).fetchall()
+        failures = 0
+        for (outcome,) in rows:
+            if outcome != "failed":
+                break
+            failures += 1
+        return failures
+
+    def samples(self, kind="tests", pattern=None, config_key=None, passed_only=True):
+        """{(config_key, name): [(run_id, commit, seconds), ...]} oldest first"""
+        if kind == "tests":
+            name, table = "t.nodeid", "tests"
+        else:
+            name, table = "t.nodeid || ' :: ' || t.step", "steps"
+        query = (f"SELECT r.config_key, {name}, r.id, r.git_commit, t.seconds FROM {table} t "
+                 f"JOIN runs r ON r.id = t.run_id WHERE 1 = 1")
+        params = []
+        if passed_only:
+            query += " AND t.outcome = 'passed'"
+        if pattern:
+            query += f" AND {name} LIKE ?"
+            params.append(f"%{pattern}%")
+        if config_key:
+            query += " AND r.config_key = ?"
+            params.append(config_key)
+        grouped = defaultdict(list)
+        for key, label, run_id, commit, seconds in self.db.execute(query + " ORDER BY r.id", params):
+            grouped[(key, label)].append((run_id, commit, seconds))
+        return grouped
+
+    def durations(self, config_key=None, last=5):
+        """Median of each test's last few passing runs, for duration-aware scheduling"""
+        config_key = config_key or run_config()[0]
+        return {label: percentile([s for _, _, s in rows[-last:]], 50)
+                for (_, label), rows in self.samples("tests", config_key=config_key).items()}
+
+    def trend(self, kind="tests", pattern=None):
+        """Per test (or step) and config: one line per commit with its runs and median seconds"""
+        lines = []
+        for (config_key, label), rows in sorted(self.samples(kind, pattern).items(), key=lambda item: item[0][1]):
+            lines.append(f"{label}  [config {config_key}]")
+            for commit, seconds in self._by_commit(rows):
+                lines.append(f"  {(commit or 'unknown')[:10]:10} n={len(seconds):3d} "
+                             f"median {percentile(seconds, 50):8.2f}s  min {min(seconds):8.2f}s  "
+                             f"max {max(seconds):8.2f}s")
+        return lines
+
+    @staticmethod
+    def _by_commit(rows):
+        """[(commit, [seconds])] in the order the commits were first run"""
+        grouped = {}
+        for _, commit, seconds in rows:
+            grouped.setdefault(commit, []).append(seconds)
+        return list(grouped.items())
+
+    def regressions(self, kind="tests", pattern=None, threshold=None, alpha=None, min_samples=None, window=None):
+        """Tests (or steps) whose latest commit is significantly slower than the commits before it"""
+        threshold = Config.REGRESSION_THRESHOLD if threshold is None else threshold
+        alpha = Config.REGRESSION_ALPHA if alpha is None else alpha
+        min_samples = Config.REGRESSION_MIN_SAMPLES if min_samples is None else min_samples
+        window = window or Config.REGRESSION_WINDOW
+        found = []
+        for (config_key, label), rows in self.samples(kind, pattern).items():
+            commits = [(commit, seconds) for commit, seconds in self._by_commit(rows) if len(seconds) >= min_samples]
+            if not commits:
+                continue
+            commit, after = commits[-1]
+            before = [s for _, c, s in rows if c != commit][-window:]
+            if len(before) < min_samples:
+                continue
+            old, new = percentile(before, 50), percentile(after, 50)
+            p_value = mann_whitney_u(before, after)
+            if old and (new - old) / old > threshold and p_value < alpha:
+                found.append({"name": label, "config": config_key, "commit": commit, "before": old, "after": new,
+                              "change": (new - old) / old, "p_value": p_value,
+                              "samples": (len(before), len(after))})
+        return sorted(found, key=lambda item: -item["change"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the stored test and step timings")
+    parser.add_argument("command", choices=("trend", "regressions"))
+    parser.add_argument("--db", default=Config.RESULTS_DB)
+    parser.add_argument("-k", dest="pattern", help="only tests/steps whose name contains this")
+    parser.add_argument("--steps", action="store_true", help="steps instead of whole tests")
+    parser.add_argument("--threshold", type=float, help="minimum median slowdown, e.g. 0.3 for 30%%")
+    parser.add_argument("--alpha", type=float, help="significance level of the Mann-Whitney U test")
+    parser.add_argument("--min-samples", type=int, help="passing runs needed on each side")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No results yet: {args.db} is written at the end of each pytest session")
+        return 1
+    store = ResultsStore(args.db)
+    kind = "steps" if args.steps else "tests"
+    if args.command == "trend":
+        print("\n".join(store.trend(kind, args.pattern)) or "No passing runs recorded")
+        return 0
+    found = store.regressions(kind, args.pattern, args.threshold, args.alpha, args.min_samples)
+    for item in found:
+        print(f"SLOWER {item['name']}: median {item['before']:.2f}s -> {item['after']:.2f}s "
+              f"(+{item['change'] * 100:.0f}%) at {(item['commit'] or 'unknown')[:10]}, "
+              f"p={item['p_value']:.4f}, n={item['samples'][0]}/{item['samples'][1]} [config {item['config']}]")
+    if not found:
+        print("No significant slowdowns")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
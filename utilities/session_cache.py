@@ -0,0 +1,114 @@
+import time
+from urllib.parse import urlsplit
+from selenium.common.exceptions import TimeoutException
+from config.config import Config
+from utilities.timeline import log
+from pages.login_page import LoginPage
+from pages.dashboard_page import DashboardPage
+from utilities.wait_utils import WaitUtils
+from utilities import postconditions as post
+
+
+class AuthenticatedSession:
+    """Cookies, web storage and landing URL captured right after a UI login"""
+
+    COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+    def __init__(self, cookies, local_storage, session_storage, landing_url):
+        self.cookies = [{k: c[k] for k in self.COOKIE_FIELDS if k in c} for c in cookies]
+        self.local_storage = local_storage
+        self.session_storage = session_storage
+        self.landing_url = landing_url
+
+    def is_expired(self, now=None):
+        """True when any captured cookie has already passed its expiry"""
+        now = time.time() if now is None else now
+        return any("expiry" in c and c["expiry"] <= now for c in self.cookies)
+
+
+class SessionCache:
+    """Logs in through the UI once per credential set and replays that state.
+
+    ``authenticate`` injects the cached cookies and storage into a driver
+    that is on the app's origin and opens the page the user landed on after
+    logging in. If the app bounces back to the login form the session is
+    treated as expired: it is dropped and a real UI login captures a new one.
+    """
+
+    READ_STORAGE_SCRIPT = """
+        function dump(storage) {
+            var out = {};
+            for (var i = 0; i < storage.length; i++) { var k = storage.key(i); out[k] = storage.getItem(k); }
+            return out;
+        }
+        return [dump(window.localStorage), dump(window.sessionStorage)];
+    """
+
+    WRITE_STORAGE_SCRIPT = """
+        var local = arguments[0], session = arguments[1];
+        Object.keys(local).forEach(function (k) { window.localStorage.setItem(k, local[k]); });
+        Object.keys(session).forEach(function (k) { window.sessionStorage.setItem(k, session[k]); });
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.sessions = {}
+        self.ui_logins = 0
+        self.restores = 0
+
+    def authenticate(self, driver, email, password, force_ui=False):
+        """Leave driver logged in as email on the products page"""
+        key = (self._origin(Config.BASE_URL), email)
+        session = self.sessions.get(key)
+
+        if self.enabled and not force_ui and session and not session.is_expired():
+            if self.restore(driver, session):
+                self.restores += 1
+                return driver
+            log(f"  Cached session for {email} expired, logging in again")
+            self.sessions.pop(key, None)
+            self._clear_state(driver)
+
+        LoginPage(driver).login(email, password)
+        self.ui_logins += 1
+        if self.enabled:
+            self.sessions[key] = self.capture(driver)
+        return driver
+
+    def capture(self, driver):
+        local_storage, session_storage = driver.execute_script(self.READ_STORAGE_SCRIPT)
+        return AuthenticatedSession(driver.get_cookies(), local_storage, session_storage, driver.current_url)
+
+    def restore(self, driver, session):
+        """Inject session into driver; False when the app no longer accepts it"""
+        if self._origin(driver.current_url) != self._origin(Config.BASE_URL):
+            driver.get(Config.BASE_URL)
+        for cookie in session.cookies:
+            driver.add_cookie(cookie)
+        driver.execute_script(self.WRITE_STORAGE_SCRIPT, session.local_storage, session.session_storage)
+        driver.get(session.landing_url)
+
+        on_products = post.element_present(DashboardPage.PRODUCTS_GRID, "product grid")
+        on_login = post.element_present(LoginPage.EMAIL_INPUT, "login email input")
+        try:
+            WaitUtils(driver, Config.POSTCONDITION_TIMEOUT).wait_for_postcondition(post.any_of(on_products, on_login))
+        except TimeoutException:
+            return False
+        return not on_login(driver)
+
+    def invalidate(self, email=None):
+        """Forget cached sessions, e.g. after a test logged the user out server-side"""
+        if email is None:
+            self.sessions.clear()
+        else:
+            self.sessions = {k: v for k, v in self.sessions.items() if k[1] != email}
+
+    def _clear_state(self, driver):
+        driver.delete_all_cookies()
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        driver.get(Config.BASE_URL)
+
+    @staticmethod
+    def _origin(url):
+        parts = urlsplit(url)
+        return (parts.scheme, parts.netloc)
@@ -0,0 +1,111 @@
+"""Wait until the app has stopped reacting: no fetch/XHR in flight, no DOM churn.
+
+A monitor script counts in-flight ``fetch``/``XMLHttpRequest`` calls and
+stamps the time of the last DOM mutation. It is registered to run at the
+start of every document where the browser supports it (Chrome via CDP), so
+requests fired while the page boots are counted too; elsewhere the first
+settle call installs it. ``document.readyState`` only matters for full page
+loads, so it is one condition of several rather than the whole check.
+"""
+import time
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
+from config.config import Config
+from utilities.deadline import remaining
+from utilities.wait_utils import ensure_script_timeout
+
+SETTLE_MONITOR_JS = """
+(function () {
+    if (window.__settleMonitor) { return; }
+    var monitor = window.__settleMonitor = {inflight: 0, requests: 0, mutations: 0, lastActivity: Date.now()};
+    function started() { monitor.inflight++; monitor.requests++; monitor.lastActivity = Date.now(); }
+    function finished() { monitor.inflight = Math.max(0, monitor.inflight - 1); monitor.lastActivity = Date.now(); }
+
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            started();
+            try {
+                return originalFetch.apply(this, arguments).finally(finished);
+            } catch (e) {
+                finished();
+                throw e;
+            }
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        started();
+        this.addEventListener('loadend', finished, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+
+    function observe() {
+        new MutationObserver(function (records) {
+            monitor.mutations += records.length;
+            monitor.lastActivity = Date.now();
+        }).observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    }
+    if (document.documentElement) { observe(); } else { document.addEventListener('readystatechange', observe, {once: true}); }
+})();
+"""
+
+# Resolves once the page has been quiet for quietMs, or with settled=false at
+# the deadline so the caller can report what was still going on.
+SETTLE_SCRIPT = SETTLE_MONITOR_JS + """
+var quietMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var monitor = window.__settleMonitor, started = Date.now();
+function report(settled) {
+    done({settled: settled, waited_ms: Date.now() - started, inflight: monitor.inflight,
+          requests: monitor.requests, mutations: monitor.mutations, ready_state: document.readyState});
+}
+function check() {
+    var now = Date.now();
+    if (document.readyState === 'complete' && monitor.inflight === 0 && now - monitor.lastActivity >= quietMs) {
+        report(true);
+    } else if (now - started >= timeoutMs) {
+        report(false);
+    } else {
+        setTimeout(check, Math.max(5, Math.min(quietMs, quietMs - (now - monitor.lastActivity))));
+    }
+}
+check();
+"""
+
+
+class SettleDetector:
+
+    def __init__(self, driver, quiet_ms=None, timeout=None):
+        self.driver = driver
+        self.quiet_ms = Config.SETTLE_QUIET_MS if quiet_ms is None else quiet_ms
+        self.timeout = Config.SETTLE_TIMEOUT if timeout is None else timeout
+
+    @staticmethod
+    def register(driver):
+        """Install the monitor at the start of every new document (Chrome only)"""
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": SETTLE_MONITOR_JS})
+        except (AttributeError, WebDriverException):
+            pass
+
+    def wait(self, timeout=None, quiet_ms=None):
+        """Block until the page has been quiet for quiet_ms; return the last status
+
+        The status dict has settled, waited_ms, inflight, requests, mutations
+        and ready_state. A navigation that replaces the document mid-wait is
+        retried on the new document until the timeout runs out.
+        """
+        timeout = remaining(self.timeout if timeout is None else timeout)
+        quiet_ms = self.quiet_ms if quiet_ms is None else quiet_ms
+        deadline = time.monotonic() + timeout
+        status = {"settled": False, "error": "no time left in budget"}
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return status
+            ensure_script_timeout(self.driver, left + 5)
+            try:
+                return self.driver.execute_async_script(SETTLE_SCRIPT, quiet_ms, int(left * 1000))
+            except (JavascriptException, TimeoutException) as e:
+                # Document unloaded mid-script; check again on the new one
+                status = {"settled": False, "error": str(e)[:100]}
+                time.sleep(Config.POLL_FREQUENCY)
@@ -0,0 +1,87 @@
+"""Read everything page objects need about a set of elements in one script call.
+
+Each WebElement property read (``text``, ``is_displayed()``, ``is_enabled()``,
+...) is its own HTTP round trip to the driver. ``snapshot`` resolves a
+locator in the page and returns compact records for every match instead,
+which callers filter locally.
+"""
+
+# Browser-side equivalent of find_elements for XPath, id, name, class and CSS locators.
+# Resolving in a script never goes through the implicit wait.
+RESOLVE_LOCATOR_JS = """
+function resolveLocator(by, value) {
+    var nodes = [];
+    if (by === 'xpath') {
+        var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < result.snapshotLength; i++) { nodes.push(result.snapshotItem(i)); }
+    } else if (by === 'id') {
+        var node = document.getElementById(value);
+        if (node) { nodes.push(node); }
+    } else if (by === 'name') {
+        nodes = Array.prototype.slice.call(document.getElementsByName(value));
+    } else if (by === 'class name') {
+        nodes = Array.prototype.slice.call(document.getElementsByClassName(value));
+    } else {
+        nodes = Array.prototype.slice.call(document.querySelectorAll(value));
+    }
+    return nodes;
+}
+function isVisible(el) {
+    if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) { return false; }
+    return window.getComputedStyle(el).visibility !== 'hidden';
+}
+"""
+
+SNAPSHOT_SCRIPT = RESOLVE_LOCATOR_JS + """
+var attributes = arguments[2], withElements = arguments[3], withHtml = arguments[4];
+return resolveLocator(arguments[0], arguments[1]).map(function (el) {
+    var rect = el.getBoundingClientRect(), attrs = {};
+    attributes.forEach(function (name) { attrs[name] = el.getAttribute(name); });
+    return [
+        withElements ? el : null,
+        (el.innerText || el.textContent || '').trim(),
+        el.value === undefined ? null : String(el.value),
+        isVisible(el),
+        !(el.disabled || el.getAttribute('aria-disabled') === 'true'),
+        [rect.x, rect.y, rect.width, rect.height],
+        attrs,
+        withHtml ? el.innerHTML : null
+    ];
+});
+"""
+
+
+class ElementRecord:
+    """What one matching element looked like when the snapshot was taken"""
+
+    __slots__ = ("element", "text", "value", "visible", "enabled", "rect", "attributes", "html")
+
+    def __init__(self, element, text, value, visible, enabled, rect, attributes, html):
+        self.element = element
+        self.text = text
+        self.value = value
+        self.visible = visible
+        self.enabled = enabled
+        self.rect = rect
+        self.attributes = attributes
+        self.html = html
+
+    @property
+    def display_text(self):
+        """Visible text, or the value for inputs that have no text content"""
+        return self.value if self.value is not None and not self.text else self.text
+
+    def __repr__(self):
+        return f"ElementRecord(text={self.text!r}, visible={self.visible}, enabled={self.enabled})"
+
+
+def snapshot(driver, locator, attributes=(), elements=False, html=False):
+    """Return an ElementRecord for every element matching locator
+
+    attributes names the HTML attributes to read for each match. Set
+    elements=True to also get WebElement references (to click or type into
+    a match) and html=True to include innerHTML.
+    """
+    by, value = locator
+    rows = driver.execute_script(SNAPSHOT_SCRIPT, by, value, list(attributes), elements, html)
+    return [ElementRecord(*row) for row in rows]
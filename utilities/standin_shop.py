@@ -0,0 +1,572 @@
+"""Local stand-in for the practice e-commerce site the tests target.
+
+It serves a small single-page app with the same DOM structure and locators
+as https://practice.qabrains.com/ecommerce: login form, product grid with
+sort combobox, product details with quantity +, cart, and the three
+checkout steps. Products, login and orders go through a JSON API; cart and
+favorites live in localStorage like on the real site. Being local and
+deterministic, it makes timings reproducible and lets the suite run offline.
+
+    python -m utilities.standin_shop --port 8000
+    pytest --standin
+"""
+import argparse
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from config.config import Config
+
+PREFIX = "/ecommerce"
+
+PRODUCTS = [
+    {"id": 1, "name": "Sample Hat", "price": 15.00},
+    {"id": 2, "name": "Sample Sunglass", "price": 25.00},
+    {"id": 3, "name": "Sample Shoe", "price": 80.00},
+    {"id": 4, "name": "Sample Watch", "price": 120.00},
+    {"id": 5, "name": "Sample Bag", "price": 60.00},
+    {"id": 6, "name": "Sample Belt", "price": 20.00},
+    {"id": 7, "name": "Sample Jacket", "price": 150.00},
+    {"id": 8, "name": "Sample Shirt", "price": 30.00},
+    {"id": 9, "name": "Sample Socks", "price": 5.00},
+]
+
+SORT_ORDERS = {
+    "asc": lambda p: (p["name"],),
+    "dsc": lambda p: (p["name"],),
+    "low": lambda p: (p["price"], p["name"]),
+    "high": lambda p: (p["price"], p["name"]),
+}
+
+SHELL_HTML = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>QA Brains Ecommerce (stand-in)</title>
+<link rel="stylesheet" href="/ecommerce/static/app.css">
+</head>
+<body>
+<div id="root"></div>
+<script src="/ecommerce/static/app.js"></script>
+</body>
+</html>
+"""
+
+APP_CSS = """
+body { font-family: sans-serif; margin: 0; }
+header { display: flex; justify-content: space-between; align-items: center; padding: 12px 24px; border-bottom: 1px solid #ddd; }
+header nav { display: flex; gap: 16px; align-items: center; }
+main { padding: 24px; }
+.relative { position: relative; }
+.absolute { position: absolute; }
+.-top-2 { top: -8px; } .-right-2 { right: -8px; }
+.bg-red-500 { background: #ef4444; } .text-white { color: #fff; }
+.h-5 { height: 20px; } .w-5 { width: 20px; } .rounded-full { border-radius: 9999px; }
+.flex { display: flex; } .items-center { align-items: center; } .justify-center { justify-content: center; }
+.text-xs { font-size: 12px; } .gap-2 { gap: 8px; } .mb-8 { margin-bottom: 32px; }
+.grid { display: grid; grid-template-columns: repeat(3, 1fr); } .gap-6 { gap: 24px; }
+.card { border: 1px solid #ddd; padding: 12px; position: relative; }
+.card img, .details img { width: 100%; max-width: 300px; cursor: pointer; display: block; }
+.sort { position: relative; margin-bottom: 16px; }
+[role=listbox] { position: absolute; background: #fff; border: 1px solid #ccc; z-index: 10; }
+[role=option] { padding: 6px 12px; cursor: pointer; }
+.error { color: #b91c1c; }
+input { display: block; margin: 8px 0; padding: 6px; }
+"""
+
+APP_JS = r"""
+(function () {
+  var BASE = '/ecommerce';
+  var root = document.getElementById('root');
+  var SORT_OPTIONS = [
+    ['asc', 'A to Z (Ascending)'], ['dsc', 'Z to A (Descending)'],
+    ['low', 'Low to High (Price)'], ['high', 'High to Low (Price)']
+  ];
+
+  function api(method, path, body) {
+    return fetch(BASE + '/api' + path, {
+      method: method, credentials: 'same-origin',
+      headers: {'Content-Type': 'application/json'},
+      body: body === undefined ? undefined : JSON.stringify(body)
+    }).then(function (r) { return r.json().then(function (d) { return {status: r.status, data: d}; }); });
+  }
+  function load(key, fallback) { try { return JSON.parse(localStorage.getItem(key)) || fallback; } catch (e) { return fallback; } }
+  function save(key, value) { localStorage.setItem(key, JSON.stringify(value)); }
+  function cart() { return load('cart', []); }
+  function favorites() { return load('favorites', []); }
+  function cartCount() { return cart().reduce(function (n, item) { return n + item.qty; }, 0); }
+  function inCart(id) { return cart().some(function (item) { return item.id === id; }); }
+  function addToCart(id, qty) {
+    var items = cart(), found = items.filter(function (item) { return item.id === id; })[0];
+    if (found) { found.qty += qty; } else { items.push({id: id, qty: qty}); }
+    save('cart', items); renderBadge();
+  }
+  function removeFromCart(id) { save('cart', cart().filter(function (item) { return item.id !== id; })); renderBadge(); }
+  function toggleFavorite(id) {
+    var favs = favorites(), i = favs.indexOf(id);
+    if (i >= 0) { favs.splice(i, 1); } else { favs.push(id); }
+    save('favorites', favs);
+  }
+  function money(n) { return '$' + n.toFixed(2); }
+  function esc(s) { return String(s).replace(/[&<>"]/g, function (c) { return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]; }); }
+  function el(html) { var t = document.createElement('template'); t.innerHTML = html.trim(); return t.content.firstChild; }
+
+  function navigate(path) { history.pushState({}, '', path); route(); }
+  window.addEventListener('popstate', route);
+
+  function route() {
+    var path = location.pathname.replace(/\/+$/, '');
+    if (path === BASE + '/login' || path === '/login') { return renderLogin(); }
+    api('GET', '/me').then(function (res) {
+      if (res.status !== 200) { navigate(BASE + '/login'); return; }
+      if (path === BASE || path === '') { renderProducts(); }
+      else if (path === BASE + '/product-details') { renderDetails(); }
+      else if (path === BASE + '/cart') { renderCart(); }
+      else if (path === BASE + '/checkout') { renderCheckoutInfo(); }
+      else if (path === BASE + '/checkout-overview') { renderOverview(); }
+      else if (path === BASE + '/checkout-complete') { renderComplete(); }
+      else { page('<main><h2>Not found</h2></main>'); }
+    });
+  }
+
+  function page(mainHtml, withHeader) {
+    root.innerHTML = '';
+    if (withHeader !== false) {
+      var header = el('<header><a href="' + BASE + '" class="logo" data-link>QA Brains</a><nav>' +
+        '<a class="relative" href="' + BASE + '/cart" data-link>Cart</a>' +
+        '<button type="button" class="logout">Logout</button></nav></header>');
+      header.querySelector('.logout').addEventListener('click', function () {
+        api('POST', '/logout').then(function () { save('cart', []); navigate(BASE + '/login'); });
+      });
+      root.appendChild(header);
+      renderBadge();
+    }
+    root.appendChild(el(mainHtml));
+    root.querySelectorAll('[data-link]').forEach(function (a) {
+      a.addEventListener('click', function (e) { e.preventDefault(); navigate(a.getAttribute('href')); });
+    });
+  }
+
+  function renderBadge() {
+    var link = root.querySelector('header a.relative');
+    if (!link) { return; }
+    var badge = link.querySelector('span'), count = cartCount();
+    if (!count) { if (badge) { badge.remove(); } return; }
+    if (!badge) {
+      badge = el('<span class="absolute -top-2 -right-2 bg-red-500 text-white text-xs rounded-full h-5 w-5 flex items-center justify-center"></span>');
+      link.appendChild(badge);
+    }
+    badge.textContent = String(count);
+  }
+
+  function renderLogin() {
+    page('<main><h2>Login</h2><form class="login">' +
+      '<input id="email" type="email" placeholder="Email" autocomplete="username">' +
+      '<input id="password" type="password" placeholder="Password" autocomplete="current-password">' +
+      '<button type="submit">Login</button><p class="error" role="alert"></p></form></main>', false);
+    root.querySelector('form').addEventListener('submit', function (e) {
+      e.preventDefault();
+      api('POST', '/login', {email: root.querySelector('#email').value, password: root.querySelector('#password').value})
+        .then(function (res) {
+          if (res.status === 200) { localStorage.setItem('user', res.data.email); navigate(BASE); }
+          else { root.querySelector('.error').textContent = res.data.error; }
+        });
+    });
+  }
+
+  function renderProducts() {
+    var order = new URLSearchParams(location.search).get('order_by') || '';
+    page('<main><h2>Products</h2><div class="sort"><button type="button" role="combobox" aria-expanded="false">' +
+      'Select Sorting Options</button></div>' +
+      '<div class="products grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6"></div></main>');
+    var combo = root.querySelector('[role=combobox]');
+    var current = SORT_OPTIONS.filter(function (o) { return o[0] === order; })[0];
+    if (current) { combo.textContent = current[1]; }
+    combo.addEventListener('click', function () {
+      var open = root.querySelector('[role=listbox]');
+      if (open) { open.remove(); combo.setAttribute('aria-expanded', 'false'); return; }
+      var list = el('<div role="listbox"></div>');
+      SORT_OPTIONS.forEach(function (o) {
+        var option = el('<div role="option" data-value="' + o[0] + '">' + o[1] + '</div>');
+        option.addEventListener('click', function () {
+          list.remove(); combo.setAttribute('aria-expanded', 'false');
+          history.pushState({}, '', BASE + '?order_by=' + o[0]);
+          combo.textContent = o[1];
+          loadGrid(o[0]);
+        });
+        list.appendChild(option);
+      });
+      combo.parentNode.appendChild(list);
+      combo.setAttribute('aria-expanded', 'true');
+    });
+    loadGrid(order);
+  }
+
+  function loadGrid(order) {
+    api('GET', '/products' + (order ? '?order_by=' + order : '')).then(function (res) {
+      var grid = root.querySelector('.products');
+      if (!grid) { return; }
+      grid.innerHTML = '';
+      res.data.products.forEach(function (p) { grid.appendChild(card(p)); });
+    });
+  }
+
+  function card(p) {
+    var node = el('<div class="card">' +
+      '<span class="fav"><button type="button" class="favorite"></button></span>' +
+      '<img src="' + BASE + '/static/img/' + p.id + '.svg" alt="' + esc(p.name) + ' Name">' +
+      '<h3>' + esc(p.name) + '</h3><p class="price">' + money(p.price) + '</p>' +
+      '<div class="actions"><button type="button" class="add"></button></div></div>');
+    var fav = node.querySelector('.favorite'), add = node.querySelector('.add');
+    function paint() {
+      var liked = favorites().indexOf(p.id) >= 0;
+      fav.setAttribute('aria-pressed', String(liked));
+      fav.setAttribute('aria-label', liked ? 'Remove from favorites' : 'Add to favorites');
+      fav.innerHTML = liked ? '&#9829;' : '&#9825;';
+      add.textContent = inCart(p.id) ? 'Remove from cart' : 'Add to cart';
+    }
+    fav.addEventListener('click', function () { toggleFavorite(p.id); paint(); });
+    add.addEventListener('click', function () { if (inCart(p.id)) { removeFromCart(p.id); } else { addToCart(p.id, 1); } paint(); });
+    node.querySelector('img').addEventListener('click', function () { navigate(BASE + '/product-details?id=' + p.id); });
+    paint();
+    return node;
+  }
+
+  function renderDetails() {
+    var id = parseInt(new URLSearchParams(location.search).get('id'), 10);
+    api('GET', '/products/' + id).then(function (res) {
+      if (res.status !== 200) { page('<main><h2>Product not found</h2></main>'); return; }
+      var p = res.data, qty = 1;
+      page('<main><button type="button" class="flex items-center gap-2 text-black font-semibold mb-8 cursor-pointer">' +
+        '&larr; Back to products</button><div class="details">' +
+        '<img src="' + BASE + '/static/img/' + p.id + '.svg" alt="' + esc(p.name) + ' Name">' +
+        '<h1>' + esc(p.name) + '</h1><p class="price">' + money(p.price) + '</p>' +
+        '<div class="quantity flex items-center gap-2"><button type="button">-</button><span class="qty">1</span><button type="button">+</button></div>' +
+        '<button type="button" class="add">Add to cart</button></div></main>');
+      var buttons = root.querySelectorAll('.quantity button'), shown = root.querySelector('.qty');
+      buttons[0].addEventListener('click', function () { qty = Math.max(1, qty - 1); shown.textContent = qty; });
+      buttons[1].addEventListener('click', function () { qty += 1; shown.textContent = qty; });
+      root.querySelector('.details .add').addEventListener('click', function () { addToCart(p.id, qty); });
+      root.querySelector('main > button').addEventListener('click', function () { navigate(BASE); });
+    });
+  }
+
+  function withProducts(callback) {
+    api('GET', '/products').then(function (res) {
+      var byId = {};
+      res.data.products.forEach(function (p) { byId[p.id] = p; });
+      callback(cart().filter(function (item) { return byId[item.id]; })
+        .map(function (item) { return {product: byId[item.id], qty: item.qty}; }));
+    });
+  }
+
+  function lines(items) {
+    return items.map(function (i) {
+      return '<li class="cart-item" data-id="' + i.product.id + '"><span class="name">' + esc(i.product.name) +
+        '</span> x <span class="qty">' + i.qty + '</span> <span class="price">' + money(i.product.price * i.qty) + '</span></li>';
+    }).join('');
+  }
+
+  function total(items) { return items.reduce(function (n, i) { return n + i.product.price * i.qty; }, 0); }
+
+  function renderCart() {
+    withProducts(function (items) {
+      page('<main><h2>Your Cart</h2><ul class="cart-items">' + lines(items) + '</ul>' +
+        '<p class="total">Total: ' + money(total(items)) + '</p>' +
+        (items.length ? '<button type="button" class="checkout">Checkout</button>' : '<p class="empty">Your cart is empty</p>') +
+        '</main>');
+      var checkout = root.querySelector('.checkout');
+      if (checkout) { checkout.addEventListener('click', function () { navigate(BASE + '/checkout'); }); }
+    });
+  }
+
+  function renderCheckoutInfo() {
+    var info = JSON.parse(sessionStorage.getItem('checkout') || '{}');
+    page('<main><h2>Checkout: Your Information</h2><form class="checkout-info">' +
+      '<input type="text" name="firstName" placeholder="First Name">' +
+      '<input type="text" name="lastName" placeholder="Last Name">' +
+      '<input type="text" name="postalCode" placeholder="Zip/Postal Code">' +
+      '<p class="error" role="alert"></p>' +
+      '<button type="button" class="cancel">Cancel</button><button type="submit">Continue</button></form></main>');
+    var form = root.querySelector('form');
+    ['firstName', 'lastName', 'postalCode'].forEach(function (name) { form[name].value = info[name] || ''; });
+    root.querySelector('.cancel').addEventListener('click', function () { navigate(BASE + '/cart'); });
+    form.addEventListener('submit', function (e) {
+      e.preventDefault();
+      var data = {firstName: form.firstName.value, lastName: form.lastName.value, postalCode: form.postalCode.value};
+      api('POST', '/checkout/validate', data).then(function (res) {
+        if (res.status !== 200) { root.querySelector('.error').textContent = res.data.error; return; }
+        sessionStorage.setItem('checkout', JSON.stringify(data));
+        navigate(BASE + '/checkout-overview');
+      });
+    });
+  }
+
+  function renderOverview() {
+    withProducts(function (items) {
+      page('<main><h2>Checkout: Overview</h2><ul class="cart-items">' + lines(items) + '</ul>' +
+        '<p class="total">Total: ' + money(total(items)) + '</p>' +
+        '<button type="button" class="cancel">Cancel</button><button type="button" class="finish">Finish</button></main>');
+      root.querySelector('.cancel').addEventListener('click', function () { navigate(BASE); });
+      root.querySelector('.finish').addEventListener('click', function () {
+        var info = JSON.parse(sessionStorage.getItem('checkout') || '{}');
+        api('POST', '/orders', {items: cart(), customer: info}).then(function (res) {
+          if (res.status !== 200) { return; }
+          save('cart', []); sessionStorage.removeItem('checkout');
+          sessionStorage.setItem('lastOrder', String(res.data.order_id));
+          navigate(BASE + '/checkout-complete');
+        });
+      });
+    });
+  }
+
+  function renderComplete() {
+    page('<main><h2>Thank you for your order!</h2><p class="order-id">Order #' +
+      esc(sessionStorage.getItem('lastOrder') || '') + '</p>' +
+      '<button type="button" class="continue-shopping">Continue Shopping</button></main>');
+    root.querySelector('.continue-shopping').addEventListener('click', function () { navigate(BASE); });
+  }
+
+  route();
+})();
+"""
+
+PRODUCT_IMAGE_SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="300" height="200" viewBox="0 0 300 200">
+<rect width="300" height="200" fill="hsl({hue}, 60%, 70%)"/>
+<text x="150" y="105" font-size="20" text-anchor="middle" font-family="sans-serif">{name}</text>
+</svg>
+"""
+
+
+class StandinServer(ThreadingHTTPServer):
+    # Browserless replay opens hundreds of connections at once
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StandinShop:
+    """Threaded HTTP server for the stand-in app; ``start`` returns immediately"""
+
+    SESSION_MAX_AGE = 3600
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0,
+                 email=Config.EMAIL, password=Config.PASSWORD):
+        self.latency = latency
+        self.credentials = {email: password}
+        self.sessions = {}
+        self.orders = []
+        self.requests_served = 0
+        self.lock = threading.Lock()
+        self.httpd = StandinServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def login_url(self):
+        return self.base_url + PREFIX + "/login"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="standin-shop", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def _handler_class(self):
+        shop = self
+
+        class Handler(StandinShopHandler):
+            pass
+
+        Handler.shop = shop
+        return Handler
+
+    # Application logic, called by the handler
+
+    def login(self, email, password):
+        if not email or self.credentials.get(email) != password:
+            return None
+        token = secrets.token_urlsafe(16)
+        with self.lock:
+            self.sessions[token] = {"email": email, "expires": time.time() + self.SESSION_MAX_AGE}
+        return token
+
+    def session_email(self, token):
+        session = self.sessions.get(token) if token else None
+        if session is None or session["expires"] < time.time():
+            return None
+        return session["email"]
+
+    def logout(self, token):
+        with self.lock:
+            self.sessions.pop(token, None)
+
+    def products(self, order_by=None):
+        items = list(PRODUCTS)
+        if order_by in SORT_ORDERS:
+            items.sort(key=SORT_ORDERS[order_by], reverse=order_by in ("dsc", "high"))
+        return items
+
+    @staticmethod
+    def validate_customer(data):
+        """Error message for invalid checkout information, or None"""
+        labels = {"firstName": "First Name", "lastName": "Last Name", "postalCode": "Postal Code"}
+        for field, label in labels.items():
+            value = str(data.get(field) or "").strip()
+            if not value:
+                return f"{label} is required"
+            if len(value) > 50:
+                return f"{label} must be at most 50 characters"
+        return None
+
+    def place_order(self, email, items, customer):
+        known = {p["id"] for p in PRODUCTS}
+        if not items or any(item.get("id") not in known or int(item.get("qty", 0)) < 1 for item in items):
+            return None, "Cart is empty or invalid"
+        error = self.validate_customer(customer or {})
+        if error:
+            return None, error
+        with self.lock:
+            order_id = len(self.orders) + 1
+            self.orders.append({"id": order_id, "email": email, "items": items, "customer": customer})
+        return order_id, None
+
+
+class StandinShopHandler(BaseHTTPRequestHandler):
+
+    shop = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        shop = self.shop
+        with shop.lock:
+            shop.requests_served += 1
+        if shop.latency:
+            time.sleep(shop.latency)
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/"
+        query = parse_qs(url.query)
+
+        if path.startswith(PREFIX + "/api/"):
+            return self._api(method, path[len(PREFIX) + 4:], query)
+        if path.startswith(PREFIX + "/static/"):
+            return self._static(path[len(PREFIX) + 8:])
+        if method == "GET" and (path in ("/", "/login") or path == PREFIX or path.startswith(PREFIX + "/")):
+            if path == "/":
+                return self._send(302, b"", "text/plain", {"Location": PREFIX + "/login"})
+            return self._send(200, SHELL_HTML.encode(), "text/html; charset=utf-8")
+        self._json(404, {"error": "not found"})
+
+    def _static(self, name):
+        if name == "app.js":
+            return self._send(200, APP_JS.encode(), "application/javascript", cache=True)
+        if name == "app.css":
+            return self._send(200, APP_CSS.encode(), "text/css", cache=True)
+        if name.startswith("img/") and name.endswith(".svg"):
+            product = next((p for p in PRODUCTS if str(p["id"]) == name[4:-4]), None)
+            if product:
+                svg = PRODUCT_IMAGE_SVG.format(hue=product["id"] * 40, name=product["name"])
+                return self._send(200, svg.encode(), "image/svg+xml", cache=True)
+        self._json(404, {"error": "not found"})
+
+    def _api(self, method, route, query):
+        shop = self.shop
+        body = self._body() if method == "POST" else {}
+        token = self._cookie("session")
+        email = shop.session_email(token)
+
+        if route == "/login" and method == "POST":
+            token = shop.login(body.get("email"), body.get("password"))
+            if token is None:
+                return self._json(401, {"error": "Invalid email or password"})
+            cookie = f"session={token}; Path=/; HttpOnly; SameSite=Lax; Max-Age={shop.SESSION_MAX_AGE}"
+            return self._json(200, {"email": body.get("email")}, {"Set-Cookie": cookie})
+        if route == "/logout" and method == "POST":
+            shop.logout(token)
+            return self._json(200, {"ok": True}, {"Set-Cookie": "session=; Path=/; Max-Age=0"})
+        if email is None:
+            return self._json(401, {"error": "Not logged in"})
+
+        if route == "/me":
+            return self._json(200, {"email": email})
+        if route == "/products":
+            order_by = query.get("order_by", [None])[0]
+            return self._json(200, {"products": shop.products(order_by)})
+        if route.startswith("/products/"):
+            product = next((p for p in PRODUCTS if str(p["id"]) == route[len("/products/"):]), None)
+            return self._json(200, product) if product else self._json(404, {"error": "not found"})
+        if route == "/checkout/validate" and method == "POST":
+            error = shop.validate_customer(body)
+            return self._json(400, {"error": error}) if error else self._json(200, {"ok": True})
+        if route == "/orders" and method == "POST":
+            order_id, error = shop.place_order(email, body.get("items"), body.get("customer"))
+            return self._json(400, {"error": error}) if error else self._json(200, {"order_id": order_id})
+        self._json(404, {"error": "not found"})
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def _cookie(self, name):
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            key, _, value = part.strip().partition("=")
+            if key == name:
+                return value
+        return None
+
+    def _json(self, status, data, headers=None):
+        self._send(status, json.dumps(data).encode(), "application/json", headers)
+
+    def _send(self, status, payload, content_type, headers=None, cache=False):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "max-age=3600" if cache else "no-store")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the local stand-in shop")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="artificial delay added to every response")
+    args = parser.parse_args(argv)
+
+    shop = StandinShop(args.host, args.port, args.latency_ms / 1000.0)
+    print(f"Stand-in shop on {shop.login_url} (login {Config.EMAIL} / {Config.PASSWORD})")
+    try:
+        shop.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
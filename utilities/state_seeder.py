@@ -0,0 +1,159 @@
+"""Put a logged-in browser into a known cart/favorites state without UI clicks.
+
+The app keeps cart and favorites in localStorage (``[{id, qty}]`` and
+``[id]``), so seeding writes those keys and reloads the page so it renders
+from them. Product names are resolved through the backend's catalog with
+``requests``, reusing the browser's cookies, so a seeded id is one the
+server actually knows. Tests about the add-to-cart or favorite buttons
+themselves should keep clicking them; everything else can seed.
+
+The catalog API and the storage layout are the app's internals, not a
+published contract, so ``seed_cart`` checks the header cart badge after the
+reload. When the badge does not show the seeded count (or the catalog cannot
+be read), it says so and adds the items through the product page instead.
+"""
+import json
+from urllib.parse import urlsplit
+import requests
+from selenium.common.exceptions import WebDriverException
+from config.config import Config
+from pages.dashboard_page import DashboardPage
+from utilities.settle import SettleDetector
+from utilities.timeline import log
+from utilities.wait_utils import PostconditionFailed, WaitUtils
+from utilities import postconditions as post
+
+
+class SeedingError(Exception):
+    """Raised when the requested state cannot be set up"""
+
+
+class StateSeeder:
+
+    # Products the dashboard page object can add by clicking, for when seeding storage does not take
+    UI_ADDERS = {"Sample Shirt": "click_add_to_cart_sample_shirt"}
+
+    READ_SCRIPT = "return window.localStorage.getItem(arguments[0]);"
+    WRITE_SCRIPT = "window.localStorage.setItem(arguments[0], arguments[1]);"
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.postconditions = WaitUtils(driver, Config.POSTCONDITION_TIMEOUT)
+        self._catalog = None
+
+    def api_session(self):
+        """A requests session carrying the browser's cookies and user agent"""
+        session = requests.Session()
+        for cookie in self.driver.get_cookies():
+            session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        session.headers["User-Agent"] = self.driver.execute_script("return navigator.userAgent;")
+        return session
+
+    def api_url(self, route):
+        parts = urlsplit(Config.BASE_URL)
+        return f"{parts.scheme}://{parts.netloc}{Config.API_PATH}{route}"
+
+    def catalog(self):
+        """Product name -> id, fetched from the backend once per seeder"""
+        if self._catalog is None:
+            response = self.api_session().get(self.api_url("/products"), timeout=Config.POSTCONDITION_TIMEOUT)
+            if response.status_code != 200:
+                raise SeedingError(f"Product catalog request failed: HTTP {response.status_code} "
+                                   f"(is the browser logged in?)")
+            self._catalog = {p["name"]: p["id"] for p in response.json()["products"]}
+        return self._catalog
+
+    def product_id(self, product):
+        """Accept an id or a product name such as 'Sample Shirt'"""
+        if isinstance(product, int):
+            return product
+        catalog = self.catalog()
+        if product not in catalog:
+            raise SeedingError(f"Unknown product {product!r}. Available: {sorted(catalog)}")
+        return catalog[product]
+
+    def cart(self):
+        return self._read(Config.CART_STORAGE_KEY, [])
+
+    def favorites(self):
+        return self._read(Config.FAVORITES_STORAGE_KEY, [])
+
+    def seed_cart(self, items, replace=True):
+        """Make the cart hold items ({product: qty}); merged into the current cart unless replace
+
+        Falls back to adding the items through the UI when the seeded cart
+        does not show up in the page.
+        """
+        try:
+            return self.seed_cart_storage(items, replace)
+        except (SeedingError, PostconditionFailed, requests.RequestException, ValueError, KeyError) as e:
+            log(f"  Seeding the cart through localStorage did not take ({type(e).__name__}: {str(e)[:150]}); "
+                f"adding the items through the UI instead")
+            return self.seed_cart_through_ui(items, replace, cause=e)
+
+    def seed_cart_storage(self, items, replace=True):
+        """Write the cart into localStorage and check the cart badge shows its item count"""
+        cart = [] if replace else self.cart()
+        for product, qty in items.items():
+            product_id = self.product_id(product)
+            existing = next((item for item in cart if item["id"] == product_id), None)
+            if existing:
+                existing["qty"] += qty
+            else:
+                cart.append({"id": product_id, "qty": qty})
+        self._write(Config.CART_STORAGE_KEY, cart)
+        self.reload()
+        total = sum(item["qty"] for item in cart)
+        if total:
+            self.postconditions.wait_for_postcondition(
+                post.text_equals(DashboardPage.CART_BADGE, total, "cart badge count"))
+        return cart
+
+    def seed_favorites(self, products, replace=True):
+        """Mark products as favorited"""
+        favorites = [] if replace else self.favorites()
+        for product in products:
+            product_id = self.product_id(product)
+            if product_id not in favorites:
+                favorites.append(product_id)
+        self._write(Config.FAVORITES_STORAGE_KEY, favorites)
+        self.reload()
+        return favorites
+
+    def seed_cart_through_ui(self, items, replace=True, cause=None):
+        """Add items by clicking on the products page; only what UI_ADDERS covers, one of each"""
+        unsupported = [f"{product!r} x{qty}" for product, qty in items.items()
+                       if product not in self.UI_ADDERS or qty != 1]
+        if unsupported:
+            raise SeedingError(f"Cart seeding through localStorage failed ({cause}) and "
+                               f"{', '.join(unsupported)} cannot be added through the UI") from cause
+        if replace:
+            self._write(Config.CART_STORAGE_KEY, [])
+            self.reload()
+        dashboard = DashboardPage(self.driver)
+        try:
+            for product in items:
+                getattr(dashboard, self.UI_ADDERS[product])()
+        except (PostconditionFailed, WebDriverException) as e:
+            raise SeedingError(f"Cart seeding failed through localStorage ({cause}) and through the UI ({e})") from e
+        return self.cart()
+
+    def clear(self):
+        self._write(Config.CART_STORAGE_KEY, [])
+        self._write(Config.FAVORITES_STORAGE_KEY, [])
+        self.reload()
+
+    def reload(self):
+        """Re-render the current page from storage and wait for it to settle"""
+        self.driver.refresh()
+        SettleDetector(self.driver).wait()
+
+    def _read(self, key, default):
+        raw = self.driver.execute_script(self.READ_SCRIPT, key)
+        try:
+            return json.loads(raw) if raw else default
+        except ValueError:
+            return default
+
+    def _write(self, key, value):
+        self.driver.execute_script(self.WRITE_SCRIPT, key, json.dumps(value))
@@ -0,0 +1,54 @@
+import math
+
+
+def percentile(values, q):
+    """q-th percentile (0-100) of values with linear interpolation; None if empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * q / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values):
+    """count/mean/p50/p95/max of a list of durations"""
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "max": None}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": max(values),
+    }
+
+
+def mann_whitney_u(before, after):
+    """Two-sided Mann-Whitney U test (normal approximation with tie correction); returns the p-value"""
+    n1, n2 = len(before), len(after)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted([(value, 0) for value in before] + [(value, 1) for value in after])
+    ranks = [0.0] * len(combined)
+    ties = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        count = j - i + 1
+        ties += count ** 3 - count
+        i = j + 1
+    n = n1 + n2
+    u = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0) - n1 * (n1 + 1) / 2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+    z = max(0.0, abs(u - n1 * n2 / 2) - 0.5) / sigma
+    return math.erfc(z / math.sqrt(2))
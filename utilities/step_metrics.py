@@ -0,0 +1,193 @@
+"""Browser-side performance metrics for every test step, checked against a baseline.
+
+An observer script, installed at the start of every document through CDP,
+buffers largest-contentful-paint, layout-shift and longtask entries from
+``PerformanceObserver``. When a ``step`` ends, one script call reads what
+happened since the step began (Navigation and Resource Timing, LCP, CLS,
+long tasks, transferred bytes) and ``Performance.getMetrics`` adds the JS
+heap and DOM size. If the page was reloaded during the step, the window
+starts at the new document's navigation instead.
+
+Each run's metrics go to Config.METRICS_DIR. With a baseline saved
+(``--save-metrics-baseline``), a metric regresses when it is more than
+Config.METRIC_TOLERANCE over its baseline value and by more than its floor
+in Config.METRIC_FLOORS; Config.METRIC_REGRESSION decides whether that
+warns or fails the test.
+"""
+import json
+import os
+import time
+from datetime import datetime
+from selenium.common.exceptions import WebDriverException
+from config.config import Config
+from utilities.timeline import timeline
+
+METRICS_OBSERVER_JS = """
+(function () {
+    if (window.__stepMetrics) { return; }
+    var metrics = window.__stepMetrics = {lcp: [], shifts: [], longTasks: []};
+    try { performance.setResourceTimingBufferSize(2000); } catch (e) {}
+    function observe(type, handler) {
+        try {
+            new PerformanceObserver(function (list) { list.getEntries().forEach(handler); })
+                .observe({type: type, buffered: true});
+        } catch (e) {}
+    }
+    observe('largest-contentful-paint', function (e) { metrics.lcp.push(e.startTime); });
+    observe('layout-shift', function (e) { if (!e.hadRecentInput) { metrics.shifts.push([e.startTime, e.value]); } });
+    observe('longtask', function (e) { metrics.longTasks.push([e.startTime, e.duration]); });
+})();
+"""
+
+# arguments[0]: epoch ms when the step began
+STEP_METRICS_SCRIPT = """
+var since = arguments[0];
+var metrics = window.__stepMetrics || {lcp: [], shifts: [], longTasks: []};
+var from = Math.max(0, since - performance.timeOrigin);
+var navigated = performance.timeOrigin >= since;
+function round(value) { return Math.round(value * 10) / 10; }
+var resources = performance.getEntriesByType('resource').filter(function (r) { return r.startTime >= from; });
+var transfer = resources.reduce(function (sum, r) { return sum + (r.transferSize || 0); }, 0);
+var result = {
+    resources: resources.length,
+    cls: Math.round(metrics.shifts.filter(function (s) { return s[0] >= from; })
+        .reduce(function (sum, s) { return sum + s[1]; }, 0) * 10000) / 10000,
+    long_tasks: 0, long_task_ms: 0, lcp_ms: null, navigation: null
+};
+metrics.longTasks.forEach(function (t) {
+    if (t[0] >= from) { result.long_tasks++; result.long_task_ms += t[1]; }
+});
+result.long_task_ms = round(result.long_task_ms);
+var lcp = metrics.lcp.filter(function (t) { return t >= from; });
+if (lcp.length) { result.lcp_ms = round(lcp[lcp.length - 1] - from); }
+var nav = performance.getEntriesByType('navigation')[0];
+if (navigated && nav) {
+    transfer += nav.transferSize || 0;
+    result.navigation = {ttfb_ms: round(nav.responseStart), dom_content_loaded_ms: round(nav.domContentLoadedEventEnd),
+                         load_ms: round(nav.loadEventEnd), type: nav.type};
+}
+result.transfer_bytes = transfer;
+if (performance.memory) { result.js_heap_bytes = performance.memory.usedJSHeapSize; }
+return result;
+"""
+
+
+class PerformanceRegressionWarning(UserWarning):
+    """A step got slower or heavier than its baseline by more than the configured threshold"""
+
+
+class StepMetrics:
+
+    def __init__(self, baseline_file=None):
+        self.baseline_file = baseline_file or Config.METRICS_BASELINE_FILE
+        self.baseline = self._read(self.baseline_file)
+        self.results = {}
+        self.regressions = {}
+        self.driver = None
+        self.nodeid = None
+        self.begun = []
+        timeline.add_listener(self._on_timeline)
+
+    @staticmethod
+    def register(driver):
+        """Install the observer on every new document and enable CDP performance metrics"""
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": METRICS_OBSERVER_JS})
+            driver.execute_cdp_cmd("Performance.enable", {})
+        except (AttributeError, WebDriverException):
+            pass
+
+    @staticmethod
+    def _read(path):
+        if not path or not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def start_test(self, nodeid, driver):
+        self.nodeid = nodeid
+        self.driver = driver
+        self.begun = []
+
+    def finish_test(self):
+        self.driver = None
+
+    def _on_timeline(self, kind, name, category, data):
+        if self.driver is None or category != "step":
+            return
+        if kind == "begin":
+            self.begun.append(time.time() * 1000)
+        elif kind == "end" and self.begun:
+            since = self.begun.pop()
+            if "error" not in data.get("args", {}):
+                self.record(name, since, data["dur"] / 1000)
+
+    def collect(self, since_ms):
+        """Metrics of everything that happened in the browser since since_ms (epoch ms)"""
+        metrics = self.driver.execute_script(STEP_METRICS_SCRIPT, since_ms)
+        if self.driver.capabilities.get("browserName") != "chrome":
+            return metrics
+        try:
+            cdp = {m["name"]: m["value"] for m in self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+            metrics["js_heap_bytes"] = int(cdp["JSHeapUsedSize"])
+            metrics["dom_nodes"] = int(cdp["Nodes"])
+        except (AttributeError, KeyError, WebDriverException):
+            pass
+        return metrics
+
+    def record(self, step, since_ms, duration_ms):
+        try:
+            metrics = self.collect(since_ms)
+        except WebDriverException:
+            return None
+        metrics["duration_ms"] = round(duration_ms, 1)
+        self.results.setdefault(self.nodeid, {})[step] = metrics
+        problems = self.compare(metrics, self.baseline.get(self.nodeid, {}).get(step))
+        if problems:
+            self.regressions.setdefault(self.nodeid, []).extend(f"{step}: {problem}" for problem in problems)
+        return metrics
+
+    @staticmethod
+    def compare(metrics, baseline):
+        """Descriptions of the metrics that regressed against baseline"""
+        if not baseline:
+            return []
+        problems = []
+        for name, floor in Config.METRIC_FLOORS.items():
+            value, base = metrics.get(name), baseline.get(name)
+            if value is None or base is None:
+                continue
+            if value > base * (1 + Config.METRIC_TOLERANCE) and value - base > floor:
+                problems.append(f"{name} {value} vs baseline {base} (+{(value - base) / base * 100 if base else 100:.0f}%)")
+        return problems
+
+    def save_run(self, directory=None):
+        directory = directory or Config.METRICS_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"run-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}.json")
+        with open(path, "w") as f:
+            json.dump({"recorded": time.time(), "tests": self.results}, f, indent=2)
+        return path
+
+    def save_baseline(self):
+        """Make this run's metrics the baseline for the tests it ran"""
+        baseline = self._read(self.baseline_file)
+        baseline.update(self.results)
+        directory = os.path.dirname(self.baseline_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.baseline_file, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+
+    def summary_lines(self):
+        lines = [f"{'step':50} {'ms':>7} {'lcp':>6} {'cls':>6} {'long':>6} {'KB':>7} {'heap MB':>8}"]
+        for nodeid, steps in self.results.items():
+            lines.append(nodeid)
+            for step, m in steps.items():
+                lcp = f"{m['lcp_ms']:.0f}" if m.get("lcp_ms") is not None else "-"
+                heap = f"{m['js_heap_bytes'] / 1e6:.1f}" if m.get("js_heap_bytes") is not None else "-"
+                lines.append(f"  {step[:48]:48} {m['duration_ms']:7.0f} {lcp:>6} {m['cls']:6.3f} "
+                             f"{m['long_task_ms']:6.0f} {m['transfer_bytes'] / 1024:7.1f} {heap:>8}")
+        for nodeid, problems in self.regressions.items():
+            lines += [f"REGRESSED {nodeid} {problem}" for problem in problems]
+        return lines
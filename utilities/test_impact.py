@@ -0,0 +1,357 @@
+"""Select only the tests a change can affect, from what each test exercised last time.
+
+During a run every test records the functions under ``pages/``,
+``utilities/`` and ``tests/`` that were on the stack when it sent a
+WebDriver command, plus every page-object action it called, and its outcome
+and the commit it ran on. Config.IMPACT_INDEX_FILE keeps the latest entry
+per test.
+
+Selection diffs each entry's commit against the working tree and maps the
+changed lines to symbols with ``ast``: functions, class-level constants
+(locators such as ``DashboardPage.SAMPLE_SUNGLASS_FAVORITE``, Config
+settings) and module-level constants (scripts). A test is selected when a
+function it ran changed, or references a changed constant, or its module
+changed outside any definition. Tests that are new, failed last time or ran
+on an unknown commit are always selected; the rest keep their last result.
+
+    python -m utilities.test_impact              # list selected/skipped tests
+    python -m utilities.test_impact --run [-- extra pytest args]
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from config.config import Config
+from utilities.pytest_args import split_pytest_args
+from utilities.timeline import timeline
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRACKED_DIRS = ("pages", "utilities", "tests", "config")
+# Changing any of these can affect every test. The driver modules run while
+# fixtures launch, reset and quit browsers, before and after recording.
+GLOBAL_FILES = ("conftest.py", "requirements.txt", "pytest.ini",
+                "utilities/driver_factory.py", "utilities/driver_pool.py", "utilities/daemon_client.py",
+                "utilities/resource_blocker.py")
+# Recorders wrap driver.execute; their own frames say nothing about the test
+INSTRUMENTATION = {os.path.join("utilities", name) for name in
+                   ("test_impact.py", "command_profiler.py", "flight_recorder.py", "timeline.py",
+                    "results_store.py")}
+REDUCED_MODE_ARGS = ["--headless", "--browser-profile=performance", "--no-step-console"]
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def git(*args):
+    result = subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def head_commit():
+    try:
+        return git("rev-parse", "HEAD").strip()
+    except (RuntimeError, OSError):
+        return None
+
+
+class ImpactRecorder:
+    """Collects the functions each test ran and writes them into the index"""
+
+    def __init__(self):
+        self.current = None
+        self.tests = {}
+        timeline.add_listener(self._on_timeline)
+
+    def install(self, driver):
+        if getattr(driver, "_impact_recorder", None) is self:
+            return driver
+        original_execute = driver.execute
+        recorder = self
+
+        def execute(driver_command, params=None):
+            if recorder.current is not None:
+                recorder._record_stack(sys._getframe(1))
+            return original_execute(driver_command, params)
+
+        driver.execute = execute
+        driver._impact_recorder = self
+        return driver
+
+    def _record_stack(self, frame):
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(ROOT_DIR + os.sep):
+                path = os.path.relpath(filename, ROOT_DIR)
+                if path.split(os.sep)[0] in TRACKED_DIRS and path not in INSTRUMENTATION:
+                    code = frame.f_code
+                    qualname = getattr(code, "co_qualname", code.co_name).split(".<locals>")[0]
+                    self.current.add(f"{path}::{qualname}")
+            frame = frame.f_back
+
+    def _on_timeline(self, kind, name, category, data):
+        # Page-object actions that issued no command of their own still count
+        if self.current is not None and kind == "begin" and category == "action":
+            self.current.add(f"action::{name}")
+
+    def start_test(self, nodeid):
+        self.current = self.tests.setdefault(nodeid, set())
+
+    def finish_test(self):
+        self.current = None
+
+    def save(self, path, outcomes):
+        """Merge this run's tests into the index; safe with parallel workers"""
+        if not self.tests:
+            return
+        index = ImpactIndex.read(path)
+        commit = head_commit()
+        for nodeid, functions in self.tests.items():
+            index[nodeid] = {"functions": sorted(functions), "outcome": outcomes.get(nodeid, "passed"),
+                             "commit": commit, "recorded": time.time()}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+class SourceMap:
+    """Definitions of one Python file by line range"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(ROOT_DIR, path)) as f:
+            self.tree = ast.parse(f.read())
+        self.functions = {}
+        self.constants = {}
+        self._walk(self.tree.body, [])
+        self.module_references = self._names(self.tree.body, skip_functions=True)
+
+    def _walk(self, body, scope):
+        for node in body:
+            start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.functions[".".join(scope + [node.name])] = (start, node.end_lineno, node)
+            elif isinstance(node, ast.ClassDef):
+                self._walk(node.body, scope + [node.name])
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        self.constants[".".join(scope + [target.id])] = (start, node.end_lineno)
+
+    def changed(self, lines):
+        """(functions, constants, outside) touched by the given line numbers"""
+        functions, constants, outside = set(), set(), False
+        for line in lines:
+            hit = False
+            for name, (start, end, _) in self.functions.items():
+                if start <= line <= end:
+                    functions.add(name)
+                    hit = True
+            for name, (start, end) in self.constants.items():
+                if start <= line <= end:
+                    constants.add(name)
+                    hit = True
+            outside = outside or not hit
+        return functions, constants, outside
+
+    def references(self, qualname=None):
+        """Attribute and variable names used inside a function (including defaults), or the whole file"""
+        if qualname is None:
+            return self._names([self.tree])
+        entry = self.functions.get(qualname)
+        return self._names([entry[2]]) if entry else set()
+
+    @staticmethod
+    def _names(roots, skip_functions=False):
+        """Names used under roots; with skip_functions only code that runs at import"""
+        names = set()
+        pending = list(roots)
+        while pending:
+            node = pending.pop()
+            if skip_functions and isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                pending.extend(node.decorator_list + node.args.defaults + node.args.kw_defaults)
+                continue
+            if isinstance(node, ast.Attribute):
+                names.add(node.attr)
+            elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+                names.add(node.id)
+            pending.extend(child for child in ast.iter_child_nodes(node) if child is not None)
+        return names
+
+
+class ImpactIndex:
+
+    def __init__(self, path=None):
+        self.path = path or Config.IMPACT_INDEX_FILE
+        self.entries = self.read(self.path)
+        self._sources = {}
+
+    @staticmethod
+    def read(path):
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def changed_lines(base):
+        """{path: set of new-side line numbers} changed between base and the working tree"""
+        changes = defaultdict(set)
+        old_path = path = None
+        for line in git("diff", "-U0", "--no-color", base, "--").splitlines():
+            if line.startswith("--- "):
+                old_path = None if line == "--- /dev/null" else line[6:]
+            elif line.startswith("+++ "):
+                path = None if line == "+++ /dev/null" else line[6:]
+                if path is None and old_path:
+                    changes[old_path].add(0)
+            elif path and line.startswith("@@"):
+                match = HUNK_RE.match(line)
+                start, count = int(match.group(1)), int(match.group(2) or 1)
+                # A pure deletion touches the line it was removed after
+                changes[path].update(range(start, start + count) if count else [start, start + 1])
+        for path in git("ls-files", "--others", "--exclude-standard").splitlines():
+            changes[path].add(0)
+        return changes
+
+    def source(self, path):
+        if path not in self._sources:
+            self._sources[path] = SourceMap(path) if os.path.exists(os.path.join(ROOT_DIR, path)) else None
+        return self._sources[path]
+
+    def impact(self, base):
+        """What changed since base: (changed function ids, constant names, whole modules, global)"""
+        functions, constants, modules, everything = set(), set(), set(), []
+        for path, lines in self.changed_lines(base).items():
+            if path in GLOBAL_FILES:
+                everything.append(path)
+                continue
+            if path.split("/")[0] not in TRACKED_DIRS or not path.endswith(".py"):
+                continue
+            source = self.source(path)
+            if source is None:
+                everything.append(f"{path} (deleted)")
+                continue
+            changed_functions, changed_constants, outside = source.changed(lines - {0})
+            functions.update(f"{path}::{name}" for name in changed_functions)
+            constants.update(name.split(".")[-1] for name in changed_constants)
+            if outside or 0 in lines:
+                modules.add(path)
+        # conftest reads settings (e.g. REUSE_DRIVER) on behalf of every test
+        if constants & SourceMap("conftest.py").references():
+            everything.append("setting used by conftest.py")
+        return functions, constants, modules, everything
+
+    def _action_functions(self, name):
+        """Resolve an 'action::Class.method' record to its file in pages/"""
+        for filename in sorted(os.listdir(os.path.join(ROOT_DIR, "pages"))):
+            if filename.endswith(".py"):
+                source = self.source(f"pages/{filename}")
+                if source and name in source.functions:
+                    return f"pages/{filename}::{name}"
+        return None
+
+    def reason(self, nodeid, entry, functions, constants, modules):
+        """Why nodeid must run given the changes, or None when its result still holds"""
+        test_file = nodeid.split("::")[0]
+        if test_file in modules:
+            return f"{test_file} changed"
+        for record in entry["functions"]:
+            if record.startswith("action::"):
+                record = self._action_functions(record[len("action::"):])
+                if record is None:
+                    continue
+            if record in functions:
+                return f"{record} changed"
+            path, qualname = record.split("::", 1)
+            if path in modules:
+                return f"{path} changed outside its functions"
+            source = self.source(path)
+            if source is None:
+                return f"{path} is gone"
+            used = constants & (source.references(qualname) | source.module_references)
+            if used:
+                return f"{record} uses changed {', '.join(sorted(used))}"
+        return None
+
+    def select(self, nodeids, base=None):
+        """Split nodeids into ({nodeid: reason} to run, [nodeid] whose last result stands)"""
+        selected, skipped = {}, []
+        impacts = {}
+        for nodeid in nodeids:
+            entry = self.entries.get(nodeid)
+            if entry is None:
+                selected[nodeid] = "not in index"
+                continue
+            if entry["outcome"] != "passed":
+                selected[nodeid] = f"last result: {entry['outcome']}"
+                continue
+            commit = base or entry.get("commit")
+            if not commit:
+                selected[nodeid] = "recorded outside git"
+                continue
+            if commit not in impacts:
+                try:
+                    impacts[commit] = self.impact(commit)
+                except RuntimeError as e:
+                    impacts[commit] = e
+            impact = impacts[commit]
+            if isinstance(impact, RuntimeError):
+                selected[nodeid] = str(impact)
+                continue
+            functions, constants, modules, everything = impact
+            if everything:
+                selected[nodeid] = f"{', '.join(everything)} changed"
+                continue
+            why = self.reason(nodeid, entry, functions, constants, modules)
+            if why:
+                selected[nodeid] = why
+            else:
+                skipped.append(nodeid)
+        return selected, skipped
+
+
+def collect(pytest_args):
+    result = subprocess.run([sys.executable, "-m", "pytest", "--collect-only", "-q", *pytest_args],
+                            cwd=ROOT_DIR, capture_output=True, text=True)
+    if result.returncode not in (0, 5):
+        raise RuntimeError(f"Test collection failed:\n{result.stdout}{result.stderr}")
+    return [line.strip() for line in result.stdout.splitlines() if "::" in line]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run only the tests affected by changes since they last passed")
+    parser.add_argument("--index", default=Config.IMPACT_INDEX_FILE)
+    parser.add_argument("--base", help="diff against this commit instead of each test's recorded one")
+    parser.add_argument("--run", action="store_true", help="run the selected tests in reduced mode")
+    parser.add_argument("--full-mode", action="store_true", help="run selected tests without the reduced-mode flags")
+    parser.add_argument("pytest_args", nargs="*", help="extra pytest arguments (after --)")
+    args = parser.parse_args(argv)
+
+    nodeids = collect(args.pytest_args)
+    selected, skipped = ImpactIndex(args.index).select(nodeids, args.base)
+    for nodeid, why in selected.items():
+        print(f"  run   {nodeid}  ({why})")
+    for nodeid in skipped:
+        print(f"  skip  {nodeid}  (last passed, unaffected)")
+    print(f"{len(selected)} of {len(nodeids)} tests affected")
+
+    if not args.run or not selected:
+        return 0
+    mode = [] if args.full_mode else REDUCED_MODE_ARGS
+    # Paths already narrowed the collection the selection came from; passed again they would run everything under them
+    options, _ = split_pytest_args(args.pytest_args)
+    return subprocess.call([sys.executable, "-m", "pytest", *mode, *options, *selected], cwd=ROOT_DIR)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+"""Structured record of test steps, page-object actions and progress messages.
+
+Tests wrap each step in ``with step("STEP 1: ..."):``; page-object classes
+are decorated with ``trace_actions`` so every public method becomes a span
+nested inside the step; free-text progress goes through ``log``. The
+timeline can be exported in Chrome trace-event format (open it in
+chrome://tracing or https://ui.perfetto.dev). Printing the familiar banners
+and messages is just the console sink and can be switched off.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config.config import Config
+
+
+class Timeline:
+
+    def __init__(self, console=True, pid=None, tid=None, record=True):
+        self.console = console
+        # Listeners are notified either way; long load runs switch off keeping events
+        self.record = record
+        self.pid = os.getpid() if pid is None else pid
+        self.tid = int(os.environ.get("PARALLEL_WORKER", 0)) if tid is None else tid
+        self.events = []
+        self.listeners = []
+        self.local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    @staticmethod
+    def now_us():
+        return time.perf_counter_ns() // 1000
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """Record name as a complete event covering the body of the with block
+
+        Yields the event's args dict, so the body can attach results to it.
+        """
+        stack = self._stack()
+        started = self.now_us()
+        stack.append(name)
+        self._notify("begin", name, category, args)
+        error = None
+        try:
+            yield args
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            stack.pop()
+            event = {"name": name, "cat": category, "ph": "X", "ts": started,
+                     "dur": self.now_us() - started, "pid": self.pid, "tid": self.tid}
+            if error is not None:
+                args = dict(args, error=f"{type(error).__name__}: {str(error)[:200]}")
+            if args:
+                event["args"] = args
+            if self.record:
+                self.events.append(event)
+            self._notify("end", name, category, event)
+
+    def step(self, name, **args):
+        if self.console:
+            print("\n" + "="*70)
+            print(name)
+            print("="*70)
+        return self.span(name, "step", **args)
+
+    def log(self, message):
+        """Instant event attached to whatever step/action is running"""
+        if self.console:
+            print(message)
+        stack = self._stack()
+        if self.record:
+            self.events.append({"name": message.strip(), "cat": "log", "ph": "i", "s": "t",
+                                "ts": self.now_us(), "pid": self.pid, "tid": self.tid,
+                                "args": {"parent": stack[-1] if stack else None}})
+        self._notify("log", message.strip(), "log", {})
+
+    def add_listener(self, listener):
+        """listener(kind, name, category, data) is called on span begin/end and on log"""
+        self.listeners.append(listener)
+
+    def _notify(self, kind, name, category, data):
+        for listener in self.listeners:
+            listener(kind, name, category, data)
+
+    def current_path(self):
+        return list(self._stack())
+
+    def to_chrome_trace(self):
+        metadata = [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": self.tid,
+                     "args": {"name": f"worker {self.tid}"}}]
+        return {"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    @staticmethod
+    def merge_chrome_traces(paths, output):
+        """Concatenate trace files from several workers into one"""
+        events = []
+        for path in paths:
+            if os.path.exists(path):
+                with open(path) as f:
+                    events.extend(json.load(f)["traceEvents"])
+        with open(output, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+timeline = Timeline(console=Config.TIMELINE_CONSOLE)
+
+
+def step(name, **args):
+    return timeline.step(name, **args)
+
+
+def log(message):
+    timeline.log(message)
+
+
+def trace_actions(cls):
+    """Class decorator: record every public method call as an 'action' span"""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not callable(value) or isinstance(value, (staticmethod, classmethod, type)):
+            continue
+        setattr(cls, attr, _traced(f"{cls.__name__}.{attr}", value))
+    return cls
+
+
+def _traced(name, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with timeline.span(name, "action"):
+            return method(*args, **kwargs)
+    return wrapper
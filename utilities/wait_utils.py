@@ -1,12 +1,51 @@
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from config.config import Config
+from utilities.deadline import budgets
+
+
+class PostconditionFailed(TimeoutException):
+    """Raised when an action's declared postcondition never holds"""
+
+
+def ensure_script_timeout(driver, seconds):
+    """Raise the async script timeout to at least seconds, skipping the command when it already is"""
+    if getattr(driver, "script_timeout", 0) < seconds:
+        driver.set_script_timeout(seconds)
+        driver.script_timeout = seconds
+
 
 class WaitUtils:
-    def __init__(self, driver, timeout=10):
-        self.wait = WebDriverWait(driver, timeout)
+    def __init__(self, driver, timeout=10, poll_frequency=Config.POLL_FREQUENCY):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+
+    def until(self, condition, timeout=None, message=""):
+        """WebDriverWait.until within the current budget"""
+        timeout = budgets.remaining(self.timeout if timeout is None else timeout)
+        return WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition, message)
 
     def wait_for_element_visible(self, locator):
-        return self.wait.until(EC.visibility_of_element_located(locator))
+        return self.until(EC.visibility_of_element_located(locator))
 
     def wait_for_element_clickable(self, locator):
-        return self.wait.until(EC.element_to_be_clickable(locator))
+        return self.until(EC.element_to_be_clickable(locator))
+
+    def wait_for_postcondition(self, postcondition, timeout=None):
+        """Return as soon as postcondition holds, fail with what was last observed"""
+        timeout = self.timeout if timeout is None else timeout
+        limiting = budgets.limiting(timeout)
+        try:
+            return self.until(postcondition, timeout)
+        except TimeoutException:
+            try:
+                url = self.driver.current_url
+            except Exception:
+                url = "<unavailable>"
+            within = f"budget of '{limiting.name}'" if limiting else f"{timeout}s"
+            raise PostconditionFailed(
+                f"Postcondition not met within {within}: {postcondition.description} "
+                f"(last observed: {postcondition.last_observed!r}, url: {url})"
+            ) from None